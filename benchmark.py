@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki Workflow 基准测试
+
+test.py 对每个工作流只执行一次并打印结果，不记录耗时、API调用次数和数据量。
+本脚本在本地 Meraki API 模拟服务（meraki_simulator.py）生成的合成组织上，
+用 Temporal 时间跳跃测试环境把14个工作流各执行 N 次，统计:
+
+- 端到端延迟 p50 / p95 / p99 / 平均 / 最大（毫秒）
+- 每次执行的 HTTP 请求数（含 429 限流响应）、按端点模板的请求数、响应字节数
+- Workflow 历史事件数与历史大小（字节）
+
+结果以固定键顺序写入JSON文件，便于在不同提交之间 diff；--compare 可直接打印与旧结果的差异。
+
+用法：
+  python benchmark.py [--iterations 10] [--workflows 设备状态查询,告警日志]
+                      [--networks 50] [--devices-per-network 40] [--output benchmark_results.json]
+                      [--compare 旧结果.json]
+
+  python benchmark.py --temporal-address localhost:7233  # 使用已有Temporal服务而不是时间跳跃测试环境
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from temporalio.api.history.v1 import History
+from temporalio.client import Client
+from temporalio.testing import WorkflowEnvironment
+
+from meraki import MerakiActivities
+from merakiAPI import MerakiAPI
+from meraki_codec import create_data_converter
+from meraki_events import EventLog
+from meraki_inventory import InventoryStore
+from meraki_simulator import MerakiSimulator, SimulatorConfig
+from meraki_spill import SpillStore
+from meraki_timeseries import TimeSeriesStore
+from worker import create_meraki_worker
+
+from concordia_workflows_echarts import (
+    DeviceStatusWorkflow, ConcordiaWorkflowInput,
+    APDeviceQueryWorkflow, APDeviceQueryInput,
+    ClientCountWorkflow,
+    FirmwareSummaryWorkflow,
+    LicenseDetailsWorkflow,
+    DeviceInspectionWorkflow,
+    FloorplanAPWorkflow, FloorplanAPInput,
+    DeviceLocationWorkflow, DeviceLocationInput,
+    LostDeviceTraceWorkflow, LostDeviceTraceInput,
+    AlertsLogWorkflow,
+    NetworkHealthAnalysisWorkflow, NetworkHealthAnalysisInput,
+    SecurityPostureWorkflow, SecurityPostureInput,
+    TroubleshootingWorkflow, TroubleshootingInput,
+    CapacityPlanningWorkflow, CapacityPlanningInput,
+)
+
+logger = logging.getLogger(__name__)
+
+# 默认参数
+DEFAULT_ITERATIONS = 10
+DEFAULT_OUTPUT = "benchmark_results.json"
+TASK_QUEUE = "meraki-benchmark-queue"
+PERCENTILES = (50, 95, 99)
+# 结果文件格式版本，字段含义变化时递增
+RESULT_VERSION = 1
+
+
+def build_cases(simulator: MerakiSimulator, org_id: str) -> List[Dict[str, Any]]:
+    """
+    构造14个工作流的基准用例（与 test.py 相同的工作流和输入，关键字取自合成数据）
+
+    Args:
+        simulator: 已生成合成数据的模拟服务
+        org_id: 组织ID
+
+    Returns:
+        List[Dict]: 用例列表，每个包含 name/workflow/input
+    """
+    client_mac = next(
+        (mac for mac, (network_id, _) in simulator.client_by_mac.items()
+         if simulator.network_by_id[network_id]["organizationId"] == org_id),
+        "d0:88:0c:69:5c:0f")
+    return [
+        {"name": "设备状态查询", "workflow": DeviceStatusWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "AP设备搜索", "workflow": APDeviceQueryWorkflow,
+         "input": APDeviceQueryInput(org_id=org_id, search_keyword="MR")},
+        {"name": "客户端统计", "workflow": ClientCountWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "固件版本汇总", "workflow": FirmwareSummaryWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "许可证详情", "workflow": LicenseDetailsWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "设备巡检报告", "workflow": DeviceInspectionWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "楼层AP分布", "workflow": FloorplanAPWorkflow,
+         "input": FloorplanAPInput(org_id=org_id, floor_name="1F")},
+        {"name": "设备点位图", "workflow": DeviceLocationWorkflow,
+         "input": DeviceLocationInput(org_id=org_id, search_keyword="MR46")},
+        {"name": "丢失设备追踪", "workflow": LostDeviceTraceWorkflow,
+         "input": LostDeviceTraceInput(org_id=org_id, client_mac=client_mac)},
+        {"name": "告警日志", "workflow": AlertsLogWorkflow,
+         "input": ConcordiaWorkflowInput(org_id=org_id)},
+        {"name": "网络健康全景分析", "workflow": NetworkHealthAnalysisWorkflow,
+         "input": NetworkHealthAnalysisInput(org_id=org_id)},
+        {"name": "安全态势感知分析", "workflow": SecurityPostureWorkflow,
+         "input": SecurityPostureInput(org_id=org_id)},
+        {"name": "运维故障诊断", "workflow": TroubleshootingWorkflow,
+         "input": TroubleshootingInput(org_id=org_id)},
+        {"name": "容量规划分析", "workflow": CapacityPlanningWorkflow,
+         "input": CapacityPlanningInput(org_id=org_id, forecast_days=30)},
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    线性插值百分位数（与 numpy.percentile 默认方法一致）
+
+    Args:
+        values: 样本
+        pct: 百分位（0~100）
+
+    Returns:
+        float: 百分位数，样本为空时返回0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    汇总一个工作流的多次执行
+
+    Args:
+        runs: 每次执行的测量值（latency_ms/http_calls/throttled/bytes/history_events/history_bytes/endpoints/error）
+
+    Returns:
+        Dict: 汇总统计，数值保留固定小数位，避免无意义的 diff
+    """
+    ok = [run for run in runs if not run.get("error")]
+    latencies = [run["latency_ms"] for run in ok]
+    endpoints: Dict[str, float] = {}
+    for run in ok:
+        for endpoint, count in run["endpoints"].items():
+            endpoints[endpoint] = endpoints.get(endpoint, 0) + count
+
+    return {
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "error_samples": sorted({run["error"] for run in runs if run.get("error")})[:3],
+        "latency_ms": {
+            **{f"p{pct}": round(percentile(latencies, pct), 1) for pct in PERCENTILES},
+            "mean": round(_mean(latencies), 1),
+            "max": round(max(latencies), 1) if latencies else 0.0,
+        },
+        "http_calls_per_run": round(_mean([run["http_calls"] for run in ok]), 2),
+        "throttled_per_run": round(_mean([run["throttled"] for run in ok]), 2),
+        "bytes_per_run": round(_mean([run["bytes"] for run in ok])),
+        "history_events": round(_mean([run["history_events"] for run in ok]), 1),
+        "history_bytes": round(_mean([run["history_bytes"] for run in ok])),
+        "http_calls_by_endpoint": {
+            endpoint: round(count / len(ok), 2) for endpoint, count in sorted(endpoints.items())
+        } if ok else {},
+    }
+
+
+async def run_case(client: Client, simulator: MerakiSimulator, case: Dict[str, Any],
+                   activities: MerakiActivities, cold: bool) -> Dict[str, Any]:
+    """
+    执行一次工作流并测量
+
+    Args:
+        client: Temporal客户端
+        simulator: 模拟服务（每次执行前清零统计）
+        case: 基准用例
+        activities: Worker 使用的 MerakiActivities
+        cold: 是否在执行前清空API响应缓存
+
+    Returns:
+        Dict: 本次执行的测量值
+    """
+    if cold:
+        activities.api.invalidate_cache()
+    simulator.reset_stats()
+
+    workflow_id = f"benchmark-{case['workflow'].__name__}-{uuid.uuid4().hex[:8]}"
+    error = None
+    started = time.perf_counter()
+    try:
+        handle = await client.start_workflow(
+            case["workflow"].run, case["input"], id=workflow_id, task_queue=TASK_QUEUE)
+        await handle.result()
+    except Exception as e:
+        handle = client.get_workflow_handle(workflow_id)
+        error = f"{type(e).__name__}: {e}"
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    stats = simulator.stats()
+    history_events = history_bytes = 0
+    try:
+        history = await handle.fetch_history()
+        history_events = len(history.events)
+        history_bytes = History(events=history.events).ByteSize()
+    except Exception as e:
+        logger.warning(f"获取 {workflow_id} 历史失败: {e}")
+
+    return {
+        "latency_ms": latency_ms,
+        "http_calls": stats["requests"],
+        "throttled": stats["throttled"],
+        "bytes": stats["bytes"],
+        "endpoints": {endpoint: counters["requests"] for endpoint, counters in stats["by_endpoint"].items()},
+        "history_events": history_events,
+        "history_bytes": history_bytes,
+        "error": error,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return commit.stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    启动模拟服务、Temporal环境和Worker，按用例顺序执行基准测试
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        Dict: 完整结果（metadata + workflows）
+    """
+    config = SimulatorConfig(
+        networks=args.networks,
+        devices_per_network=args.devices_per_network,
+        clients_per_network=args.clients_per_network,
+        alerts=args.alerts,
+        rate_limit=args.rate_limit,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+    )
+    simulator = MerakiSimulator(config)
+    org_id = simulator.orgs[0]["id"]
+    cases = build_cases(simulator, org_id)
+    if args.workflows:
+        wanted = {name.strip() for name in args.workflows.split(",") if name.strip()}
+        cases = [case for case in cases if case["name"] in wanted or case["workflow"].__name__ in wanted]
+        if not cases:
+            raise SystemExit(f"没有匹配的工作流: {args.workflows}")
+
+    workdir = tempfile.mkdtemp(prefix="meraki_benchmark_")
+    results: Dict[str, Any] = {}
+    try:
+        await simulator.start(port=args.sim_port)
+        activities = MerakiActivities(
+            api=MerakiAPI(api_key="benchmark", base_url=simulator.base_url),
+            spill=SpillStore(os.path.join(workdir, "spill")),
+            inventory=InventoryStore(os.path.join(workdir, "inventory.db")),
+            timeseries=TimeSeriesStore(os.path.join(workdir, "timeseries")),
+            events=EventLog(os.path.join(workdir, "events")),
+        )
+
+        if args.temporal_address:
+            env = None
+            client = await Client.connect(args.temporal_address, namespace=args.namespace,
+                                          data_converter=create_data_converter())
+        else:
+            env = await WorkflowEnvironment.start_time_skipping(data_converter=create_data_converter())
+            client = env.client
+
+        try:
+            worker = await create_meraki_worker(client, TASK_QUEUE, activities)
+            async with worker:
+                for case in cases:
+                    name = case["workflow"].__name__
+                    print(f"▶ {case['name']} ({name})")
+                    for _ in range(args.warmup):
+                        await run_case(client, simulator, case, activities, args.cold)
+                    runs = []
+                    for i in range(args.iterations):
+                        run = await run_case(client, simulator, case, activities, args.cold)
+                        runs.append(run)
+                        status = f"❌ {run['error']}" if run["error"] else "✅"
+                        print(f"   #{i + 1:<3} {run['latency_ms']:8.1f} ms  {run['http_calls']:5d} calls  "
+                              f"{run['bytes']:10d} B  {run['history_events']:4d} events  {status}")
+                    results[name] = {"name": case["name"], **summarize_runs(runs)}
+        finally:
+            await activities.close()
+            if env is not None:
+                await env.shutdown()
+    finally:
+        await simulator.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "version": RESULT_VERSION,
+        "metadata": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "temporal": args.temporal_address or "time-skipping",
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "cold": args.cold,
+            "simulator": {
+                "networks": config.networks,
+                "devices_per_network": config.devices_per_network,
+                "clients_per_network": config.clients_per_network,
+                "alerts": config.alerts,
+                "rate_limit": config.rate_limit,
+                "latency_ms": config.latency_ms,
+                "jitter_ms": config.jitter_ms,
+                "seed": config.seed,
+            },
+        },
+        "workflows": results,
+    }
+
+
+def print_summary(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """
+    打印汇总表；提供 baseline 时同时打印 p50/p95、HTTP请求数和历史大小的变化
+
+    Args:
+        result: 本次结果
+        baseline: 之前保存的结果文件内容
+    """
+    base = (baseline or {}).get("workflows", {})
+    print(f"\n{'工作流':<34}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls':>9}{'KB':>10}"
+          f"{'events':>8}{'hist KB':>9}{'err':>5}")
+    for name, stats in result["workflows"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<34}{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+              f"{stats['http_calls_per_run']:>9.1f}{stats['bytes_per_run'] / 1024:>10.1f}"
+              f"{stats['history_events']:>8.0f}{stats['history_bytes'] / 1024:>9.1f}{stats['errors']:>5d}")
+        old = base.get(name)
+        if old:
+            changes = []
+            for label, new_value, old_value in (
+                ("p50", latency["p50"], old["latency_ms"]["p50"]),
+                ("p95", latency["p95"], old["latency_ms"]["p95"]),
+                ("calls", stats["http_calls_per_run"], old["http_calls_per_run"]),
+                ("bytes", stats["bytes_per_run"], old["bytes_per_run"]),
+                ("history", stats["history_bytes"], old["history_bytes"]),
+            ):
+                if old_value:
+                    changes.append(f"{label} {(new_value - old_value) / old_value * 100:+.1f}%")
+            print(f"{'':<34}vs {baseline['metadata'].get('commit') or 'baseline'}: {', '.join(changes)}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="Meraki Workflow 基准测试")
+    parser.add_argument("--iterations", "-n", type=int, default=DEFAULT_ITERATIONS, help="每个工作流的测量次数")
+    parser.add_argument("--warmup", type=int, default=1, help="每个工作流在测量前的预热次数")
+    parser.add_argument("--workflows", help="只运行指定工作流（中文名或类名，逗号分隔）")
+    parser.add_argument("--cold", action="store_true", help="每次执行前清空API响应缓存")
+    parser.add_argument("--output", "-o", default=DEFAULT_OUTPUT, help="结果JSON文件")
+    parser.add_argument("--compare", help="与之前的结果JSON对比")
+    parser.add_argument("--temporal-address", help="使用已有Temporal服务（默认启动时间跳跃测试环境）")
+    parser.add_argument("--namespace", default="default", help="--temporal-address 对应的命名空间")
+    parser.add_argument("--sim-port", type=int, default=0, help="模拟服务端口（默认随机）")
+    parser.add_argument("--networks", type=int, default=defaults.networks)
+    parser.add_argument("--devices-per-network", type=int, default=defaults.devices_per_network)
+    parser.add_argument("--clients-per-network", type=int, default=defaults.clients_per_network)
+    parser.add_argument("--alerts", type=int, default=defaults.alerts)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="模拟服务每组织每秒请求数，0表示不限速")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    # worker 模块导入时已配置INFO级日志，基准测试只保留警告，避免淹没每次执行的测量输出
+    logging.getLogger().setLevel(logging.WARNING)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    result = await run_benchmark(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+    print_summary(result, baseline)
+    print(f"\n💾 结果已保存到: {args.output}")
+    if any(stats["errors"] for stats in result["workflows"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
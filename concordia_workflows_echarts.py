@@ -61,9 +61,10 @@ Concordia 学校 10个业务场景的 Temporal Workflow 实现 - ECharts图表
 10. 热力图 - 最适合矩阵数据密度展示，告警分布热点明显
 """
 
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Awaitable, Callable
 from temporalio import workflow
 
 # Import activity, passing it through the sandbox without reloading the module
@@ -126,12 +127,74 @@ def force_clean_text_style(echarts_data):
     
     return echarts_data
 
+# ==================== 并发控制 ====================
+
+# 每个网络一个Activity时的默认并发窗口，与每组织 10 请求/秒 的限速相匹配
+DEFAULT_FANOUT_CONCURRENCY = 10
+
+async def gather_with_concurrency(limit: int, factories: List[Callable[[], Awaitable[Any]]],
+                                  return_exceptions: bool = False) -> List[Any]:
+    """
+    在并发窗口内执行一组Activity调用，结果顺序与 factories 一致
+    
+    传入的是工厂函数而不是已调度的Activity，保证同时在途的Activity不超过 limit 个。
+    asyncio.Semaphore 运行在 Temporal 的确定性事件循环上，可以在Workflow中使用。
+    
+    Args:
+        limit: 最大并发数（小于1时按1处理）
+        factories: 返回 awaitable 的无参函数列表，如 lambda: workflow.execute_activity_method(...)
+        return_exceptions: 为True时单个调用的异常作为结果返回，而不是中断整个 gather
+        
+    Returns:
+        List: 每个调用的结果（或异常）
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(factory):
+        async with semaphore:
+            return await factory()
+    
+    return await asyncio.gather(*(run(f) for f in factories), return_exceptions=return_exceptions)
+
+async def read_spilled_items(meraki_activities, handle: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    逐页读取分页Activity（如 get_organization_devices_paged）落盘的结果，读取完毕后删除 spill
+    
+    页面只存在于写入它的Worker主机上，read_spill_page / delete_spill 调度到句柄中的 task_queue。
+    读取失败时同样删除 spill；Workflow 被取消等未能删除的 spill 由 Worker 定期清理。
+    
+    Args:
+        meraki_activities: MerakiActivities 实例
+        handle: 分页Activity返回的句柄 {spill_id, pages, items, complete, task_queue}
+        
+    Returns:
+        List[Dict]: 所有页面的条目，按页顺序
+    """
+    items = []
+    try:
+        for page_index in range(handle["pages"]):
+            items.extend(await workflow.execute_activity_method(
+                meraki_activities.read_spill_page,
+                args=[handle["spill_id"], page_index],
+                task_queue=handle.get("task_queue"),
+                start_to_close_timeout=timedelta(seconds=30),
+            ))
+    finally:
+        await workflow.execute_activity_method(
+            meraki_activities.delete_spill,
+            args=[handle["spill_id"]],
+            task_queue=handle.get("task_queue"),
+            start_to_close_timeout=timedelta(seconds=30),
+        )
+    return items
+
 # ==================== 数据类定义 ====================
 
 @dataclass
 class ConcordiaWorkflowInput:
     """Concordia工作流通用输入"""
     org_id: str = "850617379619606726"  # Concordia组织ID
+    max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY  # 按网络并发调用Activity时的并发窗口
 
 @dataclass
 class DeviceStatusResult:
@@ -152,6 +215,7 @@ class APDeviceQueryInput:
     """AP设备查询输入"""
     org_id: str = "850617379619606726"
     search_keyword: str = "H330"  # 默认搜索关键词
+    map_zoom: int = 12  # 地图缩放级别，决定设备坐标的聚合粒度
 
 @dataclass
 class APDeviceQueryResult:
@@ -231,6 +295,7 @@ class FloorplanAPInput:
     """楼层AP分布查询输入"""
     org_id: str = "850617379619606726"
     floor_name: Optional[str] = None  # 可选的楼层名称过滤
+    max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY  # 并发查询楼层平面图的网络数
 
 @dataclass
 class FloorplanAPResult:
@@ -251,6 +316,7 @@ class DeviceLocationInput:
     """设备点位图查询输入"""
     org_id: str = "850617379619606726"
     search_keyword: str = "Corr"  # 设备名称关键词
+    map_zoom: int = 12  # 点位图缩放级别，决定设备坐标的聚合粒度
 
 @dataclass
 class DeviceLocationResult:
@@ -301,6 +367,8 @@ class AlertsLogResult:
     key_logs_markdown: Optional[str] = None
     # ECharts数据格式
     echarts_data: Optional[List[Dict[str, Any]]] = None
+    # 最近24小时各类型网络事件数（来自本地事件日志）
+    network_event_types: Optional[Dict[str, int]] = None
 
 # ==================== 复杂工作流数据类定义 ====================
 
@@ -349,6 +417,8 @@ class SecurityPostureResult:
     wireless_security_analysis: Optional[Dict[str, Any]] = None
     client_auth_analysis: Optional[Dict[str, Any]] = None
     security_alerts: Optional[List[Dict[str, Any]]] = None
+    # 获取失败的数据项 -> 错误信息（与“未配置”区分：未配置时数据为空且不在此处）
+    data_errors: Optional[Dict[str, str]] = None
     
     # ECharts数据格式 - 4个图表
     echarts_data: Optional[List[Dict[str, Any]]] = None
@@ -380,6 +450,8 @@ class TroubleshootingInput:
     """运维故障诊断工作流输入"""
     org_id: str
     device_serial: Optional[str] = None  # 可选，指定设备
+    history_hours: int = 72  # 性能历史的时间范围（小时）
+    probe_ip: str = "8.8.8.8"  # 丢包/延迟探测的目标IP（本地尚无该设备历史时用于采集）
 
 @dataclass
 class TroubleshootingResult:
@@ -396,6 +468,32 @@ class TroubleshootingResult:
     # ECharts数据格式 - 2个图表
     echarts_data: Optional[List[Dict[str, Any]]] = None
 
+@dataclass
+class InventorySyncInput:
+    """本地库存镜像同步工作流输入"""
+    org_id: str = "850617379619606726"
+    interval_seconds: int = 900  # 两次同步之间的间隔
+    syncs_per_run: int = 48  # 同步多少次后 continue-as-new，限制单次运行的历史长度
+    sweep_clients: bool = True  # 同步后扫描各网络客户端，更新客户端MAC索引
+    client_timespan: int = 86400  # 扫描最近多少秒内出现过的客户端
+
+@dataclass
+class UplinkHistoryInput:
+    """上行链路丢包/延迟采集工作流输入"""
+    org_id: str = "850617379619606726"
+    ip: str = "8.8.8.8"  # 探测的目标IP
+    interval_seconds: int = 600  # 两次采集之间的间隔
+    collections_per_run: int = 144  # 采集多少次后 continue-as-new
+
+@dataclass
+class NetworkEventsIngestInput:
+    """网络事件增量采集工作流输入"""
+    org_id: str = "850617379619606726"
+    product_types: Optional[List[str]] = None  # 只采集这些产品类型，None表示网络的全部 productTypes
+    backfill_seconds: int = 86400  # 事件流首次采集时回溯的秒数
+    interval_seconds: int = 300  # 两次采集之间的间隔
+    collections_per_run: int = 288  # 采集多少次后 continue-as-new
+
 # ==================== 原有Workflow 定义 ====================
 
 @workflow.defn
@@ -431,13 +529,13 @@ class DeviceStatusWorkflow:
             
             devices_task = workflow.execute_activity_method(
                 meraki_activities.get_organization_devices,
-                input.org_id,
+                args=[input.org_id, "identity"],
                 start_to_close_timeout=timedelta(seconds=60),
             )
             
             alerts_task = workflow.execute_activity_method(
                 meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+                args=[input.org_id, "alert"],
                 start_to_close_timeout=timedelta(seconds=45),
             )
             
@@ -601,20 +699,13 @@ class APDeviceQueryWorkflow:
             from meraki import MerakiActivities
             meraki_activities = MerakiActivities()
             
-            # 搜索包含关键词的设备
-            all_devices = await workflow.execute_activity_method(
-                meraki_activities.get_organization_devices,
-                input.org_id,
+            # 在Worker内的设备搜索索引中查询（按匹配程度排序，只取前10个）
+            search_result = await workflow.execute_activity_method(
+                meraki_activities.search_devices,
+                args=[input.org_id, input.search_keyword, 0, 10, "identity"],
                 start_to_close_timeout=timedelta(seconds=60),
             )
-            
-            # 在工作流中过滤包含关键词的设备
-            devices = []
-            search_keyword_lower = input.search_keyword.lower()
-            for device in all_devices:
-                device_name = (device.get("name") or "").lower()
-                if search_keyword_lower in device_name:
-                    devices.append(device)
+            devices = search_result["items"]
             
             # 构建匹配设备列表
             matched_devices_list = []
@@ -652,6 +743,13 @@ class APDeviceQueryWorkflow:
                     "tags": device_detail.get("tags", [])
                 })
             
+            # 全部匹配设备（不只是前10个）的坐标在Worker内按缩放级别聚合
+            device_clusters = await workflow.execute_activity_method(
+                meraki_activities.cluster_devices,
+                args=[input.org_id, input.map_zoom, None, input.search_keyword],
+                start_to_close_timeout=timedelta(seconds=60),
+            )
+            
             # 统计设备型号分布
             model_counts = {}
             for device in matched_devices_list:
@@ -773,9 +871,9 @@ class APDeviceQueryWorkflow:
                             "name": "AP设备",
                             "type": "scatter",
                             "data": [
-                                [device["location"]["lng"], device["location"]["lat"], device["name"]]
-                                for device in selected_devices_details 
-                                if device["location"]["lat"] and device["location"]["lng"]
+                                [cluster["lng"], cluster["lat"],
+                                 cluster.get("name") or f"{cluster['count']}台设备", cluster["count"]]
+                                for cluster in device_clusters["clusters"]
                             ],
                             "symbolSize": 12,
                             "itemStyle": {
@@ -800,7 +898,7 @@ class APDeviceQueryWorkflow:
             return APDeviceQueryResult(
                 query_keyword=input.search_keyword,
                 search_summary={
-                    "total_matched": len(devices),
+                    "total_matched": search_result["total"],
                     "details_retrieved": len(selected_devices_details),
                     "search_scope": "全组织设备"
                 },
@@ -808,7 +906,7 @@ class APDeviceQueryWorkflow:
                 selected_devices_details=selected_devices_details,
                 user_interaction={
                     "action": "用户可从匹配列表中选择任意设备查看详情",
-                    "available_selections": len(devices),
+                    "available_selections": search_result["total"],
                     "demonstration_count": len(selected_devices_details)
                 },
                 query_time=workflow.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -848,26 +946,36 @@ class ClientCountWorkflow:
             # 获取所有网络
             networks = await workflow.execute_activity_method(
                 meraki_activities.get_organization_networks,
-                input.org_id,
+                args=[input.org_id, False, "network"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
             
-            # 并发获取每个网络的客户端概览
+            # 并发获取每个网络的客户端概览（并发窗口内同时调度，总耗时接近最慢的单个调用）
             networks_breakdown = []
             total_clients = 0
             total_heavy_usage = 0
             networks_with_clients = 0
             
-            for network in networks:
-                network_id = network.get("id", "")
-                network_name = network.get("name", "")
-                
-                try:
-                    client_overview = await workflow.execute_activity_method(
+            client_overviews = await gather_with_concurrency(
+                input.max_concurrency,
+                [
+                    lambda network_id=network.get("id", ""): workflow.execute_activity_method(
                         meraki_activities.get_network_clients_overview,
                         network_id,
                         start_to_close_timeout=timedelta(seconds=30),
                     )
+                    for network in networks
+                ],
+                return_exceptions=True,
+            )
+            
+            for network, client_overview in zip(networks, client_overviews):
+                network_id = network.get("id", "")
+                network_name = network.get("name", "")
+                
+                try:
+                    if isinstance(client_overview, BaseException):
+                        raise client_overview
                     
                     client_count = client_overview.get("counts", {}).get("total", 0)
                     heavy_usage_count = client_overview.get("counts", {}).get("withHeavyUsage", 0)
@@ -1052,12 +1160,14 @@ class FirmwareSummaryWorkflow:
             from meraki import MerakiActivities
             meraki_activities = MerakiActivities()
             
-            # 获取所有设备
-            devices = await workflow.execute_activity_method(
-                meraki_activities.get_organization_devices,
-                input.org_id,
+            # 获取所有设备：大型组织的设备清单逐页落盘，再按页读取，避免单个payload过大
+            handle = await workflow.execute_activity_method(
+                meraki_activities.get_organization_devices_paged,
+                args=[input.org_id, 1000, "firmware"],
                 start_to_close_timeout=timedelta(seconds=120),
+                heartbeat_timeout=timedelta(seconds=60),
             )
+            devices = await read_spilled_items(meraki_activities, handle)
             
             # 按型号分组统计固件版本
             model_firmware_breakdown = {}
@@ -1224,12 +1334,14 @@ class LicenseDetailsWorkflow:
             from meraki import MerakiActivities
             meraki_activities = MerakiActivities()
             
-            # 获取许可证概览（Co-termination licensing模式）
-            license_overview = await workflow.execute_activity_method(
-                meraki_activities.get_organization_licenses_overview,
-                input.org_id,
+            # 获取许可证概览（Co-termination licensing模式）：直通Activity原样返回响应体，
+            # Worker端不解码、不重新编码，由Workflow在使用时解码一次
+            raw_overview = await workflow.execute_activity_method(
+                meraki_activities.get_endpoint_raw,
+                args=[f"/organizations/{input.org_id}/licenses/overview"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
+            license_overview = workflow.payload_converter().from_payload(raw_overview.payload) or {}
             
             # 基于概览数据分析许可证状态
             license_analysis = {
@@ -1373,20 +1485,20 @@ class DeviceInspectionWorkflow:
             )
             
             alerts_task = workflow.execute_activity_method(
-                meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+                meraki_activities.summarize_organization_alerts,
+                args=[input.org_id, 5],
                 start_to_close_timeout=timedelta(seconds=60),
             )
             
             networks_task = workflow.execute_activity_method(
                 meraki_activities.get_organization_networks,
-                input.org_id,
+                args=[input.org_id, False, "network"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
             
             # 等待所有任务完成
             status_overview = await status_overview_task
-            alerts = await alerts_task
+            alert_summary = await alerts_task
             networks = await networks_task
             
             # 分析设备状态
@@ -1405,15 +1517,17 @@ class DeviceInspectionWorkflow:
                 "status_distribution": counts
             }
             
-            # 分析告警
-            critical_alerts = [alert for alert in alerts if alert.get("severity") == "critical"]
+            # 分析告警（Activity内已一次遍历聚合）
+            critical_count = alert_summary["by_severity"]["critical"]
             alerts_analysis = {
-                "total_alerts": len(alerts),
-                "critical_alerts": len(critical_alerts),
-                "warning_alerts": len([a for a in alerts if a.get("severity") == "warning"]),
-                "info_alerts": len([a for a in alerts if a.get("severity") == "info"]),
-                "recent_critical_alerts": critical_alerts[:5],  # 前5个严重告警
-                "alert_categories": list(set(alert.get("categoryType", "unknown") for alert in alerts))
+                "total_alerts": alert_summary["total"],
+                "critical_alerts": critical_count,
+                "warning_alerts": alert_summary["by_severity"]["warning"],
+                "info_alerts": alert_summary["by_severity"]["info"],
+                "unresolved_alerts": alert_summary["unresolved"],
+                "recent_critical_alerts": alert_summary["critical_alerts"],  # 前5个严重告警
+                "alert_categories": sorted(alert_summary["by_category"]),
+                "alerts_by_device_type": alert_summary["by_device_type"],
             }
             
             # 网络事件分析（简化版）
@@ -1427,9 +1541,9 @@ class DeviceInspectionWorkflow:
             # 健康评估
             health_assessment = {
                 "overall_health": "良好" if health_percentage > 95 else "需要关注",
-                "critical_issues": len(critical_alerts),
+                "critical_issues": critical_count,
                 "devices_needing_attention": counts.get("offline", 0) + counts.get("alerting", 0),
-                "network_stability": "稳定" if len(critical_alerts) < 5 else "不稳定"
+                "network_stability": "稳定" if critical_count < 5 else "不稳定"
             }
             
             # 建议
@@ -1442,7 +1556,7 @@ class DeviceInspectionWorkflow:
                 recommendations["immediate_actions"].append(f"检查 {counts['offline']} 台离线设备")
             if counts.get("alerting", 0) > 0:
                 recommendations["immediate_actions"].append(f"处理 {counts['alerting']} 台告警设备")
-            if len(critical_alerts) > 0:
+            if critical_count > 0:
                 recommendations["immediate_actions"].append("优先处理严重告警")
             
             # 生成ECharts雷达图数据格式
@@ -1499,7 +1613,7 @@ class DeviceInspectionWorkflow:
                                 "value": [
                                     device_status_analysis.get("health_percentage", 0),
                                     100 if health_assessment.get("network_stability") == "稳定" else 50,
-                                    max(0, 100 - len(critical_alerts) * 10),
+                                    max(0, 100 - critical_count * 10),
                                     device_status_analysis.get("health_percentage", 0),
                                     80  # 默认响应速度
                                 ],
@@ -1578,72 +1692,115 @@ class FloorplanAPWorkflow:
             # 获取所有网络
             networks = await workflow.execute_activity_method(
                 meraki_activities.get_organization_networks,
-                input.org_id,
+                args=[input.org_id, False, "network"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
             
-            # 查找有楼层平面图的网络
+            network_ids = [network.get("id", "") for network in networks]
             available_floorplans = []
+            candidates = []  # 符合楼层名称条件的楼层平面图，按网络顺序排列
+            
+            # 第一阶段：先查Worker内的楼层平面图索引；指定楼层名称时只返回名称匹配的楼层，
+            # 命中即直接定位到所在网络，不再逐个网络查询
+            indexed = await workflow.execute_activity_method(
+                meraki_activities.find_floor_plans,
+                args=[network_ids, input.floor_name],
+                start_to_close_timeout=timedelta(seconds=10),
+            )
+            floorplans_by_network = {}
+            for entry in indexed["floorplans"]:
+                floorplans_by_network.setdefault(entry["network_id"], []).append(entry)
+            
+            def collect(network_list):
+                # 按网络顺序汇总楼层平面图，并筛选符合楼层名称条件的候选
+                for network in network_list:
+                    for entry in floorplans_by_network.get(network.get("id", ""), []):
+                        floorplan_info = {"network_name": network.get("name", ""), **entry}
+                        available_floorplans.append(floorplan_info)
+                        if (not input.floor_name or
+                                input.floor_name.lower() in floorplan_info["floorplan_name"].lower()):
+                            candidates.append(floorplan_info)
+            
+            async def list_floorplans(network_list):
+                results = await gather_with_concurrency(
+                    input.max_concurrency,
+                    [
+                        lambda network_id=network.get("id", ""): workflow.execute_activity_method(
+                            meraki_activities.get_network_floorplans,
+                            args=[network_id, False, ["floorPlanId", "name", "imageUrl"]],
+                            start_to_close_timeout=timedelta(seconds=30),
+                        )
+                        for network in network_list
+                    ],
+                    return_exceptions=True,
+                )
+                for network, floorplans in zip(network_list, results):
+                    if isinstance(floorplans, BaseException):
+                        # 网络没有楼层平面图，继续下一个
+                        continue
+                    floorplans_by_network[network.get("id", "")] = [
+                        {
+                            "network_id": network.get("id", ""),
+                            "floorplan_id": floorplan.get("floorPlanId", ""),
+                            "floorplan_name": floorplan.get("name", ""),
+                            "image_url": floorplan.get("imageUrl", "")
+                        }
+                        for floorplan in floorplans
+                    ]
+            
+            # 第二阶段：查询索引未覆盖（冷启动或部分过期）的网络
+            missing_network_ids = set(indexed["missing_network_ids"])
+            missing_networks = [network for network in networks if network.get("id", "") in missing_network_ids]
+            if input.floor_name:
+                # 指定了楼层名称：索引命中则直接使用；否则按网络顺序分批并发查询，找到匹配的那一批后提前停止
+                collect(networks)
+                window = max(1, input.max_concurrency)
+                for batch_start in range(0, len(missing_networks), window):
+                    if candidates:
+                        break
+                    batch = missing_networks[batch_start:batch_start + window]
+                    await list_floorplans(batch)
+                    collect(batch)
+            else:
+                # 未指定楼层名称：图表需要全部楼层平面图，一次性在并发窗口内查询所有未覆盖的网络
+                await list_floorplans(missing_networks)
+                collect(networks)
+            
+            # 第三阶段：获取第一个可用的候选楼层详情并提取AP分布
             selected_floorplan = {}
             ap_distribution = []
-            
-            for network in networks:
-                network_id = network.get("id", "")
+            for candidate in candidates:
                 try:
-                    floorplans = await workflow.execute_activity_method(
-                        meraki_activities.get_network_floorplans,
-                        network_id,
+                    floorplan_detail = await workflow.execute_activity_method(
+                        meraki_activities.get_floor_plan_by_id,
+                        args=[candidate["network_id"], candidate["floorplan_id"]],
                         start_to_close_timeout=timedelta(seconds=30),
                     )
-                    
-                    for floorplan in floorplans:
-                        floorplan_info = {
-                            "network_name": network.get("name", ""),
-                            "network_id": network_id,
-                            "floorplan_id": floorplan.get("floorPlanId", ""),
-                            "floorplan_name": floorplan.get("name", ""),
-                            "image_url": floorplan.get("imageUrl", "")
-                        }
-                        available_floorplans.append(floorplan_info)
-                        
-                        # 如果指定了楼层名称过滤或选择第一个
-                        if (not selected_floorplan and 
-                            (not input.floor_name or input.floor_name.lower() in floorplan.get("name", "").lower())):
-                            
-                            # 获取楼层详情
-                            floorplan_detail = await workflow.execute_activity_method(
-                                meraki_activities.get_floor_plan_by_id,
-                                network_id,
-                                floorplan.get("floorPlanId", ""),
-                                start_to_close_timeout=timedelta(seconds=30),
-                            )
-                            
-                            selected_floorplan = {
-                                "floorplan_id": floorplan.get("floorPlanId", ""),
-                                "name": floorplan.get("name", ""),
-                                "image_url": floorplan_detail.get("imageUrl", ""),
-                                "network_name": network.get("name", ""),
-                                "network_id": network_id
-                            }
-                            
-                            # 提取AP分布信息
-                            devices = floorplan_detail.get("devices", [])
-                            for device in devices:
-                                ap_distribution.append({
-                                    "name": device.get("name", ""),
-                                    "serial": device.get("serial", ""),
-                                    "model": device.get("model", ""),
-                                    "location": {
-                                        "lat": device.get("lat"),
-                                        "lng": device.get("lng")
-                                    },
-                                    "lan_ip": device.get("lanIp", ""),
-                                    "tags": device.get("tags", [])
-                                })
-                
                 except Exception:
-                    # 网络没有楼层平面图，继续下一个
                     continue
+                
+                selected_floorplan = {
+                    "floorplan_id": candidate["floorplan_id"],
+                    "name": candidate["floorplan_name"],
+                    "image_url": floorplan_detail.get("imageUrl", ""),
+                    "network_name": candidate["network_name"],
+                    "network_id": candidate["network_id"]
+                }
+                
+                # 提取AP分布信息
+                for device in floorplan_detail.get("devices", []):
+                    ap_distribution.append({
+                        "name": device.get("name", ""),
+                        "serial": device.get("serial", ""),
+                        "model": device.get("model", ""),
+                        "location": {
+                            "lat": device.get("lat"),
+                            "lng": device.get("lng")
+                        },
+                        "lan_ip": device.get("lanIp", ""),
+                        "tags": device.get("tags", [])
+                    })
+                break
             
             # 生成ECharts树图数据格式
             echarts_data = [
@@ -1734,20 +1891,26 @@ class DeviceLocationWorkflow:
             from meraki import MerakiActivities
             meraki_activities = MerakiActivities()
             
-            # 搜索包含关键词的设备
-            all_devices = await workflow.execute_activity_method(
-                meraki_activities.get_organization_devices,
-                input.org_id,
-                start_to_close_timeout=timedelta(seconds=60),
+            # 优先在Worker本地库存镜像中按名称搜索设备（毫秒级）
+            devices = await workflow.execute_activity_method(
+                meraki_activities.find_inventory_devices,
+                args=[input.org_id, input.search_keyword, "identity"],
+                start_to_close_timeout=timedelta(seconds=10),
             )
             
-            # 在工作流中过滤包含关键词的设备
-            devices = []
-            search_keyword_lower = input.search_keyword.lower()
-            for device in all_devices:
-                device_name = (device.get("name") or "").lower()
-                if search_keyword_lower in device_name:
-                    devices.append(device)
+            if devices is None:
+                # 镜像尚未同步或已过旧，回退到云端API并在工作流中过滤包含关键词的设备
+                all_devices = await workflow.execute_activity_method(
+                    meraki_activities.get_organization_devices,
+                    args=[input.org_id, "identity"],
+                    start_to_close_timeout=timedelta(seconds=60),
+                )
+                devices = []
+                search_keyword_lower = input.search_keyword.lower()
+                for device in all_devices:
+                    device_name = (device.get("name") or "").lower()
+                    if search_keyword_lower in device_name:
+                        devices.append(device)
             
             # 构建匹配设备列表
             matched_devices = []
@@ -1790,8 +1953,7 @@ class DeviceLocationWorkflow:
                     try:
                         floorplan_detail = await workflow.execute_activity_method(
                             meraki_activities.get_floor_plan_by_id,
-                            network_id,
-                            floor_plan_id,
+                            args=[network_id, floor_plan_id],
                             start_to_close_timeout=timedelta(seconds=30),
                         )
                         
@@ -1808,6 +1970,14 @@ class DeviceLocationWorkflow:
                 
                 selected_device_locations.append(location_info)
             
+            # 全部匹配设备的坐标在Worker内按缩放级别聚合，设备再多图表也只有少量点
+            device_clusters = await workflow.execute_activity_method(
+                meraki_activities.cluster_devices,
+                args=[input.org_id, input.map_zoom, None, None,
+                      [device.get("serial") for device in devices if device.get("serial")]],
+                start_to_close_timeout=timedelta(seconds=60),
+            )
+            
             # 生成ECharts散点图数据格式
             echarts_data = [
                 {
@@ -1825,9 +1995,9 @@ class DeviceLocationWorkflow:
                             "name": "设备位置",
                             "type": "scatter",
                             "data": [
-                                [loc["location"]["lng"], loc["location"]["lat"], loc["name"]]
-                                for loc in selected_device_locations 
-                                if loc["location"]["lat"] and loc["location"]["lng"]
+                                [cluster["lng"], cluster["lat"],
+                                 cluster.get("name") or f"{cluster['count']}台设备", cluster["count"]]
+                                for cluster in device_clusters["clusters"]
                             ],
                             "symbolSize": 12,
                             "itemStyle": {
@@ -1896,7 +2066,7 @@ class LostDeviceTraceWorkflow:
                 # 获取所有网络
                 networks = await workflow.execute_activity_method(
                     meraki_activities.get_organization_networks,
-                    input.org_id,
+                    args=[input.org_id, False, "network"],
                     start_to_close_timeout=timedelta(seconds=30),
                 )
                 
@@ -1904,12 +2074,10 @@ class LostDeviceTraceWorkflow:
                 for network in networks:
                     network_id = network.get("id", "")
                     try:
+                        # use_pagination=False, per_page=5（限制数量）, 24小时内
                         clients = await workflow.execute_activity_method(
                             meraki_activities.get_network_clients,
-                            network_id,
-                            False,  # use_pagination
-                            5,  # per_page - 限制数量
-                            timespan=86400,  # 24小时内
+                            args=[network_id, False, 5, "client", 86400],
                             start_to_close_timeout=timedelta(seconds=30),
                         )
                         
@@ -1932,9 +2100,7 @@ class LostDeviceTraceWorkflow:
                             try:
                                 connection_stats = await workflow.execute_activity_method(
                                     meraki_activities.get_network_wireless_client_connection_stats,
-                                    network_id,
-                                    client_id,
-                                    timespan=86400,  # 24小时
+                                    args=[network_id, client_id, 86400],  # 24小时
                                     start_to_close_timeout=timedelta(seconds=30),
                                 )
                                 
@@ -1962,87 +2128,71 @@ class LostDeviceTraceWorkflow:
                         # 网络客户端获取失败，继续下一个网络
                         continue
             else:
-                # 指定了MAC地址，直接查找该设备
-                networks = await workflow.execute_activity_method(
-                    meraki_activities.get_organization_networks,
-                    input.org_id,
+                # 指定了MAC地址，通过客户端MAC索引（未命中时为一次组织级客户端搜索）直接定位所在网络
+                location = await workflow.execute_activity_method(
+                    meraki_activities.locate_client,
+                    args=[input.org_id, input.client_mac],
                     start_to_close_timeout=timedelta(seconds=30),
                 )
                 
-                # 在所有网络中查找指定MAC地址的设备
-                for network in networks:
-                    network_id = network.get("id", "")
-                    try:
-                        clients = await workflow.execute_activity_method(
-                            meraki_activities.get_network_clients,
-                            network_id,
-                            False,  # use_pagination
-                            100,  # per_page - 增加数量以便查找
-                            timespan=86400 * 7,  # 7天内的历史
+                if location:
+                    network_id = location["network_id"]
+                    network_name = location.get("network_name")
+                    if not network_name:
+                        networks = await workflow.execute_activity_method(
+                            meraki_activities.get_organization_networks,
+                            args=[input.org_id, False, "network"],
                             start_to_close_timeout=timedelta(seconds=30),
                         )
-                        
-                        # 查找匹配的MAC地址
-                        for client in clients:
-                            if client.get("mac", "").lower() == input.client_mac.lower():
-                                discovered_clients.append({
-                                    "index": 1,
-                                    "mac": client.get("mac", ""),
-                                    "description": client.get("description", input.client_description),
-                                    "client_id": client.get("id", ""),
-                                    "network_name": network.get("name", ""),
-                                    "network_id": network_id
-                                })
-                                
-                                # 获取连接统计
-                                client_id = client.get("id", "")
-                                try:
-                                    connection_stats = await workflow.execute_activity_method(
-                                        meraki_activities.get_network_wireless_client_connection_stats,
-                                        network_id,
-                                        client_id,
-                                        timespan=86400 * 7,  # 7天历史
-                                        start_to_close_timeout=timedelta(seconds=30),
-                                    )
-                                    
-                                    selected_client_trace = {
-                                        "mac": client.get("mac", ""),
-                                        "description": client.get("description", input.client_description),
-                                        "network_name": network.get("name", ""),
-                                        "connection_stats": connection_stats.get("connectionStats", {})
-                                    }
-                                    
-                                    # 模拟连接历史数据
-                                    connection_history = [
-                                        {
-                                            "timestamp": "2025-09-22 10:00:00",
-                                            "event": "设备连接",
-                                            "description": f"设备 {input.client_mac} 连接到网络 {network.get('name', '')}"
-                                        },
-                                        {
-                                            "timestamp": "2025-09-22 12:00:00", 
-                                            "event": "设备活跃",
-                                            "description": f"设备在网络中保持活跃状态"
-                                        }
-                                    ]
-                                    
-                                except Exception:
-                                    # 连接统计获取失败，使用基本信息
-                                    selected_client_trace = {
-                                        "mac": client.get("mac", ""),
-                                        "description": client.get("description", input.client_description),
-                                        "network_name": network.get("name", ""),
-                                        "connection_stats": {}
-                                    }
-                                
-                                break  # 找到匹配的设备，退出循环
-                        
-                        if selected_client_trace:  # 如果找到了设备，退出网络循环
-                            break
-                            
-                    except Exception:
-                        # 网络客户端获取失败，继续下一个网络
-                        continue
+                        network_name = next((n.get("name", "") for n in networks if n.get("id") == network_id), "")
+                    
+                    client_id = location.get("client_id") or ""
+                    description = location.get("description", input.client_description)
+                    discovered_clients.append({
+                        "index": 1,
+                        "mac": location["mac"],
+                        "description": description,
+                        "client_id": client_id,
+                        "network_name": network_name,
+                        "network_id": network_id,
+                        "ap_serial": location.get("ap_serial"),
+                        "ap_name": location.get("ap_name"),
+                    })
+                    
+                    # 获取连接统计（索引或搜索结果没有客户端ID时跳过，避免请求 /wireless/clients//connectionStats）
+                    connection_stats = {}
+                    if client_id:
+                        try:
+                            connection_stats = await workflow.execute_activity_method(
+                                meraki_activities.get_network_wireless_client_connection_stats,
+                                args=[network_id, client_id, 86400 * 7],  # 7天历史
+                                start_to_close_timeout=timedelta(seconds=30),
+                            )
+                            connection_stats = connection_stats.get("connectionStats", {})
+                        except Exception:
+                            # 连接统计获取失败，使用基本信息
+                            connection_stats = {}
+                    
+                    selected_client_trace = {
+                        "mac": location["mac"],
+                        "description": description,
+                        "network_name": network_name,
+                        "last_ap_serial": location.get("ap_serial"),
+                        "last_ap_name": location.get("ap_name"),
+                        "connection_stats": connection_stats
+                    }
+                    
+                    # 最近一次出现的时间和位置
+                    if location.get("last_seen"):
+                        connection_history = [
+                            {
+                                "timestamp": datetime.fromtimestamp(location["last_seen"], timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                                "event": "最后出现",
+                                "connected": True,
+                                "description": f"设备 {location['mac']} 最后出现在网络 {network_name}"
+                                               + (f" 的AP {location.get('ap_name') or location['ap_serial']}" if location.get("ap_serial") else "")
+                            }
+                        ]
             
             # 生成ECharts时间轴数据格式
             echarts_data = [
@@ -2128,66 +2278,77 @@ class AlertsLogWorkflow:
             from meraki import MerakiActivities
             meraki_activities = MerakiActivities()
             
-            # 获取组织告警
-            alerts = await workflow.execute_activity_method(
-                meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+            # 获取组织告警（Activity内一次遍历聚合，只返回计数、矩阵和前10个严重告警）
+            alert_summary = await workflow.execute_activity_method(
+                meraki_activities.summarize_organization_alerts,
+                args=[input.org_id, 10],
                 start_to_close_timeout=timedelta(seconds=60),
             )
-            
-            # 分析告警
-            critical_alerts = [alert for alert in alerts if alert.get("severity") == "critical"]
-            warning_alerts = [alert for alert in alerts if alert.get("severity") == "warning"]
-            info_alerts = [alert for alert in alerts if alert.get("severity") == "info"]
+            critical_alerts = alert_summary["critical_alerts"]
             
             alerts_summary = {
-                "total_alerts": len(alerts),
-                "critical_count": len(critical_alerts),
-                "warning_count": len(warning_alerts),
-                "info_count": len(info_alerts),
-                "unresolved_count": len([a for a in alerts if not a.get("resolvedAt")])
+                "total_alerts": alert_summary["total"],
+                "critical_count": alert_summary["by_severity"]["critical"],
+                "warning_count": alert_summary["by_severity"]["warning"],
+                "info_count": alert_summary["by_severity"]["info"],
+                "unresolved_count": alert_summary["unresolved"],
+                "unresolved_by_severity": alert_summary["unresolved_by_severity"],
+                "by_network": alert_summary["by_network"],
+                "by_device_type": alert_summary["by_device_type"],
             }
             
             # 提取告警类别
-            alert_categories = list(set(alert.get("categoryType", "unknown") for alert in alerts))
+            alert_categories = sorted(alert_summary["by_category"])
             
-            # 获取网络事件样本（简化版）
+            # 网络事件从Worker本地事件日志读取（由 NetworkEventsIngestWorkflow 增量采集），不重复下载
             network_events_sample = []
+            network_event_types: Dict[str, int] = {}
             try:
                 networks = await workflow.execute_activity_method(
                     meraki_activities.get_organization_networks,
-                    input.org_id,
+                    args=[input.org_id, False, "network"],
                     start_to_close_timeout=timedelta(seconds=30),
                 )
+                network_ids = [network["id"] for network in networks if network.get("id")]
+                since = workflow.now().timestamp() - 86400
                 
-                # 从第一个网络获取事件样本
-                if networks:
-                    first_network = networks[0]
-                    network_id = first_network.get("id", "")
-                    
-                    events = await workflow.execute_activity_method(
-                        meraki_activities.get_network_events,
-                        network_id,
-                        False,  # use_pagination
-                        3,  # per_page
-                        timespan=3600,  # 1小时
-                        productType="wireless",
+                event_log = await workflow.execute_activity_method(
+                    meraki_activities.query_network_events,
+                    args=[network_ids, None, since, None, None, 1000],
+                    start_to_close_timeout=timedelta(seconds=30),
+                )
+                if not event_log["streams"] and networks:
+                    # 尚未采集过：只采集第一个网络最近1小时的事件，之后由后台采集
+                    await workflow.execute_activity_method(
+                        meraki_activities.ingest_network_events,
+                        args=[networks[:1], None, 3600, 1],
+                        start_to_close_timeout=timedelta(seconds=60),
+                        heartbeat_timeout=timedelta(seconds=30),
+                    )
+                    event_log = await workflow.execute_activity_method(
+                        meraki_activities.query_network_events,
+                        args=[network_ids, None, since, None, None, 1000],
                         start_to_close_timeout=timedelta(seconds=30),
                     )
-                    
-                    network_events_sample = events[:3] if events else []
+                
+                events = event_log["events"]
+                for event in events:
+                    event_type = event.get("type", "unknown")
+                    network_event_types[event_type] = network_event_types.get(event_type, 0) + 1
+                network_events_sample = events[:3]
                     
             except Exception:
                 # 网络事件获取失败，使用空列表
                 pass
             
-            # 生成ECharts热力图数据格式
-            severity_category_matrix = {}
-            for alert in critical_alerts:
-                category = alert.get("categoryType", "unknown")
-                severity = alert.get("severity", "unknown")
-                key = f"{category}-{severity}"
-                severity_category_matrix[key] = severity_category_matrix.get(key, 0) + 1
+            # 生成ECharts热力图数据格式（严重程度 × 类别矩阵）
+            severity_levels = ["critical", "warning", "info"]
+            severity_category_matrix = alert_summary["severity_by_category"]
+            heatmap_data = [
+                [i, j, severity_category_matrix.get(severity, {}).get(category, 0)]
+                for i, category in enumerate(alert_categories)
+                for j, severity in enumerate(severity_levels)
+            ]
             
             echarts_data = [
                 {
@@ -2199,17 +2360,17 @@ class AlertsLogWorkflow:
                         "grid": {"left": "8%", "right": "8%", "bottom": "15%", "containLabel": True},
                         "xAxis": {
                             "type": "category",
-                            "data": list(set([alert.get("categoryType", "unknown") for alert in critical_alerts])),
+                            "data": alert_categories,
                             "splitArea": {"show": True}
                         },
                         "yAxis": {
                             "type": "category",
-                            "data": ["critical", "warning", "info"],
+                            "data": severity_levels,
                             "splitArea": {"show": True}
                         },
                         "visualMap": {
                             "min": 0,
-                            "max": max(severity_category_matrix.values()) if severity_category_matrix else 1,
+                            "max": max([cell[2] for cell in heatmap_data] or [1]),
                             "calculable": True,
                             "orient": "horizontal",
                             "left": "center",
@@ -2224,11 +2385,7 @@ class AlertsLogWorkflow:
                         "series": [{
                             "name": "告警数量",
                             "type": "heatmap",
-                            "data": [
-                                [i, j, severity_category_matrix.get(f"{cat}-{sev}", 0)]
-                                for i, cat in enumerate(set([alert.get("categoryType", "unknown") for alert in critical_alerts]))
-                                for j, sev in enumerate(["critical", "warning", "info"])
-                            ],
+                            "data": heatmap_data,
                             "label": {"show": True}
                         }]
                     }
@@ -2242,10 +2399,11 @@ class AlertsLogWorkflow:
                 organization_name="Concordia",
                 organization_id=input.org_id,
                 alerts_summary=alerts_summary,
-                critical_alerts=critical_alerts[:10],  # 前10个严重告警
+                critical_alerts=critical_alerts,  # 前10个严重告警
                 network_events_sample=network_events_sample,
                 alert_categories=alert_categories,
                 query_time=workflow.now().strftime("%Y-%m-%d %H:%M:%S"),
+                network_event_types=network_event_types,
                 success=True,
                 key_logs_markdown=key_logs_markdown,
                 echarts_data=force_clean_text_style(echarts_data)
@@ -2348,7 +2506,7 @@ class NetworkHealthAnalysisWorkflow:
     
     🔄 多Activity组合:
     1. get_device_statuses_overview - 设备状态
-    2. get_organization_assurance_alerts - 告警分析
+    2. summarize_organization_alerts - 告警分析（Activity内一次遍历聚合）
     3. get_organization_networks + get_network_clients_overview - 客户端分布
     4. 综合计算健康评分
     """
@@ -2368,20 +2526,20 @@ class NetworkHealthAnalysisWorkflow:
             )
             
             alerts_task = workflow.execute_activity_method(
-                meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+                meraki_activities.summarize_organization_alerts,
+                args=[input.org_id, 0],
                 start_to_close_timeout=timedelta(seconds=60),
             )
             
             networks_task = workflow.execute_activity_method(
                 meraki_activities.get_organization_networks,
-                input.org_id,
+                args=[input.org_id, False, "network"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
             
             # 等待基础数据
             device_status = await device_status_task
-            alerts = await alerts_task
+            alert_summary = await alerts_task
             networks = await networks_task
             
             # 第二阶段：分析设备状态
@@ -2401,15 +2559,14 @@ class NetworkHealthAnalysisWorkflow:
             
             # 第四阶段：分析告警
             alert_analysis = {
-                "total_alerts": len(alerts),
-                "critical_alerts": len([a for a in alerts if a.get("severity") == "critical"]),
-                "warning_alerts": len([a for a in alerts if a.get("severity") == "warning"]),
-                "by_type": {}
+                "total_alerts": alert_summary["total"],
+                "critical_alerts": alert_summary["by_severity"]["critical"],
+                "warning_alerts": alert_summary["by_severity"]["warning"],
+                "unresolved_alerts": alert_summary["unresolved"],
+                "by_type": alert_summary["by_type"],
+                "by_device_type": alert_summary["by_device_type"],
             }
-            
-            for alert in alerts:
-                alert_type = alert.get("type", "unknown")
-                alert_analysis["by_type"][alert_type] = alert_analysis["by_type"].get(alert_type, 0) + 1
+            alerts_by_network = alert_summary["by_network"]
             
             # 第五阶段：收集客户端分布数据
             client_distribution = []
@@ -2425,6 +2582,7 @@ class NetworkHealthAnalysisWorkflow:
                         "network_name": network.get("name", ""),
                         "network_id": network.get("id", ""),
                         "client_count": client_count,
+                        "alert_count": alerts_by_network.get(network.get("id", ""), {}).get("total", 0),
                         "product_types": network.get("productTypes", [])
                     })
                 except Exception:
@@ -2433,7 +2591,7 @@ class NetworkHealthAnalysisWorkflow:
             
             # 第六阶段：计算综合健康评分
             device_health_score = (online_devices / total_devices * 100) if total_devices > 0 else 0
-            alert_penalty = min(len(alerts) * 2, 30)  # 每个告警扣2分，最多扣30分
+            alert_penalty = min(alert_summary["total"] * 2, 30)  # 每个告警扣2分，最多扣30分
             client_bonus = min(total_clients / 100, 10)  # 每100个客户端加1分，最多加10分
             
             health_score = max(0, device_health_score - alert_penalty + client_bonus)
@@ -2477,7 +2635,7 @@ class NetworkHealthAnalysisWorkflow:
             }
             
             # 图表2：告警类型柱状图
-            alert_types = list(alert_analysis["by_type"].keys())[:8]  # 前8种类型
+            alert_types = sorted(alert_analysis["by_type"], key=alert_analysis["by_type"].get, reverse=True)[:8]  # 数量最多的8种类型
             alert_counts = [alert_analysis["by_type"][t] for t in alert_types]
             
             chart2 = {
@@ -2606,7 +2764,7 @@ class SecurityPostureWorkflow:
             # 第一阶段：获取网络列表
             networks = await workflow.execute_activity_method(
                 meraki_activities.get_organization_networks,
-                input.org_id,
+                args=[input.org_id, False, "network"],
                 start_to_close_timeout=timedelta(seconds=30),
             )
             
@@ -2621,54 +2779,31 @@ class SecurityPostureWorkflow:
             target_network = target_networks[0]
             network_id = target_network.get("id")
             
-            # 第二阶段：并发获取安全相关数据
-            firewall_task = workflow.execute_activity_method(
-                meraki_activities.get_network_appliance_firewall_l3_rules,
-                network_id,
-                start_to_close_timeout=timedelta(seconds=30)
-            )
-            
-            wireless_task = workflow.execute_activity_method(
-                meraki_activities.get_network_wireless_ssids,
-                network_id,
-                start_to_close_timeout=timedelta(seconds=30)
-            )
-            
-            alerts_task = workflow.execute_activity_method(
-                meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+            # 第二阶段：在一个组合Activity中并发获取安全相关数据（共用一个HTTP会话）
+            bundle = await workflow.execute_activity_method(
+                meraki_activities.get_network_bundle,
+                args=[
+                    network_id,
+                    ["firewall_l3_rules", "wireless_ssids", "assurance_alerts", "clients_overview"],
+                    input.org_id,
+                    {
+                        "wireless_ssids": ["number", "name", "enabled", "authMode", "encryptionMode"],
+                        "assurance_alerts": "alert",
+                    },
+                ],
                 start_to_close_timeout=timedelta(seconds=60),
             )
-            
-            clients_task = workflow.execute_activity_method(
-                meraki_activities.get_network_clients_overview,
-                network_id,
-                start_to_close_timeout=timedelta(seconds=45),
-            )
-            
-            # 等待所有数据，添加错误处理
-            try:
-                firewall_rules = await firewall_task
-            except Exception:
-                firewall_rules = []  # 如果网络不支持防火墙规则，使用空列表
-            
-            try:
-                wireless_ssids = await wireless_task
-            except Exception:
-                wireless_ssids = []
-            
-            try:
-                alerts = await alerts_task
-            except Exception:
-                alerts = []
-            
-            try:
-                clients = await clients_task
-                # 确保clients是字典格式，如果是概览数据则转换
-                if isinstance(clients, dict):
-                    clients = []  # 概览数据不包含客户端列表
-            except Exception:
-                clients = []
+            bundle_data = bundle.get("data", {})
+            
+            # 单个端点失败时使用空数据（如网络不支持防火墙规则），失败原因通过 data_errors 返回
+            firewall_l3 = bundle_data.get("firewall_l3_rules") or {}
+            firewall_rules = firewall_l3.get("rules", []) if isinstance(firewall_l3, dict) else firewall_l3
+            wireless_ssids = bundle_data.get("wireless_ssids") or []
+            alerts = bundle_data.get("assurance_alerts") or []
+            clients = bundle_data.get("clients_overview") or []
+            # 确保clients是字典格式，如果是概览数据则转换
+            if isinstance(clients, dict):
+                clients = []  # 概览数据不包含客户端列表
             
             # 第三阶段：分析防火墙规则
             firewall_analysis = {
@@ -2844,6 +2979,7 @@ class SecurityPostureWorkflow:
                 wireless_security_analysis={"score": wireless_security_score, "total_ssids": total_ssids},
                 client_auth_analysis=auth_analysis,
                 security_alerts=security_alerts,
+                data_errors=bundle.get("errors", {}),
                 echarts_data=[
                     {"type": "tree", "title": "防火墙规则结构", "option": chart1},
                     {"type": "radar", "title": "无线安全评分", "option": chart2},
@@ -2873,7 +3009,7 @@ class TroubleshootingWorkflow:
     🔄 多Activity组合:
     1. get_device_statuses_overview - 设备整体状态
     2. get_organization_assurance_alerts - 告警信息
-    3. get_device_loss_and_latency_history - 性能历史
+    3. query_loss_and_latency - 性能历史（Worker本地时间序列，按时间范围降采样）
     4. get_organization_uplinks_statuses - 上行链路状态
     """
     
@@ -2893,7 +3029,7 @@ class TroubleshootingWorkflow:
             
             alerts_task = workflow.execute_activity_method(
                 meraki_activities.get_organization_assurance_alerts,
-                input.org_id,
+                args=[input.org_id, ["id", "severity"]],
                 start_to_close_timeout=timedelta(seconds=60),
             )
             
@@ -2908,14 +3044,31 @@ class TroubleshootingWorkflow:
             alerts = await alerts_task
             uplinks = await uplinks_task
             
-            # 第二阶段：如果指定了设备，获取设备详细信息
+            # 第二阶段：如果指定了设备，从本地时间序列存储查询最近 history_hours 小时的丢包/延迟
             device_performance = None
             if input.device_serial:
-                device_performance = await workflow.execute_activity_method(
-                    meraki_activities.get_device,
-                    input.device_serial,
+                end_ts = workflow.now().timestamp()
+                query_args = [input.device_serial, end_ts - input.history_hours * 3600, end_ts]
+                history = await workflow.execute_activity_method(
+                    meraki_activities.query_loss_and_latency,
+                    args=query_args,
                     start_to_close_timeout=timedelta(seconds=30),
                 )
+                if not history["series"]:
+                    # 尚未采集过该设备（未运行 UplinkHistoryCollectorWorkflow），先采集一次
+                    await workflow.execute_activity_method(
+                        meraki_activities.collect_loss_and_latency,
+                        args=[input.org_id, input.probe_ip, [input.device_serial], input.history_hours * 3600],
+                        start_to_close_timeout=timedelta(minutes=2),
+                        heartbeat_timeout=timedelta(seconds=60),
+                    )
+                    history = await workflow.execute_activity_method(
+                        meraki_activities.query_loss_and_latency,
+                        args=query_args,
+                        start_to_close_timeout=timedelta(seconds=30),
+                    )
+                # 样本最多的上行链路（query_loss_and_latency 不返回时间范围内没有样本的序列）
+                device_performance = max(history["series"], key=lambda series: sum(series["samples"]), default=None)
             
             # 第三阶段：分析设备健康状况
             device_counts = device_status.get("counts", {}).get("byStatus", {})
@@ -2960,14 +3113,19 @@ class TroubleshootingWorkflow:
                 "performance_score": 0
             }
             
-            if device_performance:
-                latencies = [p.get("latencyMs", 0) for p in device_performance if p.get("latencyMs") is not None]
-                losses = [p.get("lossPercent", 0) for p in device_performance if p.get("lossPercent") is not None]
+            if device_performance and sum(device_performance["samples"]) > 0:
+                # 按每个降采样点的样本数加权平均
+                latencies = [(value, n) for value, n in zip(device_performance["latency_ms"], device_performance["samples"])
+                             if value is not None]
+                losses = [(value, n) for value, n in zip(device_performance["loss_percent"], device_performance["samples"])
+                          if value is not None]
                 
                 if latencies:
-                    performance_metrics["latency_avg"] = sum(latencies) / len(latencies)
+                    performance_metrics["latency_avg"] = sum(v * n for v, n in latencies) / sum(n for _, n in latencies)
                 if losses:
-                    performance_metrics["loss_avg"] = sum(losses) / len(losses)
+                    performance_metrics["loss_avg"] = sum(v * n for v, n in losses) / sum(n for _, n in losses)
+                performance_metrics["uplink"] = device_performance["uplink"]
+                performance_metrics["samples"] = sum(device_performance["samples"])
                 
                 # 性能评分：延迟越低越好，丢包率越低越好
                 latency_score = max(0, 100 - performance_metrics["latency_avg"] / 2)  # 延迟每2ms扣1分
@@ -3034,17 +3192,19 @@ class TroubleshootingWorkflow:
             # 图表2：性能历史时间轴
             timeline_data = []
             if device_performance:
-                for i, perf in enumerate(device_performance[-20:]):  # 最近20个数据点
+                for ts, latency, loss in zip(device_performance["ts"], device_performance["latency_ms"],
+                                             device_performance["loss_percent"]):
                     timeline_data.append({
-                        "name": f"数据点{i+1}",
-                        "value": [i, perf.get("latencyMs", 0), perf.get("lossPercent", 0)]
+                        "name": datetime.fromtimestamp(ts, timezone.utc).strftime("%m-%d %H:%M"),
+                        "latency": latency,
+                        "loss": loss
                     })
             
             chart2 = {
                 "title": {"text": "性能历史趋势", "left": "center"},
                 "tooltip": {"trigger": "axis"},
                 "legend": {"data": ["延迟(ms)", "丢包率(%)"]},
-                "xAxis": {"type": "category", "name": "时间点"},
+                "xAxis": {"type": "category", "name": "时间(UTC)", "data": [d["name"] for d in timeline_data]},
                 "yAxis": [
                     {"type": "value", "name": "延迟(ms)", "position": "left"},
                     {"type": "value", "name": "丢包率(%)", "position": "right"}
@@ -3053,14 +3213,14 @@ class TroubleshootingWorkflow:
                     {
                         "name": "延迟(ms)",
                         "type": "line",
-                        "data": [d["value"][1] for d in timeline_data],
+                        "data": [d["latency"] for d in timeline_data],
                         "itemStyle": {"color": "#9370db"},
                         "yAxisIndex": 0
                     },
                     {
                         "name": "丢包率(%)",
                         "type": "line",
-                        "data": [d["value"][2] for d in timeline_data],
+                        "data": [d["loss"] for d in timeline_data],
                         "itemStyle": {"color": "#8a2be2"},
                         "yAxisIndex": 1
                     }
@@ -3392,3 +3552,128 @@ class CapacityPlanningWorkflow:
                     **get_dark_purple_theme()
                 }]
             )
+
+# ==================== 后台维护Workflow ====================
+
+@workflow.defn
+class InventorySyncWorkflow:
+    """
+    后台工作流: 定期同步Worker本地库存镜像
+    
+    🔄 循环调用 sync_inventory，将组织、网络、设备和库存增量写入本地SQLite镜像，
+    供 APDeviceQueryWorkflow、DeviceLocationWorkflow 等直接查询；
+    sweep_clients 开启时再调用 sweep_network_clients 更新客户端MAC索引，供 LostDeviceTraceWorkflow 定位。
+    每 syncs_per_run 次同步后 continue-as-new，避免历史无限增长。
+    
+    每个组织启动一个实例，建议以固定的 workflow_id（如 inventory-sync-{org_id}）启动以避免重复。
+    """
+    
+    @workflow.run
+    async def run(self, input: InventorySyncInput) -> None:
+        """同步本地库存镜像，直到被取消"""
+        from meraki import MerakiActivities
+        meraki_activities = MerakiActivities()
+        
+        for _ in range(max(1, input.syncs_per_run)):
+            try:
+                await workflow.execute_activity_method(
+                    meraki_activities.sync_inventory,
+                    input.org_id,
+                    start_to_close_timeout=timedelta(minutes=10),
+                    heartbeat_timeout=timedelta(minutes=2),
+                )
+            except Exception as e:
+                # 单次同步失败不终止循环，下个周期重试
+                workflow.logger.warning(f"库存同步失败: {e}")
+            if input.sweep_clients:
+                try:
+                    networks = await workflow.execute_activity_method(
+                        meraki_activities.get_organization_networks,
+                        args=[input.org_id, False, "network"],
+                        start_to_close_timeout=timedelta(seconds=60),
+                    )
+                    await workflow.execute_activity_method(
+                        meraki_activities.sweep_network_clients,
+                        args=[[network.get("id") for network in networks if network.get("id")],
+                              input.client_timespan],
+                        start_to_close_timeout=timedelta(minutes=30),
+                        heartbeat_timeout=timedelta(minutes=2),
+                    )
+                except Exception as e:
+                    workflow.logger.warning(f"客户端扫描失败: {e}")
+            await workflow.sleep(timedelta(seconds=input.interval_seconds))
+        
+        workflow.continue_as_new(input)
+
+
+@workflow.defn
+class UplinkHistoryCollectorWorkflow:
+    """
+    后台工作流: 定期采集上行链路丢包/延迟历史
+    
+    🔄 循环调用 collect_loss_and_latency，把组织内安全网关各上行链路的新样本追加到Worker本地
+    时间序列存储，供 TroubleshootingWorkflow 按时间范围查询多日历史而不必每次重新拉取。
+    每 collections_per_run 次采集后 continue-as-new。
+    
+    每个组织启动一个实例，建议以固定的 workflow_id（如 uplink-history-{org_id}）启动以避免重复。
+    """
+    
+    @workflow.run
+    async def run(self, input: UplinkHistoryInput) -> None:
+        """采集丢包/延迟历史，直到被取消"""
+        from meraki import MerakiActivities
+        meraki_activities = MerakiActivities()
+        
+        for _ in range(max(1, input.collections_per_run)):
+            try:
+                await workflow.execute_activity_method(
+                    meraki_activities.collect_loss_and_latency,
+                    args=[input.org_id, input.ip],
+                    start_to_close_timeout=timedelta(minutes=10),
+                    heartbeat_timeout=timedelta(minutes=2),
+                )
+            except Exception as e:
+                # 单次采集失败不终止循环，下个周期重试
+                workflow.logger.warning(f"丢包/延迟采集失败: {e}")
+            await workflow.sleep(timedelta(seconds=input.interval_seconds))
+        
+        workflow.continue_as_new(input)
+
+
+@workflow.defn
+class NetworkEventsIngestWorkflow:
+    """
+    后台工作流: 增量采集网络事件
+    
+    🔄 循环调用 ingest_network_events，每个 (网络, productType) 事件流只获取高水位之后的新事件，
+    追加到Worker本地事件日志（带保留期和分段压缩），AlertsLogWorkflow 等直接读取本地日志。
+    每 collections_per_run 次采集后 continue-as-new。
+    
+    每个组织启动一个实例，建议以固定的 workflow_id（如 network-events-{org_id}）启动以避免重复。
+    """
+    
+    @workflow.run
+    async def run(self, input: NetworkEventsIngestInput) -> None:
+        """采集网络事件，直到被取消"""
+        from meraki import MerakiActivities
+        meraki_activities = MerakiActivities()
+        
+        for _ in range(max(1, input.collections_per_run)):
+            try:
+                networks = await workflow.execute_activity_method(
+                    meraki_activities.get_organization_networks,
+                    args=[input.org_id, False, "network"],
+                    start_to_close_timeout=timedelta(seconds=60),
+                )
+                await workflow.execute_activity_method(
+                    meraki_activities.ingest_network_events,
+                    args=[networks, input.product_types, input.backfill_seconds],
+                    start_to_close_timeout=timedelta(minutes=10),
+                    heartbeat_timeout=timedelta(minutes=2),
+                )
+            except Exception as e:
+                # 单次采集失败不终止循环，下个周期重试
+                workflow.logger.warning(f"网络事件采集失败: {e}")
+            await workflow.sleep(timedelta(seconds=input.interval_seconds))
+        
+        workflow.continue_as_new(input)
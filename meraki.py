@@ -14,10 +14,51 @@ Activity设计原则:
 4. 支持Temporal的重试和超时机制
 """
 
+import asyncio
+import time
 import aiohttp
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, AsyncIterator
 from temporalio import activity
+from temporalio.api.common.v1 import Payload
+from temporalio.common import RawValue
+from temporalio.exceptions import ApplicationError
 from merakiAPI import MerakiAPI
+from meraki_alerts import DEFAULT_TOP_ALERTS, aggregate_alerts
+from meraki_cache import FloorPlanIndex
+from meraki_client_index import ClientMacIndex, normalize_mac
+from meraki_events import EventLog
+from meraki_inventory import InventoryStore
+from meraki_projection import Fields, project
+from meraki_retry import MerakiAPIError, MerakiRateLimitError
+from meraki_session import MerakiSessionPool
+from meraki_spill import SpillStore
+from meraki_timeseries import DEFAULT_MAX_POINTS, TimeSeriesStore
+
+
+# get_network_bundle 支持的端点名称 -> 网络级GET端点（通过 MerakiAPI.get_json 获取，失败时记入 errors）
+NETWORK_BUNDLE_ENDPOINTS = {
+    "devices": "/networks/{networkId}/devices",
+    "clients_overview": "/networks/{networkId}/clients/overview",
+    "floor_plans": "/networks/{networkId}/floorPlans",
+    "alerts_settings": "/networks/{networkId}/alerts/settings",
+    "wireless_ssids": "/networks/{networkId}/wireless/ssids",
+    "wireless_settings": "/networks/{networkId}/wireless/settings",
+    "air_marshal": "/networks/{networkId}/wireless/airMarshal",
+    "appliance_settings": "/networks/{networkId}/appliance/settings",
+    "firewall_l3_rules": "/networks/{networkId}/appliance/firewall/l3FirewallRules",
+    "firewall_l7_rules": "/networks/{networkId}/appliance/firewall/l7FirewallRules",
+    "firewalled_services": "/networks/{networkId}/appliance/firewall/firewalledServices",
+    "content_filtering": "/networks/{networkId}/appliance/contentFiltering",
+    "vlans": "/networks/{networkId}/appliance/vlans",
+    "switch_settings": "/networks/{networkId}/switch/settings",
+    "switch_acls": "/networks/{networkId}/switch/accessControlLists",
+    "switch_access_policies": "/networks/{networkId}/switch/accessPolicies",
+}
+
+# 支持 lossAndLatencyHistory 的设备型号前缀（安全网关 MX 与远程办公网关 Z；蜂窝网关 MG 等不支持）
+LOSS_AND_LATENCY_MODEL_PREFIXES = ("MX", "Z")
 
 
 class MerakiActivities:
@@ -26,18 +67,161 @@ class MerakiActivities:
     
     包含61个Meraki Dashboard API的Activity封装
     按功能分组：组织级、网络级、设备级、客户端级、许可证、告警等
+    
+    同一个实例在 Worker 进程内共享一个 MerakiAPI 客户端和一个 HTTP 连接池，
+    连接池由 worker.py 在启动时 open()，关闭时 close()。
     """
 
+    def __init__(self, api: Optional[MerakiAPI] = None, pool: Optional[MerakiSessionPool] = None,
+                 spill: Optional[SpillStore] = None, inventory: Optional[InventoryStore] = None,
+                 timeseries: Optional[TimeSeriesStore] = None, events: Optional[EventLog] = None,
+                 spill_task_queue: Optional[str] = None):
+        """
+        初始化Activities
+        
+        Args:
+            api: Meraki API客户端（为None时首次使用时创建）
+            pool: 共享HTTP连接池（为None时使用默认配置创建）
+            spill: 分页结果落盘存储（为None时使用默认目录）
+            inventory: 本地库存镜像（为None时使用默认数据库路径，首次查询时才打开）
+            timeseries: 丢包/延迟时间序列存储（为None时使用默认目录，首次使用时才读取）
+            events: 网络事件本地日志（为None时使用默认目录，首次使用时才读取）
+            spill_task_queue: 本机专用任务队列，写入分页句柄供 Workflow 把 read_spill_page 调度回本机
+                （为None时表示单Worker部署或 MERAKI_SPILL_DIR 为共享存储）
+        """
+        self._api = api
+        self.pool = pool or MerakiSessionPool()
+        self.spill = spill or SpillStore()
+        self.spill_task_queue = spill_task_queue
+        self.floorplan_index = FloorPlanIndex()
+        self.client_index = ClientMacIndex()
+        self.inventory = inventory or InventoryStore()
+        self.timeseries = timeseries or TimeSeriesStore()
+        self.events = events or EventLog()
+
+    @property
+    def api(self) -> MerakiAPI:
+        """Worker 内共享的 Meraki API 客户端"""
+        if self._api is None:
+            self._api = MerakiAPI()  # merakiAPI.py 自己处理认证
+        return self._api
+
+    async def open(self):
+        """打开共享连接池"""
+        await self.pool.open()
+
+    async def close(self):
+        """关闭共享连接池和本地库存镜像"""
+        await self.pool.close()
+        self.inventory.close()
+
+    async def __aenter__(self) -> "MerakiActivities":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息（用于确认连接复用情况）"""
+        return self.pool.stats()
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """获取限速器统计信息（包含每个组织的排队深度）"""
+        return self.api.get_rate_limit_stats()
+
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """获取重试统计信息（重试次数、累计等待时间）"""
+        return self.api.get_retry_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（命中率、占用字节数）"""
+        return self.api.get_cache_stats()
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """获取请求合并统计信息（按端点模板的命中/未命中次数）"""
+        return self.api.get_coalescing_stats()
+
+    def get_decode_stats(self) -> Dict[str, Any]:
+        """获取响应解码统计信息（解码库、线程池解码次数、耗时）"""
+        return self.api.get_decode_stats()
+
+    def get_request_metrics(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """获取按端点模板的Meraki API请求指标，按总耗时降序"""
+        return self.api.get_request_metrics(top)
+
+    def get_search_stats(self) -> Dict[str, Any]:
+        """获取设备搜索索引统计信息（按组织的设备数、查询次数、平均查询耗时）"""
+        return self.api.get_search_stats()
+
+    def get_geo_stats(self) -> Dict[str, Any]:
+        """获取设备地理索引统计信息（按组织的有坐标设备数、网格数）"""
+        return self.api.get_geo_stats()
+
+    def get_timeseries_stats(self) -> Dict[str, Any]:
+        """获取丢包/延迟时间序列存储统计信息（序列数、样本数、字节数）"""
+        return self.timeseries.stats()
+
+    def get_events_stats(self) -> Dict[str, Any]:
+        """获取网络事件本地日志统计信息（事件流数、分段数、字节数）"""
+        return self.events.stats()
+
+    def get_client_index_stats(self) -> Dict[str, Any]:
+        """获取客户端MAC索引统计信息（条目数、命中率、过期与淘汰次数）"""
+        return self.client_index.stats()
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        获取HTTP会话
+        
+        连接池已打开时复用共享会话；否则（如脱离Worker单独调用）临时创建会话。
+        MerakiAPI 抛出的类型化异常会转换为 ApplicationError：
+        4xx 标记为不可重试，429 携带 Retry-After 作为下次重试延迟。
+        """
+        try:
+            if self.pool.is_open:
+                yield self.pool.session
+            else:
+                async with aiohttp.ClientSession() as session:
+                    yield session
+        except MerakiAPIError as e:
+            next_retry_delay = None
+            if isinstance(e, MerakiRateLimitError) and e.retry_after:
+                next_retry_delay = timedelta(seconds=e.retry_after)
+            raise ApplicationError(
+                str(e),
+                {"status": e.status, "endpoint": e.endpoint},
+                type=type(e).__name__,
+                non_retryable=not e.retryable,
+                next_retry_delay=next_retry_delay,
+            ) from e
+
+    @staticmethod
+    def _project(items: List[Dict], fields: Fields) -> List[Dict]:
+        """
+        按 fields 裁剪返回的记录，减小写入 Temporal 历史的 payload
+        
+        未知的命名投影属于调用方错误，转换为不可重试的 ApplicationError。
+        """
+        try:
+            return project(items, fields)
+        except ValueError as e:
+            raise ApplicationError(str(e), type="ValueError", non_retryable=True) from e
+
     # ==================== 组织级 API ====================
     
     @activity.defn
-    async def get_organizations(self) -> List[Dict]:
+    async def get_organizations(self, fields: Fields = None) -> List[Dict]:
         """
         获取用户有权限访问的组织列表
         
         API端点: GET /organizations
         用途: 列出当前API密钥有权限访问的所有组织
         
+        Args:
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
+            
         Returns:
             List[Dict]: 组织列表，每个组织包含:
                 - id (str): 组织ID
@@ -51,20 +235,22 @@ class MerakiActivities:
             - 多租户环境中选择目标组织
             - 权限验证和组织发现
         """
-        api = MerakiAPI()  # merakiAPI.py 自己处理认证
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organizations(session)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organizations(session), fields)
 
     @activity.defn
-    async def get_organization_networks(self, org_id: str) -> List[Dict]:
+    async def get_organization_networks(self, org_id: str, force_refresh: bool = False, fields: Fields = None) -> List[Dict]:
         """
         获取组织的网络列表
         
         API端点: GET /organizations/{organizationId}/networks
-        用途: 获取指定组织下的所有网络
+        用途: 获取指定组织下的所有网络（Worker内缓存5分钟）
         
         Args:
             org_id (str): 组织ID
+            force_refresh (bool): 忽略缓存，强制从API重新获取
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 网络列表，每个网络包含:
@@ -83,12 +269,12 @@ class MerakiActivities:
             - 设备部署前的网络选择
             - 网络拓扑分析
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_networks(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_networks(session, org_id, force_refresh=force_refresh), fields)
 
     @activity.defn
-    async def get_organization_devices(self, org_id: str) -> List[Dict]:
+    async def get_organization_devices(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织的设备列表
         
@@ -97,6 +283,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 设备列表，每个设备包含:
@@ -120,12 +307,12 @@ class MerakiActivities:
             - 设备地理位置分析
             - 设备健康状态监控
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_devices(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_devices(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_licenses(self, org_id: str) -> List[Dict]:
+    async def get_organization_licenses(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织的许可证列表 (Per-device licensing)
         
@@ -134,6 +321,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 许可证列表，每个许可证包含:
@@ -157,12 +345,12 @@ class MerakiActivities:
             - 许可证到期提醒
             - 许可证分配管理
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_licenses(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_licenses(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_assurance_alerts(self, org_id: str) -> List[Dict]:
+    async def get_organization_assurance_alerts(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织的保障告警
         
@@ -171,6 +359,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 告警列表，每个告警包含:
@@ -190,9 +379,39 @@ class MerakiActivities:
             - 故障预警和响应
             - SLA监控和报告
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_assurance_alerts(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_assurance_alerts(session, org_id), fields)
+
+    @activity.defn
+    async def summarize_organization_alerts(self, org_id: str, top_n: int = DEFAULT_TOP_ALERTS,
+                                            fields: Fields = "alert") -> Dict:
+        """
+        获取组织的保障告警，并在Activity内一次遍历聚合
+        
+        API端点: GET /organizations/{organizationId}/assurance/alerts
+        用途: 告警类Workflow只需要计数、矩阵和少量严重告警，完整告警列表不再写入Workflow历史
+        
+        Args:
+            org_id (str): 组织ID
+            top_n (int): 返回的严重告警条数
+            fields (Union[List[str], str], optional): 严重告警只保留这些字段（默认 "alert" 投影）
+            
+        Returns:
+            Dict: meraki_alerts.aggregate_alerts 的聚合结果，包含:
+                - total / unresolved (int): 告警总数、未解决告警数
+                - by_severity / unresolved_by_severity / by_category / by_type / by_device_type (Dict[str, int])
+                - by_network (Dict[str, Dict]): 网络ID -> {name, total, unresolved, critical, warning, info}
+                - severity_by_category / severity_by_network / severity_by_device_type (Dict[str, Dict[str, int]])
+                - cube (List[List]): [严重程度, 类别, 网络ID, 设备类型, 数量, 未解决数量]
+                - critical_alerts (List[Dict]): 前 top_n 条严重告警
+        """
+        api = self.api
+        async with self._session() as session:
+            alerts = await api.get_organization_assurance_alerts(session, org_id)
+        summary = await asyncio.to_thread(aggregate_alerts, alerts, top_n)
+        summary["critical_alerts"] = self._project(summary["critical_alerts"], fields)
+        return summary
 
     @activity.defn
     async def get_device_statuses_overview(self, org_id: str) -> Dict:
@@ -219,14 +438,14 @@ class MerakiActivities:
             - 设备状态监控
             - 运维报告生成
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_device_statuses_overview(session, org_id)
 
     # 注意：get_organization_devices_provisioning_statuses 在merakiAPI.py中不存在，已删除
 
     @activity.defn
-    async def get_organization_inventory_devices(self, org_id: str) -> List[Dict]:
+    async def get_organization_inventory_devices(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织库存设备
         
@@ -235,6 +454,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 库存设备列表，每个设备包含:
@@ -251,12 +471,12 @@ class MerakiActivities:
             - 库存盘点
             - 设备分配规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_inventory_devices(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_inventory_devices(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_clients_search(self, org_id: str, mac: str) -> List[Dict]:
+    async def get_organization_clients_search(self, org_id: str, mac: str, fields: Fields = None) -> List[Dict]:
         """
         搜索组织中的客户端
         
@@ -266,6 +486,7 @@ class MerakiActivities:
         Args:
             org_id (str): 组织ID
             mac (str): 客户端MAC地址
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 客户端搜索结果，每个客户端包含:
@@ -293,12 +514,14 @@ class MerakiActivities:
             - 网络安全调查
             - 设备位置定位
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_clients_search(session, org_id, mac)
+        api = self.api
+        async with self._session() as session:
+            result = await api.get_organization_clients_search(session, org_id, mac)
+        self.client_index.add_search_result(result)
+        return self._project(result, fields)
 
     @activity.defn
-    async def get_organization_uplinks_statuses(self, org_id: str) -> List[Dict]:
+    async def get_organization_uplinks_statuses(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织上行链路状态
         
@@ -307,6 +530,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 上行链路状态列表，每个设备包含:
@@ -329,14 +553,737 @@ class MerakiActivities:
             - 上行链路故障诊断
             - 网络冗余检查
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_uplinks_statuses(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_uplinks_statuses(session, org_id), fields)
+
+    # ==================== 分页流式 API ====================
+
+    async def _spill_pages(self, iter_pages, fields: Fields = None) -> Dict:
+        """
+        逐页落盘并以游标作为心跳详情，重试时从上次的游标继续
+        
+        检查点只在同一台主机（同一个 spill_task_queue 且之前的页面都在本机）上有效；
+        重试被调度到其他主机时从第1页重新开始，避免句柄指向缺页的 spill。
+        
+        Args:
+            iter_pages: (session, start_url) -> 按页产出 Page 的异步迭代器
+            fields: 落盘前对每页做字段投影
+            
+        Returns:
+            Dict: 句柄 {spill_id, pages, items, complete, task_queue}
+        """
+        info = activity.info()
+        spill_id = SpillStore.make_spill_id(info.workflow_id, info.workflow_run_id, info.activity_id)
+        start_url = None
+        page_count = 0
+        item_count = 0
+        
+        async def finish() -> Dict:
+            handle = await asyncio.to_thread(self.spill.write_manifest, spill_id, page_count, item_count, True)
+            return {**handle, "task_queue": self.spill_task_queue}
+        
+        # 上一次尝试留下的检查点
+        if info.heartbeat_details:
+            checkpoint = info.heartbeat_details[0]
+            pages = checkpoint.get("pages", 0)
+            local = (checkpoint.get("task_queue") == self.spill_task_queue
+                     and await asyncio.to_thread(self.spill.has_pages, spill_id, pages))
+            if local:
+                page_count = pages
+                item_count = checkpoint.get("items", 0)
+                start_url = checkpoint.get("next_url")
+                if page_count and not start_url:
+                    # 上一次尝试已写完所有页面，只差返回句柄
+                    return await finish()
+            else:
+                activity.logger.info(f"spill {spill_id} 的检查点不在本机，从第1页重新开始")
+        
+        async with self._session() as session:
+            async for page in iter_pages(session, start_url):
+                # 先落盘再心跳，保证检查点之前的页面都已写入
+                await asyncio.to_thread(self.spill.write_page, spill_id, page_count,
+                                        self._project(page.items, fields))
+                page_count += 1
+                item_count += len(page.items)
+                activity.heartbeat({"next_url": page.next_url, "pages": page_count, "items": item_count,
+                                    "task_queue": self.spill_task_queue})
+        
+        return await finish()
+
+    @activity.defn
+    async def get_network_clients_paged(self, network_id: str, timespan: Optional[int] = None,
+                                        per_page: int = 1000, fields: Fields = None) -> Dict:
+        """
+        分页获取网络客户端列表并逐页落盘
+        
+        API端点: GET /networks/{networkId}/clients
+        用途: 大型网络的客户端列表，避免单个payload过大；
+              每页完成后心跳并记录游标，重试时从上次的游标继续而不是从第1页开始
+        
+        Args:
+            network_id (str): 网络ID
+            timespan (int): 查询时间范围（秒）
+            per_page (int): 每页条目数（3-5000）
+            fields (Union[List[str], str], optional): 落盘前只保留这些字段，或命名投影如 "client"
+            
+        Returns:
+            Dict: 句柄，包含:
+                - spill_id (str): 落盘存储ID，传给 read_spill_page 读取页面
+                - pages (int): 页数
+                - items (int): 客户端总数
+                - complete (bool): 是否已全部写入
+                - task_queue (str): 页面所在主机的专用任务队列（None 表示单Worker或共享存储）
+        
+        注意:
+            - 调用时应设置 heartbeat_timeout
+            - 页面存储在Worker本地（MERAKI_SPILL_DIR），read_spill_page / delete_spill 必须以
+              task_queue=handle["task_queue"] 调度（为None时用默认队列），读取完毕后调用 delete_spill 清理
+        """
+        params = {"perPage": per_page}
+        if timespan is not None:
+            params["timespan"] = timespan
+        api = self.api
+        return await self._spill_pages(
+            lambda session, start_url: api.iter_network_clients_pages(session, network_id, start_url, **params),
+            fields,
+        )
+
+    @activity.defn
+    async def get_organization_devices_paged(self, org_id: str, per_page: int = 1000,
+                                             fields: Fields = None) -> Dict:
+        """
+        分页获取组织设备列表并逐页落盘
+        
+        API端点: GET /organizations/{organizationId}/devices
+        用途: 大型组织的设备清单，避免单个payload过大；
+              每页完成后心跳并记录游标，重试时从上次的游标继续而不是从第1页开始
+        
+        Args:
+            org_id (str): 组织ID
+            per_page (int): 每页条目数（3-1000）
+            fields (Union[List[str], str], optional): 落盘前只保留这些字段，或命名投影如 "firmware"
+            
+        Returns:
+            Dict: 句柄，字段同 get_network_clients_paged
+        """
+        api = self.api
+        return await self._spill_pages(
+            lambda session, start_url: api.iter_organization_devices_pages(session, org_id, start_url,
+                                                                           perPage=per_page),
+            fields,
+        )
+
+    @activity.defn
+    async def read_spill_page(self, spill_id: str, page_index: int) -> List[Dict]:
+        """
+        读取分页Activity落盘的某一页
+        
+        页面只存在于写入它的主机上，应以 task_queue=handle["task_queue"] 调度到该主机。
+        
+        Args:
+            spill_id (str): 句柄中的 spill_id
+            page_index (int): 页码（0 到 pages-1）
+            
+        Returns:
+            List[Dict]: 该页的条目列表
+            
+        Raises:
+            ApplicationError: 本机没有该 spill 或页面（调度到了错误的主机、已删除或页码越界），不可重试
+        """
+        try:
+            return await asyncio.to_thread(self.spill.read_page, spill_id, page_index)
+        except FileNotFoundError as e:
+            raise ApplicationError(
+                f"本机（任务队列 {self.spill_task_queue or activity.info().task_queue}）没有 spill {spill_id} 的第 {page_index} 页，"
+                f"请以句柄中的 task_queue 调度 read_spill_page，或将 MERAKI_SPILL_DIR 指向共享存储",
+                type="SpillNotFound",
+                non_retryable=True,
+            ) from e
+        except ValueError as e:
+            raise ApplicationError(str(e), type="ValueError", non_retryable=True) from e
+
+    @activity.defn
+    async def delete_spill(self, spill_id: str) -> None:
+        """
+        删除分页Activity落盘的所有页面
+        
+        Args:
+            spill_id (str): 句柄中的 spill_id
+        """
+        await asyncio.to_thread(self.spill.delete, spill_id)
+
+    # ==================== 直通 API ====================
+
+    @activity.defn
+    async def get_endpoint_raw(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> RawValue:
+        """
+        原样返回任意GET端点的响应（不解码、不重新编码）
+        
+        响应体字节直接作为 json/plain payload 交给 Temporal，
+        适用于Activity只做透传、由Workflow处理数据的场景，省去Worker端的解码和重新编码。
+        Workflow 端收到的是 RawValue（不会自动解码），在需要数据时再用
+        workflow.payload_converter().from_payload(raw.payload) 解码为 dict/list（见 LicenseDetailsWorkflow）。
+        
+        Args:
+            endpoint (str): API端点，如 /organizations/{orgId}/devices/statuses/overview
+            params (Optional[Dict[str, Any]]): 查询参数
+            
+        Returns:
+            RawValue: 原始JSON payload（只包含第一页，不跟随分页链接），
+                      其 payload.data 为响应体字节
+        """
+        api = self.api
+        async with self._session() as session:
+            body = await api.get_raw(session, endpoint, **(params or {}))
+        return RawValue(Payload(metadata={"encoding": b"json/plain"}, data=body.strip() or b"null"))
+
+    # ==================== 组合 API ====================
+
+    @activity.defn
+    async def get_network_bundle(self, network_id: str, endpoints: List[str], org_id: Optional[str] = None,
+                                 fields: Optional[Dict[str, Fields]] = None) -> Dict:
+        """
+        在一次Activity执行中并发获取同一网络的多个端点
+        
+        用途: 安全、健康等分析需要同一网络的多个端点时，用一个Activity代替多个，
+              减少Temporal调度往返和历史事件数；所有请求共用一个HTTP会话
+        
+        Args:
+            network_id (str): 网络ID
+            endpoints (List[str]): 端点名称，可选 NETWORK_BUNDLE_ENDPOINTS 中的名称，以及
+                "assurance_alerts"（该网络的健康告警，需要 org_id）
+            org_id (Optional[str]): 组织ID（请求 assurance_alerts 时必填）
+            fields (Optional[Dict[str, Union[List[str], str]]]): 端点名称 -> 字段投影
+            
+        Returns:
+            Dict: 结果包，包含:
+                - network_id (str): 网络ID
+                - data (Dict): 端点名称 -> 返回数据（只包含成功的端点）
+                - errors (Dict): 端点名称 -> 错误信息（单个端点失败不影响其他端点；
+                  网络不支持该端点时同样记入，如纯无线网络的 firewall_l3_rules）
+        """
+        unknown = [name for name in endpoints
+                   if name not in NETWORK_BUNDLE_ENDPOINTS and name != "assurance_alerts"]
+        if unknown:
+            raise ApplicationError(f"未知的端点名称: {', '.join(unknown)}", type="ValueError", non_retryable=True)
+        if "assurance_alerts" in endpoints and not org_id:
+            raise ApplicationError("请求 assurance_alerts 需要提供 org_id", type="ValueError", non_retryable=True)
+        
+        api = self.api
+        fields = fields or {}
+        
+        # 不使用 get_network_wireless_ssids 等辅助方法：它们在失败时返回空结果，
+        # 调用方无法区分“未配置”和“获取失败”；这里的失败一律以 MerakiAPIError 记入 errors
+        async def fetch(session, name):
+            if name == "assurance_alerts":
+                alerts = []
+                async for page in api.iter_pages(session, f"/organizations/{org_id}/assurance/alerts",
+                                                 {"networkId": network_id}):
+                    alerts.extend(page.items)
+                return alerts
+            return await api.get_json(session, NETWORK_BUNDLE_ENDPOINTS[name].format(networkId=network_id))
+        
+        async with self._session() as session:
+            results = await asyncio.gather(*(fetch(session, name) for name in endpoints), return_exceptions=True)
+        
+        bundle = {"network_id": network_id, "data": {}, "errors": {}}
+        for name, result in zip(endpoints, results):
+            if isinstance(result, MerakiAPIError):
+                bundle["errors"][name] = str(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                if name == "floor_plans":
+                    self.floorplan_index.update(network_id, result)
+                bundle["data"][name] = self._project(result, fields.get(name))
+        return bundle
+
+    # ==================== 本地库存镜像 ====================
+
+    @activity.defn
+    async def sync_inventory(self, org_id: str) -> Dict:
+        """
+        将组织、网络、设备和库存同步到Worker本地的SQLite镜像
+        
+        通过分页端点获取全量数据，只写入内容哈希变化的行，并删除云端已不存在的行。
+        由 InventorySyncWorkflow 定期调用；单类数据获取失败时记录错误并跳过该类数据
+        （不写入也不删除任何行），不影响其他数据的同步。
+        设备快照同时用于增量更新该组织的设备搜索索引和地理索引（见 search_devices、cluster_devices）。
+        
+        Args:
+            org_id (str): 组织ID
+            
+        Returns:
+            Dict: 同步结果，包含:
+                - organizations / networks / devices / inventory (Dict):
+                  inserted、updated、unchanged、deleted 行数
+                - errors (Dict): 数据类型 -> 错误信息
+                - seconds (float): 耗时
+        """
+        started = time.monotonic()
+        api = self.api
+        result: Dict[str, Any] = {"errors": {}}
+        
+        async def fetch_networks(session):
+            # 不使用 get_organization_networks：它在失败时返回空列表，会导致镜像中的网络被全部删除
+            networks = []
+            async for page in api.iter_organization_networks_pages(session, org_id, force_refresh=True):
+                networks.extend(page.items)
+            return networks
+        
+        async def fetch_devices(session):
+            devices = []
+            async for page in api.iter_organization_devices_pages(session, org_id, perPage=1000):
+                devices.extend(page.items)
+                activity.heartbeat({"devices": len(devices)})
+            return devices
+        
+        fetchers = {
+            "organizations": lambda session: api.get_organizations(session),
+            "networks": fetch_networks,
+            "devices": fetch_devices,
+            "inventory": lambda session: api.get_organization_inventory_devices(session, org_id),
+        }
+        async with self._session() as session:
+            for table, fetch in fetchers.items():
+                try:
+                    records = await fetch(session)
+                except MerakiAPIError as e:
+                    result["errors"][table] = str(e)
+                    continue
+                if table == "organizations":
+                    # 只同步当前组织，不删除其他组织的数据
+                    records = [org for org in records if str(org.get("id")) == str(org_id)]
+                elif table == "devices":
+                    # 同一份设备快照增量更新搜索索引和地理索引
+                    await api.sync_device_indexes(org_id, records)
+                result[table] = await asyncio.to_thread(
+                    self.inventory.upsert, table, org_id, records, table != "organizations")
+                activity.heartbeat({"synced": table})
+        
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    @activity.defn
+    async def find_inventory_devices(self, org_id: str, name: Optional[str] = None, fields: Fields = None,
+                                     max_age_seconds: Optional[float] = 3600, serial: Optional[str] = None,
+                                     mac: Optional[str] = None, model: Optional[str] = None,
+                                     network_id: Optional[str] = None,
+                                     limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        在本地库存镜像中查找设备（不调用Meraki API）
+        
+        Args:
+            org_id (str): 组织ID
+            name (Optional[str]): 设备名称子串（不区分大小写）
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "identity"
+            max_age_seconds (Optional[float]): 镜像最长允许的陈旧时间（秒），None表示不限
+            serial (Optional[str]): 序列号
+            mac (Optional[str]): MAC地址
+            model (Optional[str]): 型号
+            network_id (Optional[str]): 网络ID
+            limit (Optional[int]): 最多返回的条数
+            
+        Returns:
+            Optional[List[Dict]]: 匹配的设备（字段同 get_organization_devices，按名称排序）；
+                该组织从未同步或镜像比 max_age_seconds 更旧时返回None，调用方应回退到云端API
+        """
+        synced_at = await asyncio.to_thread(self.inventory.last_synced, org_id, "devices")
+        if synced_at is None or (max_age_seconds is not None and time.time() - synced_at > max_age_seconds):
+            return None
+        devices = await asyncio.to_thread(
+            self.inventory.find, "devices", org_id, name, limit,
+            serial=serial, mac=mac, model=model, network_id=network_id)
+        return self._project(devices, fields)
+
+    @activity.defn
+    async def search_devices(self, org_id: str, query: str, offset: int = 0, limit: Optional[int] = 50,
+                             fields: Fields = None, prefix: bool = False) -> Dict:
+        """
+        在设备搜索索引中按关键词搜索设备
+        
+        索引对 name、hostname、serial、model、tags 建立三元组倒排索引，由 sync_inventory
+        或超过 MERAKI_SEARCH_MAX_AGE 后的首次查询用最新的设备快照增量更新。
+        
+        Args:
+            org_id (str): 组织ID
+            query (str): 关键词（不区分大小写，空格分隔的多个关键词之间为AND）
+            offset (int): 跳过的结果数
+            limit (Optional[int]): 每页结果数，None表示全部
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "identity"
+            prefix (bool): 只匹配以关键词开头的字段
+            
+        Returns:
+            Dict: 搜索结果，包含:
+                - query (str): 关键词
+                - total (int): 匹配的设备总数
+                - offset / limit: 分页参数
+                - items (List[Dict]): 本页设备，按得分降序排列（完全匹配 > 前缀 > 单词前缀 > 子串，
+                  name 权重最高）
+        """
+        api = self.api
+        async with self._session() as session:
+            index = await api.refresh_device_search_index(session, org_id)
+        result = index.search(query, offset, limit, prefix=prefix)
+        return {"query": query, **result, "items": self._project(result["items"], fields)}
+
+    # ==================== 设备地理索引 ====================
+
+    @activity.defn
+    async def find_devices_near(self, org_id: str, lat: float, lng: float, radius_m: float = 50,
+                                limit: Optional[int] = None, fields: Fields = None) -> List[Dict]:
+        """
+        查找距离某点 radius_m 米以内的设备
+        
+        在Worker内的设备地理索引中查询（与设备搜索索引共用同一个设备快照），不逐台扫描设备。
+        
+        Args:
+            org_id (str): 组织ID
+            lat (float): 纬度
+            lng (float): 经度
+            radius_m (float): 半径（米）
+            limit (Optional[int]): 最多返回的设备数
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "geo"
+            
+        Returns:
+            List[Dict]: 设备列表（按距离升序），每个设备额外包含 distance_m (float): 距离（米）
+        """
+        api = self.api
+        async with self._session() as session:
+            index = await api.refresh_device_geo_index(session, org_id)
+        matched = index.within_radius(lat, lng, radius_m, limit)
+        devices = self._project([device for _, device in matched], fields)
+        return [{**device, "distance_m": round(distance, 1)} for (distance, _), device in zip(matched, devices)]
+
+    @activity.defn
+    async def find_devices_in_box(self, org_id: str, bounds: List[float], limit: Optional[int] = None,
+                                  fields: Fields = None) -> List[Dict]:
+        """
+        查找矩形范围内的设备
+        
+        Args:
+            org_id (str): 组织ID
+            bounds (List[float]): [south, west, north, east]（west > east 表示跨越180°经线）
+            limit (Optional[int]): 最多返回的设备数
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "geo"
+            
+        Returns:
+            List[Dict]: 设备列表，按名称排序
+        """
+        if len(bounds) != 4:
+            raise ApplicationError("bounds 必须为 [south, west, north, east]", type="ValueError", non_retryable=True)
+        api = self.api
+        async with self._session() as session:
+            index = await api.refresh_device_geo_index(session, org_id)
+        return self._project(index.within_box(*bounds, limit=limit), fields)
+
+    @activity.defn
+    async def cluster_devices(self, org_id: str, zoom: int, bounds: Optional[List[float]] = None,
+                              query: Optional[str] = None, serials: Optional[List[str]] = None) -> Dict:
+        """
+        按地图缩放级别聚合设备坐标，供地图散点图使用
+        
+        上千台设备在低缩放级别下会合并为几十个聚合点，图表数据量与设备数无关。
+        
+        Args:
+            org_id (str): 组织ID
+            zoom (int): Web Mercator 缩放级别（0~22，数值越大聚合越细）
+            bounds (Optional[List[float]]): 只聚合 [south, west, north, east] 内的设备
+            query (Optional[str]): 只聚合设备搜索索引中匹配此关键词的设备
+            serials (Optional[List[str]]): 只聚合这些设备（与 query 同时指定时取交集）
+            
+        Returns:
+            Dict: 聚合结果，包含:
+                - zoom (int): 缩放级别
+                - total (int): 参与聚合的设备数
+                - clusters (List[Dict]): 聚合点，按设备数降序；包含 lat、lng、count，
+                  单台设备另含 serial、name，多台设备另含 bounds
+        """
+        if bounds is not None and len(bounds) != 4:
+            raise ApplicationError("bounds 必须为 [south, west, north, east]", type="ValueError", non_retryable=True)
+        api = self.api
+        async with self._session() as session:
+            index = await api.refresh_device_geo_index(session, org_id)
+        if query:
+            matched = api.device_search_index(org_id).search(query, limit=None)["items"]
+            allowed = set(serials) if serials is not None else None
+            serials = [device["serial"] for device in matched if allowed is None or device["serial"] in allowed]
+        clusters = index.cluster(zoom, tuple(bounds) if bounds else None, serials)
+        return {"zoom": zoom, "total": sum(c["count"] for c in clusters), "clusters": clusters}
+
+    # ==================== 客户端MAC索引 ====================
+
+    @activity.defn
+    async def sweep_network_clients(self, network_ids: List[str], timespan: int = 86400) -> Dict:
+        """
+        扫描各网络的客户端列表，更新Worker内的客户端MAC索引
+        
+        由 InventorySyncWorkflow 定期调用；单个网络获取失败时记录错误，继续扫描其他网络。
+        
+        Args:
+            network_ids (List[str]): 网络ID列表
+            timespan (int): 扫描最近多少秒内出现过的客户端
+            
+        Returns:
+            Dict: 扫描结果，包含:
+                - networks (int): 成功扫描的网络数
+                - clients (int): 扫描到的客户端数
+                - indexed (int): 写入索引的条目数
+                - errors (Dict): 网络ID -> 错误信息
+                - seconds (float): 耗时
+        """
+        started = time.monotonic()
+        api = self.api
+        result: Dict[str, Any] = {"networks": 0, "clients": 0, "indexed": 0, "errors": {}}
+        async with self._session() as session:
+            for network_id in network_ids:
+                try:
+                    async for page in api.iter_network_clients_pages(
+                            session, network_id, timespan=timespan, perPage=1000):
+                        result["clients"] += len(page.items)
+                        result["indexed"] += self.client_index.add_network_clients(network_id, page.items)
+                        activity.heartbeat({"network_id": network_id, "clients": result["clients"]})
+                except MerakiAPIError as e:
+                    result["errors"][network_id] = str(e)
+                    continue
+                result["networks"] += 1
+        self.client_index.purge_expired()
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    @activity.defn
+    async def locate_client(self, org_id: str, mac: str) -> Optional[Dict]:
+        """
+        按MAC地址定位客户端最近所在的网络和AP
+        
+        先查Worker内的客户端MAC索引；未命中时调用一次组织级客户端搜索
+        （GET /organizations/{organizationId}/clients/search）并写入索引，
+        不再逐个网络拉取客户端列表。
+        
+        Args:
+            org_id (str): 组织ID
+            mac (str): 客户端MAC地址（任意分隔符，不区分大小写）
+            
+        Returns:
+            Optional[Dict]: 客户端位置，包含:
+                - mac (str): 规范化的MAC地址
+                - network_id (str): 最近所在网络ID
+                - network_name (str): 网络名称（来自客户端搜索时）
+                - client_id (str): 客户端ID
+                - ap_serial (str): 最近接入的AP序列号
+                - ap_name (str): 最近接入的AP名称
+                - last_seen (float): 最后出现时间（Unix时间戳）
+                - source (str): search / network_clients
+            组织内找不到该客户端时返回None
+        """
+        location = self.client_index.lookup(mac)
+        if location is not None:
+            return location
+        api = self.api
+        try:
+            async with self._session() as session:
+                result = await api.get_organization_clients_search(session, org_id, normalize_mac(mac))
+        except ApplicationError as e:
+            # 客户端不存在时接口返回404
+            if e.details and isinstance(e.details[0], dict) and e.details[0].get("status") == 404:
+                return None
+            raise
+        self.client_index.add_search_result(result)
+        return self.client_index.lookup(mac)
+
+    # ==================== 丢包/延迟时间序列 ====================
+
+    @activity.defn
+    async def collect_loss_and_latency(self, org_id: str, ip: str = "8.8.8.8",
+                                       serials: Optional[List[str]] = None,
+                                       backfill_seconds: int = 86400) -> Dict:
+        """
+        增量采集安全网关各上行链路的丢包/延迟历史，写入Worker本地时间序列存储
+        
+        通过组织上行链路状态找到 MX/Z 设备及其上行链路（见 LOSS_AND_LATENCY_MODEL_PREFIXES，
+        其他型号不支持该端点），每条链路只请求最后一个已保存样本之后的数据
+        （首次采集回溯 backfill_seconds 秒）。由 UplinkHistoryCollectorWorkflow 定期调用；
+        单条链路获取失败时记录错误，继续采集其他链路。
+        
+        Args:
+            org_id (str): 组织ID
+            ip (str): 探测的目标IP
+            serials (Optional[List[str]]): 只采集这些设备，None表示组织内全部有上行链路的 MX/Z 设备
+            backfill_seconds (int): 首次采集时回溯的秒数（API最多支持约31天）
+            
+        Returns:
+            Dict: 采集结果，包含:
+                - series (int): 采集的序列（设备+上行链路）数
+                - samples (int): 新增样本数
+                - expired (int): 超过保留期被删除的样本数
+                - errors (Dict): "序列号/上行链路" -> 错误信息
+                - seconds (float): 耗时
+        """
+        started = time.monotonic()
+        api = self.api
+        wanted = set(serials) if serials is not None else None
+        result: Dict[str, Any] = {"series": 0, "samples": 0, "errors": {}}
+        async with self._session() as session:
+            statuses = await api.get_organization_uplinks_statuses(session, org_id)
+            links = [
+                (device["serial"], uplink["interface"])
+                for device in statuses if device.get("serial") and (wanted is None or device["serial"] in wanted)
+                and str(device.get("model") or "").upper().startswith(LOSS_AND_LATENCY_MODEL_PREFIXES)
+                for uplink in device.get("uplinks") or [] if uplink.get("interface")
+            ]
+            for serial, uplink in links:
+                now = int(time.time())
+                # 首次访问时从磁盘加载全部序列，且与 flush 共用锁，不在事件循环上执行
+                last = await asyncio.to_thread(self.timeseries.last_timestamp, serial, uplink, ip)
+                # API 的 t0 最早为60天前、时间跨度最长31天
+                t0 = max(last + 1 if last is not None else now - backfill_seconds, now - 31 * 86400 + 60)
+                try:
+                    samples = await api.get_device_loss_and_latency_history(
+                        session, serial, ip=ip, uplink=uplink, t0=t0, t1=now, resolution=60)
+                except MerakiAPIError as e:
+                    result["errors"][f"{serial}/{uplink}"] = str(e)
+                    continue
+                result["series"] += 1
+                result["samples"] += await asyncio.to_thread(self.timeseries.append, serial, uplink, ip, samples or [])
+                activity.heartbeat({"serial": serial, "uplink": uplink})
+        result["expired"] = await asyncio.to_thread(self.timeseries.enforce_retention)
+        await asyncio.to_thread(self.timeseries.flush)
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    @activity.defn
+    async def query_loss_and_latency(self, serial: str, start: float, end: float,
+                                     uplink: Optional[str] = None,
+                                     max_points: int = DEFAULT_MAX_POINTS) -> Dict:
+        """
+        从Worker本地时间序列存储中按时间范围查询丢包/延迟，并降采样（不调用Meraki API）
+        
+        Args:
+            serial (str): 设备序列号
+            start (float): 开始时间（Unix时间戳）
+            end (float): 结束时间（Unix时间戳）
+            uplink (Optional[str]): 只查询此上行链路（如 wan1），None表示全部
+            max_points (int): 每个序列最多返回的点数
+            
+        Returns:
+            Dict: 查询结果，包含:
+                - serial (str): 设备序列号
+                - start / end (int): 时间范围
+                - series (List[Dict]): 每条上行链路一项，列式数据:
+                  uplink、ip、bucket_seconds、ts、loss_percent、latency_ms、latency_max_ms、samples
+                  （不包含时间范围内没有样本的序列；尚未采集过该设备时为空列表）
+        """
+        series = await asyncio.to_thread(
+            self.timeseries.query, serial, start, end, uplink, None, max_points)
+        return {"serial": serial, "start": int(start), "end": int(end), "series": series}
+
+    # ==================== 网络事件日志 ====================
+
+    @activity.defn
+    async def ingest_network_events(self, networks: List[Any], product_types: Optional[List[str]] = None,
+                                    backfill_seconds: int = 86400, max_pages: int = 10,
+                                    per_page: int = 1000) -> Dict:
+        """
+        增量采集网络事件，追加到Worker本地事件日志
+        
+        API端点: GET /networks/{networkId}/events
+        每个 (网络, productType) 事件流只请求 startingAfter=高水位（已保存的最新 occurredAt）
+        之后的事件，首次采集回溯 backfill_seconds 秒。由 NetworkEventsIngestWorkflow 定期调用；
+        单个事件流获取失败时记录错误，该事件流的高水位不变，下次采集时重新获取。
+        采集结束后删除超过保留期的分段，并压缩已结束的分段。
+        
+        Args:
+            networks (List): 网络列表（包含 id、productTypes 的网络记录，或网络ID字符串）
+            product_types (Optional[List[str]]): 只采集这些产品类型，None表示网络的全部 productTypes
+                （传网络ID字符串时必须指定）
+            backfill_seconds (int): 首次采集时回溯的秒数
+            max_pages (int): 每个事件流每次最多获取的页数，其余留到下次采集
+            per_page (int): 每页事件数（3-1000）
+            
+        Returns:
+            Dict: 采集结果，包含:
+                - streams (int): 采集的事件流数
+                - events (int): 新写入的事件数
+                - truncated (List[str]): 达到 max_pages 仍有更多事件的事件流
+                - errors (Dict): "网络ID/productType" -> 错误信息
+                - expired_segments (int): 超过保留期被删除的分段数
+                - compacted_segments (int): 压缩的分段数
+                - seconds (float): 耗时
+        """
+        started = time.monotonic()
+        api = self.api
+        result: Dict[str, Any] = {"streams": 0, "events": 0, "truncated": [], "errors": {}}
+        streams = []
+        for network in networks:
+            network = network if isinstance(network, dict) else {"id": network}
+            available = network.get("productTypes")
+            for product_type in product_types or available or []:
+                if available is None or product_type in available:
+                    streams.append((network["id"], product_type))
+
+        async with self._session() as session:
+            for network_id, product_type in streams:
+                high_water = self.events.high_water(network_id, product_type)
+                if high_water is None:
+                    high_water = datetime.fromtimestamp(time.time() - backfill_seconds, timezone.utc).isoformat()
+                events: List[Dict] = []
+                pages = 0
+                try:
+                    # 同一事件流的页面全部获取后一次性写入，失败时不会留下空洞
+                    async for page in api.iter_network_events_pages(
+                            session, network_id, productType=product_type, perPage=per_page,
+                            startingAfter=high_water):
+                        events.extend(page.items)
+                        pages += 1
+                        activity.heartbeat({"network_id": network_id, "product_type": product_type, "pages": pages})
+                        if page.next_url and pages >= max_pages:
+                            result["truncated"].append(f"{network_id}/{product_type}")
+                            break
+                except MerakiAPIError as e:
+                    result["errors"][f"{network_id}/{product_type}"] = str(e)
+                    continue
+                result["streams"] += 1
+                result["events"] += await asyncio.to_thread(self.events.append, network_id, product_type, events)
+
+        result["expired_segments"] = await asyncio.to_thread(self.events.enforce_retention)
+        result["compacted_segments"] = (await asyncio.to_thread(self.events.compact))["segments"]
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    @activity.defn
+    async def query_network_events(self, network_ids: Optional[List[str]] = None,
+                                   product_type: Optional[str] = None,
+                                   start: Optional[float] = None, end: Optional[float] = None,
+                                   event_types: Optional[List[str]] = None, limit: Optional[int] = 100,
+                                   fields: Fields = None) -> Dict:
+        """
+        从Worker本地事件日志中查询网络事件（不调用Meraki API）
+        
+        Args:
+            network_ids (Optional[List[str]]): 只查询这些网络，None表示全部已采集的网络
+            product_type (Optional[str]): 只查询此产品类型（如 wireless、appliance）
+            start (Optional[float]): 开始时间（Unix时间戳）
+            end (Optional[float]): 结束时间（Unix时间戳）
+            event_types (Optional[List[str]]): 只返回这些事件类型
+            limit (Optional[int]): 最多返回的事件数（取最新的）
+            fields (Union[List[str], str], optional): 只返回这些字段
+            
+        Returns:
+            Dict: 查询结果，包含:
+                - events (List[Dict]): 事件（按 occurredAt 从新到旧，附带 productType），字段同 get_network_events
+                - streams (List[Dict]): 相关网络已采集的事件流（network_id、product_type、
+                  occurredAt 高水位、updated_at），为空表示这些网络尚未采集过
+        """
+        events = await asyncio.to_thread(
+            self.events.read, network_ids, product_type, start, end, event_types, limit)
+        return {"events": self._project(events, fields), "streams": self.events.streams(network_ids)}
 
     # ==================== 网络级 API ====================
 
     @activity.defn
-    async def get_network_clients(self, network_id: str, use_pagination: bool = True, per_page: int = 100, **kwargs) -> List[Dict]:
+    async def get_network_clients(self, network_id: str, use_pagination: bool = True, per_page: int = 100, fields: Fields = None,
+                                  timespan: Optional[int] = None, **kwargs) -> List[Dict]:
         """
         获取网络客户端列表
         
@@ -345,6 +1292,10 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            use_pagination (bool): 是否获取全部分页，False 时只取前 per_page 条
+            per_page (int): 不分页时返回的条数
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
+            timespan (Optional[int]): 查询最近多少秒内出现过的客户端（Workflow 无法传关键字参数，须按位置传入）
             
         Returns:
             List[Dict]: 客户端列表，每个客户端包含:
@@ -374,18 +1325,26 @@ class MerakiActivities:
             - 用户行为分析
             - 网络容量规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             # 构建查询参数
             params = {}
-            if 'timespan' in kwargs:
-                params['timespan'] = kwargs['timespan']
+            if timespan is None:
+                timespan = kwargs.get('timespan')
+            if timespan is not None:
+                params['timespan'] = timespan
             if not use_pagination:
+                # 不分页时只取第一页的 per_page 条
                 params['perPage'] = per_page
-            return await api.get_network_clients(session, network_id, **params)
+                clients = await api.get_network_clients(session, network_id, max_items=per_page, **params)
+            else:
+                clients = await api.get_network_clients(session, network_id, **params)
+        # 顺带更新客户端MAC索引
+        self.client_index.add_network_clients(network_id, clients)
+        return self._project(clients, fields)
 
     @activity.defn
-    async def get_network_events(self, network_id: str) -> List[Dict]:
+    async def get_network_events(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络事件日志
         
@@ -394,6 +1353,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 事件列表，每个事件包含:
@@ -414,12 +1374,12 @@ class MerakiActivities:
             - 安全事件监控
             - 用户连接分析
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_events(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_events(session, network_id), fields)
 
     @activity.defn
-    async def get_network_clients_usage_histories(self, network_id: str) -> List[Dict]:
+    async def get_network_clients_usage_histories(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络客户端使用历史
         
@@ -428,6 +1388,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 客户端使用历史列表，每个记录包含:
@@ -447,12 +1408,12 @@ class MerakiActivities:
             - 网络使用趋势分析
             - 带宽规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_clients_usage_histories(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_clients_usage_histories(session, network_id), fields)
 
     @activity.defn
-    async def get_network_clients_application_usage(self, network_id: str) -> List[Dict]:
+    async def get_network_clients_application_usage(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络客户端应用使用情况
         
@@ -461,6 +1422,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 客户端应用使用列表，每个记录包含:
@@ -477,12 +1439,12 @@ class MerakiActivities:
             - 网络使用优化
             - 带宽管理策略制定
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_clients_application_usage(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_clients_application_usage(session, network_id), fields)
 
     @activity.defn
-    async def get_network_devices(self, network_id: str) -> List[Dict]:
+    async def get_network_devices(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络设备列表
         
@@ -491,6 +1453,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 网络设备列表，每个设备包含:
@@ -515,20 +1478,22 @@ class MerakiActivities:
             - 设备拓扑分析
             - 设备配置批量操作
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_devices(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_devices(session, network_id), fields)
 
     @activity.defn
-    async def get_network_floorplans(self, network_id: str) -> List[Dict]:
+    async def get_network_floorplans(self, network_id: str, force_refresh: bool = False, fields: Fields = None) -> List[Dict]:
         """
         获取网络楼层平面图列表
         
         API端点: GET /networks/{networkId}/floorPlans
-        用途: 获取网络中的所有楼层平面图
+        用途: 获取网络中的所有楼层平面图（Worker内缓存30分钟）
         
         Args:
             network_id (str): 网络ID
+            force_refresh (bool): 忽略缓存，强制从API重新获取
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 楼层平面图列表，每个平面图包含:
@@ -560,9 +1525,41 @@ class MerakiActivities:
             - 设备位置可视化
             - 楼层管理
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_floor_plans(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            floorplans = await api.get_network_floor_plans(session, network_id, force_refresh=force_refresh)
+        self.floorplan_index.update(network_id, floorplans)
+        return self._project(floorplans, fields)
+
+    @activity.defn
+    async def find_floor_plans(self, network_ids: List[str], floor_name: Optional[str] = None) -> Dict:
+        """
+        在Worker内的楼层平面图名称索引中查找楼层（不调用Meraki API）
+        
+        索引由 get_network_floorplans 更新。索引覆盖全部网络时Workflow可直接使用索引结果，
+        只需为 missing_network_ids 中的网络查询楼层平面图列表。
+        
+        Args:
+            network_ids (List[str]): 要查找的网络ID
+            floor_name (Optional[str]): 楼层名称关键词（不区分大小写，为None时返回全部）
+            
+        Returns:
+            Dict: 查找结果，包含:
+                - floorplans (List[Dict]): 匹配的楼层平面图，按 network_ids 顺序排列，每项包含:
+                    - network_id (str): 网络ID
+                    - floorplan_id (str): 楼层平面图ID
+                    - floorplan_name (str): 楼层名称
+                    - image_url (str): 平面图图片URL
+                - missing_network_ids (List[str]): 未被索引或索引已过期的网络ID，
+                  这些网络的楼层平面图不在 floorplans 中，需要回退到 get_network_floorplans
+        """
+        index = self.floorplan_index
+        floorplans = index.find(network_ids, floor_name)
+        indexed = set(index.indexed_networks(network_ids))
+        return {
+            "floorplans": floorplans,
+            "missing_network_ids": [network_id for network_id in network_ids if network_id not in indexed],
+        }
 
     @activity.defn
     async def get_network_clients_overview(self, network_id: str) -> Dict:
@@ -589,20 +1586,21 @@ class MerakiActivities:
             - 客户端使用分析
             - 网络性能监控
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_clients_overview(session, network_id)
 
     @activity.defn
-    async def get_organization_licenses_overview(self, org_id: str) -> Dict:
+    async def get_organization_licenses_overview(self, org_id: str, force_refresh: bool = False) -> Dict:
         """
         获取组织许可证概览 (Co-termination licensing)
         
         API端点: GET /organizations/{organizationId}/licenses/overview
-        用途: 获取Co-termination许可模式下的许可证概览信息
+        用途: 获取Co-termination许可模式下的许可证概览信息（Worker内缓存1小时）
         
         Args:
             org_id (str): 组织ID
+            force_refresh (bool): 忽略缓存，强制从API重新获取
             
         Returns:
             Dict: 许可证概览，包含:
@@ -627,21 +1625,23 @@ class MerakiActivities:
             - 许可证到期提醒
             - 设备许可规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_licenses_overview(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return await api.get_organization_licenses_overview(session, org_id, force_refresh=force_refresh)
 
     @activity.defn
-    async def get_floor_plan_by_id(self, network_id: str, floor_plan_id: str) -> Dict:
+    async def get_floor_plan_by_id(self, network_id: str, floor_plan_id: str,
+                                   force_refresh: bool = False) -> Dict:
         """
         获取指定楼层平面图详情
         
         API端点: GET /networks/{networkId}/floorPlans/{floorPlanId}
-        用途: 获取特定楼层平面图的详细信息，包括设备位置
+        用途: 获取特定楼层平面图的详细信息，包括设备位置（Worker内缓存30分钟）
         
         Args:
             network_id (str): 网络ID
             floor_plan_id (str): 楼层平面图ID
+            force_refresh (bool): 忽略缓存，强制从API重新获取
             
         Returns:
             Dict: 楼层平面图详情，包含:
@@ -669,12 +1669,14 @@ class MerakiActivities:
             - 室内导航系统
             - 设备部署规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_floor_plan_by_id(session, network_id, floor_plan_id)
+        api = self.api
+        async with self._session() as session:
+            return await api.get_floor_plan_by_id(session, network_id, floor_plan_id,
+                                                  force_refresh=force_refresh)
 
     @activity.defn
-    async def get_network_wireless_client_connection_stats(self, network_id: str, client_id: str) -> Dict:
+    async def get_network_wireless_client_connection_stats(self, network_id: str, client_id: str,
+                                                          timespan: Optional[int] = None) -> Dict:
         """
         获取指定无线客户端连接统计
         
@@ -684,6 +1686,7 @@ class MerakiActivities:
         Args:
             network_id (str): 网络ID
             client_id (str): 客户端ID
+            timespan (Optional[int]): 统计最近多少秒（默认由API决定）
             
         Returns:
             Dict: 无线客户端连接统计，包含:
@@ -706,9 +1709,10 @@ class MerakiActivities:
             - 客户端故障诊断
             - 网络优化
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_wireless_client_connection_stats(session, network_id, client_id)
+        api = self.api
+        async with self._session() as session:
+            params = {"timespan": timespan} if timespan is not None else {}
+            return await api.get_network_wireless_client_connection_stats(session, network_id, client_id, **params)
 
     # ==================== 设备级 API ====================
 
@@ -748,8 +1752,8 @@ class MerakiActivities:
             - 设备配置管理
             - 故障诊断
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_device_info(session, serial)
 
     @activity.defn
@@ -779,12 +1783,12 @@ class MerakiActivities:
             - 上行链路故障排查
             - 网络连接配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_device_appliance_uplinks_settings(session, serial)
 
     @activity.defn
-    async def get_device_clients(self, serial: str) -> List[Dict]:
+    async def get_device_clients(self, serial: str, fields: Fields = None) -> List[Dict]:
         """
         获取设备客户端列表
         
@@ -793,6 +1797,7 @@ class MerakiActivities:
         
         Args:
             serial (str): 设备序列号
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 设备客户端列表，每个客户端包含:
@@ -811,9 +1816,9 @@ class MerakiActivities:
             - 端口使用分析
             - 客户端故障排查
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_device_clients(session, serial)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_device_clients(session, serial), fields)
 
     @activity.defn
     async def get_device_lldp_cdp(self, serial: str) -> Dict:
@@ -849,12 +1854,12 @@ class MerakiActivities:
             - 设备连接验证
             - 网络故障排查
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_device_lldp_cdp(session, serial)
 
     @activity.defn
-    async def get_device_loss_and_latency_history(self, serial: str) -> List[Dict]:
+    async def get_device_loss_and_latency_history(self, serial: str, fields: Fields = None) -> List[Dict]:
         """
         获取设备丢包和延迟历史
         
@@ -863,6 +1868,7 @@ class MerakiActivities:
         
         Args:
             serial (str): 设备序列号
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 丢包和延迟历史数据，每个数据点包含:
@@ -877,22 +1883,24 @@ class MerakiActivities:
             - 性能趋势分析
             - SLA监控
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_device_loss_and_latency_history(session, serial)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_device_loss_and_latency_history(session, serial), fields)
 
     # ==================== 无线 API ====================
 
     @activity.defn
-    async def get_network_wireless_ssids(self, network_id: str) -> List[Dict]:
+    async def get_network_wireless_ssids(self, network_id: str, force_refresh: bool = False, fields: Fields = None) -> List[Dict]:
         """
         获取网络无线SSID配置列表
         
         API端点: GET /networks/{networkId}/wireless/ssids
-        用途: 获取网络中所有无线SSID的配置信息
+        用途: 获取网络中所有无线SSID的配置信息（Worker内缓存30分钟）
         
         Args:
             network_id (str): 网络ID
+            force_refresh (bool): 忽略缓存，强制从API重新获取
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: SSID配置列表，每个SSID包含:
@@ -923,9 +1931,9 @@ class MerakiActivities:
             - SSID安全策略审计
             - 无线网络规划
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_wireless_ssids(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_wireless_ssids(session, network_id, force_refresh=force_refresh), fields)
 
     @activity.defn
     async def get_network_wireless_settings(self, network_id: str) -> Dict:
@@ -954,12 +1962,12 @@ class MerakiActivities:
             - 合规性设置管理
             - 网络优化配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_wireless_settings(session, network_id)
 
     @activity.defn
-    async def get_network_wireless_clients_connection_stats(self, network_id: str) -> List[Dict]:
+    async def get_network_wireless_clients_connection_stats(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络无线客户端连接统计
         
@@ -968,6 +1976,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 无线客户端连接统计列表，每个客户端包含:
@@ -991,12 +2000,12 @@ class MerakiActivities:
             - 客户端连接质量分析
             - 网络优化决策
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_wireless_clients_connection_stats(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_wireless_clients_connection_stats(session, network_id), fields)
 
     @activity.defn
-    async def get_network_wireless_air_marshal(self, network_id: str) -> List[Dict]:
+    async def get_network_wireless_air_marshal(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络无线Air Marshal安全检测
         
@@ -1005,6 +2014,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: Air Marshal检测结果，每个检测项包含:
@@ -1023,9 +2033,9 @@ class MerakiActivities:
             - 恶意AP检测
             - 网络安全审计
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_wireless_air_marshal(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_wireless_air_marshal(session, network_id), fields)
 
     # ==================== 安全网关 API ====================
 
@@ -1054,12 +2064,12 @@ class MerakiActivities:
             - 网络部署模式设置
             - 动态DNS配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_appliance_settings(session, network_id)
 
     @activity.defn
-    async def get_network_appliance_firewall_l3_rules(self, network_id: str) -> List[Dict]:
+    async def get_network_appliance_firewall_l3_rules(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络安全网关L3防火墙规则
         
@@ -1068,6 +2078,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: L3防火墙规则列表，每个规则包含:
@@ -1085,12 +2096,12 @@ class MerakiActivities:
             - 防火墙规则审计
             - 访问控制配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_appliance_firewall_l3_rules(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_appliance_firewall_l3_rules(session, network_id), fields)
 
     @activity.defn
-    async def get_network_appliance_firewall_l7_rules(self, network_id: str) -> List[Dict]:
+    async def get_network_appliance_firewall_l7_rules(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络安全网关L7应用层防火墙规则
         
@@ -1099,6 +2110,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: L7防火墙规则列表，每个规则包含:
@@ -1116,9 +2128,9 @@ class MerakiActivities:
             - 内容过滤策略
             - 带宽管理
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_appliance_firewall_l7_rules(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_appliance_firewall_l7_rules(session, network_id), fields)
 
     @activity.defn
     async def get_network_appliance_content_filtering(self, network_id: str) -> Dict:
@@ -1145,12 +2157,12 @@ class MerakiActivities:
             - URL访问控制
             - 企业上网策略
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_appliance_content_filtering(session, network_id)
 
     @activity.defn
-    async def get_network_appliance_firewall_firewalled_services(self, network_id: str) -> List[Dict]:
+    async def get_network_appliance_firewall_firewalled_services(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络安全网关防火墙服务配置
         
@@ -1159,6 +2171,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 防火墙服务列表，每个服务包含:
@@ -1171,12 +2184,12 @@ class MerakiActivities:
             - 网络安全策略配置
             - 远程管理权限设置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_appliance_firewall_firewalled_services(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_appliance_firewall_firewalled_services(session, network_id), fields)
 
     @activity.defn
-    async def get_network_appliance_vlans(self, network_id: str) -> List[Dict]:
+    async def get_network_appliance_vlans(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络安全网关VLAN配置
         
@@ -1185,6 +2198,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: VLAN配置列表，每个VLAN包含:
@@ -1209,9 +2223,9 @@ class MerakiActivities:
             - 子网配置管理
             - DHCP服务配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_appliance_vlans(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_appliance_vlans(session, network_id), fields)
 
     # ==================== 交换机 API ====================
 
@@ -1239,12 +2253,12 @@ class MerakiActivities:
             - VLAN默认设置
             - 供电策略配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_switch_settings(session, network_id)
 
     @activity.defn
-    async def get_network_switch_access_control_lists(self, network_id: str) -> List[Dict]:
+    async def get_network_switch_access_control_lists(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络交换机访问控制列表(ACL)
         
@@ -1253,6 +2267,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: ACL规则列表，每个规则包含:
@@ -1271,12 +2286,12 @@ class MerakiActivities:
             - 网络访问控制
             - 流量过滤规则管理
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_switch_access_control_lists(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_switch_access_control_lists(session, network_id), fields)
 
     @activity.defn
-    async def get_network_switch_access_policies(self, network_id: str) -> List[Dict]:
+    async def get_network_switch_access_policies(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络交换机访问策略
         
@@ -1285,6 +2300,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 访问策略列表，每个策略包含:
@@ -1301,9 +2317,9 @@ class MerakiActivities:
             - 802.1X认证配置
             - 访客网络策略
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_switch_access_policies(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_switch_access_policies(session, network_id), fields)
 
     @activity.defn
     async def get_network_switch_dhcp_server_policy(self, network_id: str) -> Dict:
@@ -1328,12 +2344,12 @@ class MerakiActivities:
             - 防止恶意DHCP服务器
             - ARP欺骗防护
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
+        api = self.api
+        async with self._session() as session:
             return await api.get_network_switch_dhcp_server_policy(session, network_id)
 
     @activity.defn
-    async def get_network_switch_ports(self, serial: str) -> List[Dict]:
+    async def get_network_switch_ports(self, serial: str, fields: Fields = None) -> List[Dict]:
         """
         获取交换机端口配置
         
@@ -1342,6 +2358,7 @@ class MerakiActivities:
         
         Args:
             serial (str): 交换机设备序列号
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 端口配置列表，每个端口包含:
@@ -1372,14 +2389,14 @@ class MerakiActivities:
             - PoE供电管理
             - 端口安全策略
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_switch_ports(session, serial)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_switch_ports(session, serial), fields)
 
     # ==================== 传感器 API ====================
 
     @activity.defn
-    async def get_network_sensor_alerts_profiles(self, network_id: str) -> List[Dict]:
+    async def get_network_sensor_alerts_profiles(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络传感器告警配置文件
         
@@ -1388,6 +2405,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 传感器告警配置列表，每个配置包含:
@@ -1414,12 +2432,12 @@ class MerakiActivities:
             - 传感器阈值管理
             - 告警通知设置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_sensor_alerts_profiles(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_sensor_alerts_profiles(session, network_id), fields)
 
     @activity.defn
-    async def get_network_sensor_alerts_current_overview_by_metric(self, network_id: str) -> List[Dict]:
+    async def get_network_sensor_alerts_current_overview_by_metric(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络传感器当前告警概览（按指标分组）
         
@@ -1428,6 +2446,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 按指标分组的告警概览，每个指标包含:
@@ -1445,14 +2464,14 @@ class MerakiActivities:
             - 环境异常快速识别
             - 告警统计分析
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_sensor_alerts_current_overview_by_metric(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_sensor_alerts_current_overview_by_metric(session, network_id), fields)
 
     # ==================== 摄像头 API ====================
 
     @activity.defn
-    async def get_network_camera_quality_retention_profiles(self, network_id: str) -> List[Dict]:
+    async def get_network_camera_quality_retention_profiles(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络摄像头画质保留配置文件
         
@@ -1461,6 +2480,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 画质保留配置列表，每个配置包含:
@@ -1481,12 +2501,12 @@ class MerakiActivities:
             - 存储空间管理
             - 视频质量优化
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_camera_quality_retention_profiles(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_camera_quality_retention_profiles(session, network_id), fields)
 
     @activity.defn
-    async def get_network_camera_schedules(self, network_id: str) -> List[Dict]:
+    async def get_network_camera_schedules(self, network_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取网络摄像头录制计划
         
@@ -1495,6 +2515,7 @@ class MerakiActivities:
         
         Args:
             network_id (str): 网络ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 录制计划列表，每个计划包含:
@@ -1516,14 +2537,14 @@ class MerakiActivities:
             - 存储资源优化
             - 安全监控计划配置
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_network_camera_schedules(session, network_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_network_camera_schedules(session, network_id), fields)
 
     # ==================== 统计 API ====================
 
     @activity.defn
-    async def get_organization_summary_top_applications_by_usage(self, org_id: str) -> List[Dict]:
+    async def get_organization_summary_top_applications_by_usage(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织顶级应用使用量统计
         
@@ -1532,6 +2553,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 应用使用量排行，每个应用包含:
@@ -1547,12 +2569,12 @@ class MerakiActivities:
             - 带宽使用策略制定
             - 应用访问控制决策
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_summary_top_applications_by_usage(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_summary_top_applications_by_usage(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_summary_top_clients_by_usage(self, org_id: str) -> List[Dict]:
+    async def get_organization_summary_top_clients_by_usage(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织顶级客户端使用量统计
         
@@ -1561,6 +2583,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 客户端使用量排行，每个客户端包含:
@@ -1580,12 +2603,12 @@ class MerakiActivities:
             - 网络资源分配优化
             - 异常流量检测和调查
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_summary_top_clients_by_usage(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_summary_top_clients_by_usage(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_summary_top_devices_by_usage(self, org_id: str) -> List[Dict]:
+    async def get_organization_summary_top_devices_by_usage(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织顶级设备使用量统计
         
@@ -1594,6 +2617,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 设备使用量排行，每个设备包含:
@@ -1615,12 +2639,12 @@ class MerakiActivities:
             - 网络负载均衡优化
             - 设备容量规划和升级
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_summary_top_devices_by_usage(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_summary_top_devices_by_usage(session, org_id), fields)
 
     @activity.defn
-    async def get_organization_summary_top_appliances_by_utilization(self, org_id: str) -> List[Dict]:
+    async def get_organization_summary_top_appliances_by_utilization(self, org_id: str, fields: Fields = None) -> List[Dict]:
         """
         获取组织安全网关利用率统计
         
@@ -1629,6 +2653,7 @@ class MerakiActivities:
         
         Args:
             org_id (str): 组织ID
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
             
         Returns:
             List[Dict]: 安全网关利用率排行，每个设备包含:
@@ -1651,14 +2676,15 @@ class MerakiActivities:
             - 上行链路容量规划
             - 网络瓶颈识别和优化
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            return await api.get_organization_summary_top_appliances_by_utilization(session, org_id)
+        api = self.api
+        async with self._session() as session:
+            return self._project(await api.get_organization_summary_top_appliances_by_utilization(session, org_id), fields)
 
     # ==================== 特殊功能 API ====================
 
     @activity.defn
-    async def get_all_organization_devices_with_name_filter(self, org_id: str, name_filter: str) -> List[Dict]:
+    async def get_all_organization_devices_with_name_filter(self, org_id: str, name_filter: str, fields: Fields = None,
+                                                          offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
         """
         获取组织中包含指定名称关键词的所有设备
         
@@ -1668,9 +2694,12 @@ class MerakiActivities:
         Args:
             org_id (str): 组织ID
             name_filter (str): 设备名称过滤关键词
+            fields (Union[List[str], str], optional): 只返回这些字段，或命名投影如 "firmware"、"geo"（见 meraki_projection.PROJECTIONS）
+            offset (int): 跳过的结果数
+            limit (Optional[int]): 最多返回的结果数，None表示全部
             
         Returns:
-            List[Dict]: 匹配的设备列表，每个设备包含:
+            List[Dict]: 匹配的设备列表（名称包含关键词，按API返回顺序），每个设备包含:
                 - serial (str): 设备序列号
                 - mac (str): 设备MAC地址
                 - name (str): 设备名称
@@ -1690,16 +2719,9 @@ class MerakiActivities:
             - 批量设备管理
             - 设备清单筛选
         """
-        api = MerakiAPI()
-        async with aiohttp.ClientSession() as session:
-            devices = await api.get_organization_devices(session, org_id)
-            
-            # 应用名称过滤器
-            name_filter_lower = name_filter.lower()
-            filtered_devices = []
-            for device in devices:
-                device_name = (device.get("name") or device.get("hostname") or "").lower()
-                if name_filter_lower in device_name:
-                    filtered_devices.append(device)
-            
-            return filtered_devices
\ No newline at end of file
+        api = self.api
+        async with self._session() as session:
+            # 名称字面子串匹配，由设备搜索索引缩小候选范围；索引过期时才重新下载设备快照
+            devices = await api.get_all_organization_devices_with_name_filter(
+                session, org_id, name_filter, offset, limit)
+        return self._project(devices, fields)
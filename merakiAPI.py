@@ -11,37 +11,152 @@ API端点说明：
 - 美国联邦: https://api.gov-meraki.com/api/v1
 """
 
+import asyncio
+import os
+import time
 import aiohttp
-import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
+
+from meraki_cache import RequestCoalescer, TTLCache, endpoint_template, get_default_request_coalescer
+from meraki_geo import GeoIndex
+from meraki_json import JSONDecoder
+from meraki_metrics import RequestMetrics, get_default_request_metrics
+from meraki_pagination import Page, paginate
+from meraki_ratelimit import MerakiRateLimiter, get_default_rate_limiter
+from meraki_search import DEFAULT_SEARCH_MAX_AGE, DeviceSearchIndex
+from meraki_retry import RetryPolicy, MerakiConnectionError, error_for_status, error_kind
+
+
+DEFAULT_BASE_URL = "https://api.meraki.cn/api/v1"
 
 
 class MerakiAPI:
     """Meraki API 客户端类 - 适用于 Temporal Workflow"""
     
-    def __init__(self, api_key: str = None, base_url: str = "https://api.meraki.cn/api/v1"):
+    def __init__(self, api_key: str = None, base_url: Optional[str] = None,
+                 rate_limiter: Optional[MerakiRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[TTLCache] = None,
+                 decoder: Optional[JSONDecoder] = None,
+                 metrics: Optional[RequestMetrics] = None,
+                 coalescer: Optional[RequestCoalescer] = None):
         """
         初始化Meraki API客户端
         
         Args:
             api_key: Meraki API密钥（如果为None，从环境变量MERAKI_API_KEY读取）
-            base_url: API基础URL（默认为中国地区版本）
+            base_url: API基础URL（为None时读取环境变量 MERAKI_BASE_URL，默认为中国地区版本；
+                离线压测时可指向 meraki_simulator 模拟服务）
+            rate_limiter: 限速器（为None时使用进程级共享限速器）
+            retry_policy: 重试策略（为None时使用默认策略）
+            cache: 慢变化端点的读穿缓存（为None时使用默认TTL配置）
+            decoder: 响应解码器（为None时优先使用orjson，大响应在线程池中解码）
+            metrics: 按端点模板的请求指标（为None时使用进程级共享实例）
+            coalescer: GET请求合并器（为None时使用进程级共享实例，不同 MerakiAPI 实例的相同请求也会合并）
         """
-        import os
         if api_key is None:
             api_key = os.getenv("MERAKI_API_KEY", "4fb1f6a6c032f662ab0d8315b8cf45268b615d66")
             if not api_key:
                 raise ValueError("API密钥未提供，请设置环境变量 MERAKI_API_KEY 或传递 api_key 参数")
         
         self.api_key = api_key
+        if base_url is None:
+            base_url = os.getenv("MERAKI_BASE_URL", DEFAULT_BASE_URL)
         self.base_url = base_url.rstrip('/')
         self.headers = {
             'X-Cisco-Meraki-API-Key': api_key,
             'Content-Type': 'application/json'
         }
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache or TTLCache()
+        self.decoder = decoder or JSONDecoder()
+        self.metrics = metrics or get_default_request_metrics()
+        # 并发执行的Workflow常同时请求同一组织的相同端点，合并为一次HTTP往返（进程内所有实例共享）
+        self.coalescer = coalescer or get_default_request_coalescer()
+        # 网络ID/设备序列号 -> 组织ID，用于网络级和设备级请求的组织限速
+        self._network_orgs: Dict[str, str] = {}
+        self._device_orgs: Dict[str, str] = {}
+        # 组织ID -> 设备搜索索引/地理索引，按同一个库存快照增量更新
+        self._search_indexes: Dict[str, DeviceSearchIndex] = {}
+        self._geo_indexes: Dict[str, GeoIndex] = {}
+        self.search_max_age = float(os.getenv("MERAKI_SEARCH_MAX_AGE", DEFAULT_SEARCH_MAX_AGE))
+    
+    def _resolve_org_id(self, endpoint: str) -> Optional[str]:
+        """
+        根据API端点推断所属组织ID
+        
+        Args:
+            endpoint: API端点（如 /organizations/{id}/devices、/networks/{id}/clients）
+            
+        Returns:
+            组织ID，无法推断时返回None
+        """
+        parts = endpoint.strip('/').split('/')
+        if len(parts) < 2:
+            return None
+        if parts[0] == 'organizations':
+            return parts[1]
+        if parts[0] == 'networks':
+            return self._network_orgs.get(parts[1])
+        if parts[0] == 'devices':
+            return self._device_orgs.get(parts[1])
+        return None
+    
+    def _remember_orgs(self, org_id: str, items: List[Dict], id_field: str, mapping: Dict[str, str]):
+        """记录网络/设备所属的组织，供后续请求限速使用"""
+        for item in items:
+            if isinstance(item, dict) and item.get(id_field):
+                mapping[item[id_field]] = org_id
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """获取限速器统计信息（包含排队深度）"""
+        return self.rate_limiter.stats()
+    
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """获取重试统计信息（重试次数、累计等待时间）"""
+        return self.retry_policy.stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（命中率、占用字节数）"""
+        return self.cache.stats()
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """获取请求合并统计信息（按端点模板的命中/未命中次数，进程内所有实例共享）"""
+        return self.coalescer.stats()
+    
+    def get_decode_stats(self) -> Dict[str, Any]:
+        """获取响应解码统计信息（解码库、线程池解码次数、耗时）"""
+        return self.decoder.stats()
+    
+    def get_request_metrics(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """获取按端点模板的请求指标（延迟、字节数、状态码、重试、页数），按总耗时降序"""
+        return self.metrics.stats(top)
+    
+    def get_search_stats(self) -> Dict[str, Any]:
+        """获取设备搜索索引统计信息（按组织）"""
+        return {org_id: index.stats() for org_id, index in self._search_indexes.items()}
+    
+    def get_geo_stats(self) -> Dict[str, Any]:
+        """获取设备地理索引统计信息（按组织）"""
+        return {org_id: index.stats() for org_id, index in self._geo_indexes.items()}
+    
+    def invalidate_cache(self, endpoint_prefix: Optional[str] = None) -> int:
+        """
+        使缓存失效
+        
+        Args:
+            endpoint_prefix: 只删除以此端点开头的缓存（如 /organizations/123），None表示全部
+            
+        Returns:
+            删除的缓存条目数
+        """
+        prefix = f"{self.base_url}{endpoint_prefix}" if endpoint_prefix else None
+        return self.cache.invalidate(prefix)
     
     async def _make_request(self, session: aiohttp.ClientSession, endpoint: str, 
-                           params: Optional[Dict] = None, method: str = 'GET') -> Dict:
+                           params: Optional[Dict] = None, method: str = 'GET',
+                           force_refresh: bool = False, raw: bool = False) -> Dict:
         """
         发送异步API请求
         
@@ -50,53 +165,256 @@ class MerakiAPI:
             endpoint: API端点
             params: 查询参数
             method: HTTP方法
+            force_refresh: 忽略缓存，强制从API重新获取
+            raw: 返回未解码的响应体字节（与解码结果分开缓存）
+            
+        Returns:
+            API响应数据（raw=True 时为响应体字节）
+            
+        Raises:
+            MerakiAPIError: 当API请求失败时（详见 _send_uncached）
+        """
+        data, _ = await self._send(session, endpoint, params, method, force_refresh=force_refresh, raw=raw)
+        return data
+    
+    async def get_raw(self, session: aiohttp.ClientSession, endpoint: str, **params) -> bytes:
+        """
+        获取未解码的响应体，供直通Activity原样交给 Temporal 的 payload 转换器
+        
+        只返回第一页，不跟随分页链接。慢变化端点同样走读穿缓存（缓存的是响应体字节）。
+        
+        Args:
+            session: aiohttp客户端会话
+            endpoint: API端点
+            **params: 查询参数
+            
+        Returns:
+            响应体字节（JSON）
+        """
+        return await self._make_request(session, endpoint, params or None, raw=True)
+    
+    async def get_json(self, session: aiohttp.ClientSession, endpoint: str,
+                       force_refresh: bool = False, **params) -> Any:
+        """
+        获取任意GET端点的解码结果（只返回第一页）
+        
+        与 get_network_wireless_ssids 等辅助方法不同，失败时不返回空结果而是抛出 MerakiAPIError，
+        供需要区分“未配置”和“获取失败”的调用方（如 get_network_bundle）使用。
+        
+        Args:
+            session: aiohttp客户端会话
+            endpoint: API端点
+            force_refresh: 忽略缓存，强制从API重新获取
+            **params: 查询参数
             
         Returns:
             API响应数据
             
         Raises:
-            Exception: 当API请求失败时
+            MerakiAPIError: 当API请求失败时
+        """
+        return await self._make_request(session, endpoint, params or None, force_refresh=force_refresh)
+    
+    async def _send(self, session: aiohttp.ClientSession, endpoint: str,
+                    params: Optional[Dict] = None, method: str = 'GET',
+                    url: Optional[str] = None, force_refresh: bool = False,
+                    raw: bool = False) -> Tuple[Any, Optional[str]]:
+        """
+        发送请求，同时返回 Link 响应头中的下一页URL
+        
+        慢变化端点（见 meraki_cache.DEFAULT_CACHE_TTLS）的GET请求走读穿缓存；
+        其余GET请求在时间上重叠时合并为一次HTTP往返，共享同一个解码结果。
+        
+        Args:
+            session: aiohttp客户端会话
+            endpoint: API端点
+            params: 查询参数（url 不为None时忽略，下一页URL已包含查询参数）
+            method: HTTP方法
+            url: 完整请求URL（用于跟随分页链接），为None时由 endpoint 拼接
+            force_refresh: 忽略缓存，强制从API重新获取
+            raw: 返回未解码的响应体字节（与解码结果分开缓存）
+            
+        Returns:
+            (API响应数据, 下一页URL或None)
         """
-        url = f"{self.base_url}{endpoint}"
+        if url is None:
+            url = f"{self.base_url}{endpoint}"
+        else:
+            params = None
+        
+        if method != 'GET':
+            data, next_url, _ = await self._send_uncached(session, endpoint, url, params, method, raw)
+            return data, next_url
         
+        template = endpoint_template(endpoint)
+        key = (method, url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        
+        async def load():
+            # 合并器由所有实例共享，键中带上API密钥，不同密钥之间不共享响应
+            return await self.coalescer.do(
+                key + (raw, self.api_key), template,
+                lambda: self._send_uncached(session, endpoint, url, params, method, raw))
+        
+        ttl = self.cache.ttl_for(template)
+        if ttl is None:
+            data, next_url, _ = await load()
+            return data, next_url
+        
+        async def load_for_cache():
+            data, next_url, size = await load()
+            return (data, next_url), size
+        
+        return await self.cache.get_or_load(key + ("raw",) if raw else key, load_for_cache, ttl, force_refresh)
+    
+    async def _send_uncached(self, session: aiohttp.ClientSession, endpoint: str, url: str,
+                             params: Optional[Dict], method: str,
+                             raw: bool = False) -> Tuple[Any, Optional[str], int]:
+        """
+        发送请求（含限速与重试）
+        
+        Args:
+            session: aiohttp客户端会话
+            endpoint: API端点（用于限速和错误信息）
+            url: 完整请求URL
+            params: 查询参数
+            method: HTTP方法
+            raw: 不解码，直接返回响应体字节
+            
+        Returns:
+            (API响应数据, 下一页URL或None, 响应字节数)
+            
+        Raises:
+            MerakiClientError: 4xx错误（不可重试）
+            MerakiRateLimitError: 429且重试次数用尽
+            MerakiServerError: 5xx错误且重试次数用尽
+            MerakiConnectionError: 网络错误且重试次数用尽
+        """
+        org_id = self._resolve_org_id(endpoint)
+        template = endpoint_template(endpoint)
+        attempt = 0
+        delay = None
+        call_started = time.perf_counter()
+        
+        # Activity 内调用时，span 挂在 TracingInterceptor 创建的 RunActivity span 下
+        with self.metrics.span(template, method, url) as span:
+            while True:
+                attempt += 1
+                # 按API密钥和组织限速，避免触发429
+                await self.rate_limiter.acquire(self.api_key, org_id)
+            
+                started = time.perf_counter()
+                try:
+                    async with session.request(method, url, headers=self.headers, params=params) as response:
+                        if response.status < 400:
+                            next_link = response.links.get('next')
+                            body = await response.read()
+                            self.metrics.record_request(template, method, response.status,
+                                                        time.perf_counter() - started, len(body), span)
+                            data = body if raw else await self.decoder.decode(body)
+                            self.metrics.record_call(template, method, "ok", time.perf_counter() - call_started)
+                            return data, str(next_link['url']) if next_link else None, len(body)
+                        text = await response.text()
+                        self.metrics.record_request(template, method, response.status,
+                                                    time.perf_counter() - started, len(text.encode()), span)
+                        reason = text[:200] or (response.reason or "")
+                        error = error_for_status(response.status, endpoint, reason,
+                                                 response.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status = getattr(e, 'status', None)
+                    self.metrics.record_request(template, method, status or "error",
+                                                time.perf_counter() - started, 0, span)
+                    if status is not None:
+                        error = error_for_status(status, endpoint, str(e))
+                    else:
+                        error = MerakiConnectionError(f"Meraki API请求失败: {endpoint} {e!r}", None, endpoint)
+            
+                delay = self.retry_policy.next_delay(error, attempt, delay)
+                if delay is None:
+                    self.metrics.record_call(template, method, error_kind(error), time.perf_counter() - call_started)
+                    raise error
+                self.metrics.record_retry(template, method, error_kind(error), delay, span)
+                await asyncio.sleep(delay)
+    
+    async def iter_pages(self, session: aiohttp.ClientSession, endpoint: str,
+                         params: Optional[Dict] = None, max_items: Optional[int] = None,
+                         items_key: Optional[str] = None, prefetch: bool = True,
+                         start_url: Optional[str] = None,
+                         force_refresh: bool = False) -> AsyncIterator[Page]:
+        """
+        按 Link: rel=next 逐页获取列表接口数据（异步生成器）
+        
+        Args:
+            session: aiohttp客户端会话
+            endpoint: API端点
+            params: 第一页的查询参数（如 perPage, timespan）
+            max_items: 最多返回的条目总数（None表示全部）
+            items_key: 条目所在字段（响应为对象时使用，如 "events"）
+            prefetch: 是否在处理当前页时预取下一页
+            start_url: 从指定的下一页URL继续（用于断点续传）
+            force_refresh: 忽略缓存，强制从API重新获取
+            
+        Yields:
+            Page: 每一页的条目（items）和下一页游标（next_url）
+        """
+        async def fetch(url: Optional[str]) -> Tuple[Any, Optional[str]]:
+            return await self._send(session, endpoint, params, url=url, force_refresh=force_refresh)
+        
+        pages = 0
         try:
-            async with session.request(method, url, headers=self.headers, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientError as e:
-            error_msg = f"Meraki API请求失败: {e}"
-            if hasattr(e, 'status'):
-                error_msg += f" (状态码: {e.status})"
-            raise Exception(error_msg)
+            async for page in paginate(fetch, max_items=max_items, items_key=items_key,
+                                       prefetch=prefetch, start_url=start_url):
+                pages += 1
+                yield page
+        finally:
+            if pages:
+                self.metrics.record_pages(endpoint_template(endpoint), pages)
     
-    async def get_organizations(self, session: aiohttp.ClientSession, **params) -> List[Dict]:
+    async def _collect_pages(self, session: aiohttp.ClientSession, endpoint: str,
+                             params: Optional[Dict] = None, max_items: Optional[int] = None,
+                             items_key: Optional[str] = None, force_refresh: bool = False) -> List[Dict]:
+        """获取所有分页并合并为一个列表"""
+        results = []
+        async for page in self.iter_pages(session, endpoint, params, max_items, items_key,
+                                          force_refresh=force_refresh):
+            results.extend(page.items)
+        return results
+    
+    async def get_organizations(self, session: aiohttp.ClientSession, 
+                                max_items: Optional[int] = None, **params) -> List[Dict]:
         """
-        获取用户有权限访问的组织列表
+        获取用户有权限访问的组织列表（自动分页）
         
         Args:
             session: aiohttp客户端会话
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数（如 perPage, startingAfter, endingBefore）
             
         Returns:
             组织列表
         """
-        return await self._make_request(session, "/organizations", params)
+        return await self._collect_pages(session, "/organizations", params, max_items)
     
-    async def get_organization_networks(self, session: aiohttp.ClientSession, org_id: str) -> List[Dict]:
+    async def get_organization_networks(self, session: aiohttp.ClientSession, org_id: str,
+                                        max_items: Optional[int] = None,
+                                        force_refresh: bool = False) -> List[Dict]:
         """
-        获取组织的网络列表
+        获取组织的网络列表（自动分页，结果缓存）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
+            force_refresh: 忽略缓存，强制从API重新获取
             
         Returns:
             网络列表
         """
         try:
-            result = await self._make_request(session, f"/organizations/{org_id}/networks")
+            result = await self._collect_pages(session, f"/organizations/{org_id}/networks",
+                                               max_items=max_items, force_refresh=force_refresh)
             # 确保返回的是列表，如果不是则返回空列表
             if isinstance(result, list):
+                self._remember_orgs(org_id, result, 'id', self._network_orgs)
                 return result
             else:
                 return []
@@ -104,22 +422,25 @@ class MerakiAPI:
             # 如果获取网络列表失败，返回空列表
             return []
     
-    async def get_organization_devices(self, session: aiohttp.ClientSession, org_id: str, **params) -> List[Dict]:
+    async def get_organization_devices(self, session: aiohttp.ClientSession, org_id: str,
+                                       max_items: Optional[int] = None, **params) -> List[Dict]:
         """
-        获取组织的设备列表
+        获取组织的设备列表（自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数（如 perPage, startingAfter, name, serial 等）
             
         Returns:
             设备列表
         """
         try:
-            result = await self._make_request(session, f"/organizations/{org_id}/devices", params)
+            result = await self._collect_pages(session, f"/organizations/{org_id}/devices", params, max_items)
             # 确保返回的是列表，如果不是则返回空列表
             if isinstance(result, list):
+                self._remember_orgs(org_id, result, 'serial', self._device_orgs)
                 return result
             else:
                 return []
@@ -127,61 +448,149 @@ class MerakiAPI:
             # 如果获取设备列表失败，返回空列表
             return []
     
+    async def iter_organization_networks_pages(self, session: aiohttp.ClientSession, org_id: str,
+                                               force_refresh: bool = False, **params) -> AsyncIterator[Page]:
+        """
+        逐页获取组织网络列表（异步生成器）
+        
+        与 get_organization_networks 不同，请求失败时 MerakiAPIError 会直接抛出，
+        不会被当作空列表返回；需要全量数据的调用方（如库存镜像同步）应使用此方法。
+        
+        Args:
+            session: aiohttp客户端会话
+            org_id: 组织ID
+            force_refresh: 忽略缓存，强制从API重新获取
+            **params: 查询参数（如 perPage）
+            
+        Yields:
+            Page: 每一页的网络（同时记录网络所属的组织，供网络级请求按组织限速）
+        """
+        async for page in self.iter_pages(session, f"/organizations/{org_id}/networks", params,
+                                          force_refresh=force_refresh):
+            # 记录网络所属的组织，之后的网络级请求按该组织限速
+            self._remember_orgs(org_id, page.items, 'id', self._network_orgs)
+            yield page
+    
+    async def iter_organization_devices_pages(self, session: aiohttp.ClientSession, org_id: str,
+                                              start_url: Optional[str] = None, **params) -> AsyncIterator[Page]:
+        """
+        逐页获取组织设备列表（异步生成器）
+        
+        Args:
+            session: aiohttp客户端会话
+            org_id: 组织ID
+            start_url: 从指定的下一页URL继续（断点续传），None表示从第一页开始
+            **params: 查询参数（如 perPage）
+            
+        Yields:
+            Page: 每一页的设备（同时记录设备所属的组织，供设备级请求按组织限速）
+        """
+        async for page in self.iter_pages(session, f"/organizations/{org_id}/devices", params, start_url=start_url):
+            # 记录设备所属的组织，之后的设备级请求按该组织限速
+            self._remember_orgs(org_id, page.items, 'serial', self._device_orgs)
+            yield page
+    
+    def device_search_index(self, org_id: str) -> DeviceSearchIndex:
+        """获取组织的设备搜索索引（不存在时创建一个空索引）"""
+        index = self._search_indexes.get(org_id)
+        if index is None:
+            index = self._search_indexes[org_id] = DeviceSearchIndex()
+        return index
+    
+    def device_geo_index(self, org_id: str) -> GeoIndex:
+        """获取组织的设备地理索引（不存在时创建一个空索引）"""
+        index = self._geo_indexes.get(org_id)
+        if index is None:
+            index = self._geo_indexes[org_id] = GeoIndex()
+        return index
+    
+    async def sync_device_indexes(self, org_id: str, devices: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """
+        用一个完整的设备快照增量更新组织的搜索索引和地理索引
+        
+        大型组织的增量更新要处理数万台设备，因此在线程池中复制并更新索引副本，
+        完成后在事件循环上整体替换：不阻塞其他Activity，更新期间的查询继续使用旧索引。
+        
+        Returns:
+            Dict: search / geo -> 各索引的增量更新计数
+        """
+        search_index, geo_index = self.device_search_index(org_id), self.device_geo_index(org_id)
+        
+        def update():
+            search, geo = search_index.clone(), geo_index.clone()
+            return search, geo, {"search": search.sync(devices), "geo": geo.sync(devices)}
+        
+        search, geo, counts = await asyncio.to_thread(update)
+        self._search_indexes[org_id], self._geo_indexes[org_id] = search, geo
+        return counts
+    
+    async def refresh_device_search_index(self, session: aiohttp.ClientSession, org_id: str,
+                                          max_age: Optional[float] = None) -> DeviceSearchIndex:
+        """
+        获取组织的设备搜索索引，索引比 max_age 旧时先用新的设备快照增量更新
+        
+        Args:
+            session: aiohttp客户端会话
+            org_id: 组织ID
+            max_age: 索引最长使用时间（秒），None表示使用 MERAKI_SEARCH_MAX_AGE
+            
+        Returns:
+            DeviceSearchIndex
+        """
+        index = self.device_search_index(org_id)
+        if not index.is_stale(self.search_max_age if max_age is None else max_age):
+            return index
+        
+        async def load():
+            devices = []
+            # 沿 Link: rel=next 翻页，不再根据 serial/id 猜测游标
+            async for page in self.iter_pages(session, f"/organizations/{org_id}/devices", {"perPage": 5000}):
+                devices.extend(page.items)
+                self._remember_orgs(org_id, page.items, 'serial', self._device_orgs)
+            await self.sync_device_indexes(org_id, devices)
+            return self.device_search_index(org_id)
+        
+        # 本实例内并发的搜索共用同一次快照下载（索引属于本实例，键中带上实例标识）
+        return await self.coalescer.do(("device_search_index", id(self), org_id),
+                                       "/organizations/{organizationId}/devices", load)
+    
+    async def refresh_device_geo_index(self, session: aiohttp.ClientSession, org_id: str,
+                                       max_age: Optional[float] = None) -> GeoIndex:
+        """
+        获取组织的设备地理索引，索引比 max_age 旧时先用新的设备快照增量更新
+        
+        地理索引与搜索索引由同一个快照同时更新，新旧程度相同。
+        """
+        await self.refresh_device_search_index(session, org_id, max_age)
+        return self.device_geo_index(org_id)
+    
     async def get_all_organization_devices_with_name_filter(self, session: aiohttp.ClientSession, 
-                                                          org_id: str, name_filter: str = None) -> List[Dict]:
+                                                          org_id: str, name_filter: str = None,
+                                                          offset: int = 0,
+                                                          limit: Optional[int] = None) -> List[Dict]:
         """
         获取组织所有设备列表（支持分页和名称过滤）
         
+        名称过滤使用设备搜索索引的三元组倒排表缩小候选范围，不再对全部设备逐个做子串匹配；
+        匹配语义仍是名称的字面子串（不区分大小写），结果保持API返回顺序。
+        需要按匹配程度排序或多关键词搜索时使用 DeviceSearchIndex.search。
+        
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
             name_filter: 名称过滤字符串（包含匹配）
+            offset: 跳过的结果数
+            limit: 最多返回的结果数（None表示全部）
             
         Returns:
-            过滤后的设备列表
-        """
-        all_devices = []
-        per_page = 5000  # 官方文档最大值：3-5000，默认1000
-        starting_after = None
-        
-        while True:
-            params = {"perPage": per_page}
-            if starting_after:
-                params["startingAfter"] = starting_after
-                
-            try:
-                devices = await self._make_request(session, f"/organizations/{org_id}/devices", params)
-                
-                if not devices:  # 空列表，说明没有更多数据
-                    break
-                    
-                all_devices.extend(devices)
-                
-                # 检查是否还有更多页面
-                if len(devices) < per_page:
-                    # 返回的设备数少于请求数，说明这是最后一页
-                    break
-                else:
-                    # 设置下一页的起始点
-                    starting_after = devices[-1].get("serial") or devices[-1].get("id")
-                    if not starting_after:
-                        break  # 无法获取分页标识，退出
-                        
-            except Exception as e:
-                print(f"获取设备列表失败: {e}")
-                break
-        
-        # 如果指定了名称过滤，进行字符串包含匹配
-        if name_filter:
-            name_filter_lower = name_filter.lower()
-            filtered_devices = []
-            for device in all_devices:
-                device_name = device.get("name", "").lower()
-                if name_filter_lower in device_name:
-                    filtered_devices.append(device)
-            return filtered_devices
-        
-        return all_devices
+            过滤后的设备列表（按API返回顺序）
+            
+        Raises:
+            MerakiAPIError: 获取设备快照失败（不再返回旧索引或空列表）
+        """
+        index = await self.refresh_device_search_index(session, org_id)
+        devices = index.filter_name(name_filter) if name_filter else index.devices()
+        return devices[offset:] if limit is None else devices[offset:offset + limit]
     
     async def get_device_uplinks(self, session: aiohttp.ClientSession, org_id: str, 
                                 serials: List[str]) -> List[Dict]:
@@ -194,10 +603,10 @@ class MerakiAPI:
             serials: 设备序列号列表
             
         Returns:
-            设备上行链路信息
+            设备上行链路信息（自动分页）
         """
         params = {'serials': serials}
-        return await self._make_request(session, f"/organizations/{org_id}/devices/uplinks/addresses/byDevice", params)
+        return await self._collect_pages(session, f"/organizations/{org_id}/devices/uplinks/addresses/byDevice", params)
     
     async def get_device_statuses_overview(self, session: aiohttp.ClientSession, org_id: str, **params) -> Dict:
         """
@@ -229,19 +638,36 @@ class MerakiAPI:
         return await self._make_request(session, f"/devices/{serial}/lossAndLatencyHistory", params)
     
     async def get_network_clients(self, session: aiohttp.ClientSession, network_id: str, 
-                                 **params) -> List[Dict]:
+                                 max_items: Optional[int] = None, **params) -> List[Dict]:
         """
-        获取网络客户端列表
+        获取网络客户端列表（自动分页）
         
         Args:
             session: aiohttp客户端会话
             network_id: 网络ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数（如 timespan, perPage 等）
             
         Returns:
             网络客户端列表
         """
-        return await self._make_request(session, f"/networks/{network_id}/clients", params)
+        return await self._collect_pages(session, f"/networks/{network_id}/clients", params, max_items)
+    
+    def iter_network_clients_pages(self, session: aiohttp.ClientSession, network_id: str,
+                                   start_url: Optional[str] = None, **params) -> AsyncIterator[Page]:
+        """
+        逐页获取网络客户端列表（异步生成器）
+        
+        Args:
+            session: aiohttp客户端会话
+            network_id: 网络ID
+            start_url: 从指定的下一页URL继续（断点续传），None表示从第一页开始
+            **params: 查询参数（如 timespan, perPage）
+            
+        Returns:
+            按页产出 Page 的异步迭代器
+        """
+        return self.iter_pages(session, f"/networks/{network_id}/clients", params, start_url=start_url)
     
     async def get_device_clients(self, session: aiohttp.ClientSession, serial: str, 
                                 **params) -> List[Dict]:
@@ -259,49 +685,55 @@ class MerakiAPI:
         return await self._make_request(session, f"/devices/{serial}/clients", params)
     
     async def get_organization_licenses_overview(self, session: aiohttp.ClientSession, 
-                                               org_id: str) -> Dict:
+                                               org_id: str, force_refresh: bool = False) -> Dict:
         """
-        获取组织许可证概览
+        获取组织许可证概览（结果缓存）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            force_refresh: 忽略缓存，强制从API重新获取
             
         Returns:
             许可证概览信息
         """
-        return await self._make_request(session, f"/organizations/{org_id}/licenses/overview")
+        return await self._make_request(session, f"/organizations/{org_id}/licenses/overview",
+                                        force_refresh=force_refresh)
     
     async def get_organization_licenses(self, session: aiohttp.ClientSession, org_id: str, 
-                                      **params) -> List[Dict]:
+                                      max_items: Optional[int] = None, **params) -> List[Dict]:
         """
-        获取组织许可证列表
+        获取组织许可证列表（自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数
             
         Returns:
             许可证列表
         """
-        return await self._make_request(session, f"/organizations/{org_id}/licenses", params)
+        return await self._collect_pages(session, f"/organizations/{org_id}/licenses", params, max_items)
     
     async def get_organization_assurance_alerts(self, session: aiohttp.ClientSession, 
-                                              org_id: str, **params) -> List[Dict]:
+                                              org_id: str, max_items: Optional[int] = None,
+                                              **params) -> List[Dict]:
         """
-        获取组织健康警报
+        获取组织健康警报（自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数
             
         Returns:
             健康警报列表
         """
         try:
-            result = await self._make_request(session, f"/organizations/{org_id}/assurance/alerts", params)
+            result = await self._collect_pages(session, f"/organizations/{org_id}/assurance/alerts",
+                                               params, max_items)
             # 确保返回的是列表，如果不是则返回空列表
             if isinstance(result, list):
                 return result
@@ -326,19 +758,37 @@ class MerakiAPI:
         return await self._make_request(session, f"/organizations/{org_id}/assurance/alerts/overview")
     
     async def get_network_events(self, session: aiohttp.ClientSession, network_id: str, 
-                                **params) -> List[Dict]:
+                                max_items: Optional[int] = None, **params) -> List[Dict]:
         """
-        获取网络事件列表
+        获取网络事件列表（自动分页）
         
         Args:
             session: aiohttp客户端会话
             network_id: 网络ID
-            **params: 查询参数
+            max_items: 最多返回的条目数（None表示全部）
+            **params: 查询参数（如 productType, perPage, startingAfter）
             
         Returns:
-            网络事件列表
+            网络事件列表（已从响应的 events 字段中展开）
+        """
+        return await self._collect_pages(session, f"/networks/{network_id}/events", params, max_items,
+                                         items_key="events")
+    
+    def iter_network_events_pages(self, session: aiohttp.ClientSession, network_id: str,
+                                  **params) -> AsyncIterator[Page]:
+        """
+        逐页获取网络事件（异步生成器，不使用缓存）
+        
+        Args:
+            session: aiohttp客户端会话
+            network_id: 网络ID
+            **params: 查询参数（如 productType, perPage, startingAfter）
+        
+        Returns:
+            按页产出 Page 的异步迭代器（已从响应的 events 字段中展开）
         """
-        return await self._make_request(session, f"/networks/{network_id}/events", params)
+        return self.iter_pages(session, f"/networks/{network_id}/events", params,
+                               items_key="events", prefetch=False, force_refresh=True)
     
     async def get_device_info(self, session: aiohttp.ClientSession, serial: str) -> Dict:
         """
@@ -353,33 +803,38 @@ class MerakiAPI:
         """
         return await self._make_request(session, f"/devices/{serial}")
     
-    async def get_network_floor_plans(self, session: aiohttp.ClientSession, network_id: str) -> List[Dict]:
+    async def get_network_floor_plans(self, session: aiohttp.ClientSession, network_id: str,
+                                      force_refresh: bool = False) -> List[Dict]:
         """
-        获取网络楼层平面图列表
+        获取网络楼层平面图列表（结果缓存）
         
         Args:
             session: aiohttp客户端会话
             network_id: 网络ID
+            force_refresh: 忽略缓存，强制从API重新获取
             
         Returns:
             楼层平面图列表
         """
-        return await self._make_request(session, f"/networks/{network_id}/floorPlans")
+        return await self._make_request(session, f"/networks/{network_id}/floorPlans",
+                                        force_refresh=force_refresh)
     
     async def get_floor_plan_by_id(self, session: aiohttp.ClientSession, network_id: str, 
-                                  floor_plan_id: str) -> Dict:
+                                  floor_plan_id: str, force_refresh: bool = False) -> Dict:
         """
-        根据ID获取楼层平面图详情
+        根据ID获取楼层平面图详情（结果缓存）
         
         Args:
             session: aiohttp客户端会话
             network_id: 网络ID
             floor_plan_id: 楼层平面图ID
+            force_refresh: 忽略缓存，强制从API重新获取
             
         Returns:
             楼层平面图详细信息
         """
-        return await self._make_request(session, f"/networks/{network_id}/floorPlans/{floor_plan_id}")
+        return await self._make_request(session, f"/networks/{network_id}/floorPlans/{floor_plan_id}",
+                                        force_refresh=force_refresh)
     
     async def get_network_client_by_id(self, session: aiohttp.ClientSession, network_id: str, 
                                       client_id: str) -> Dict:
@@ -474,36 +929,40 @@ class MerakiAPI:
         return await self._make_request(session, f"/organizations/{org_id}/summary/top/networks/byStatus", params)
     
     async def get_organization_devices_statuses(self, session: aiohttp.ClientSession, 
-                                              org_id: str, **params) -> List[Dict]:
+                                              org_id: str, max_items: Optional[int] = None,
+                                              **params) -> List[Dict]:
         """
-        获取组织中每个Meraki设备的状态（已弃用但仍可用）
+        获取组织中每个Meraki设备的状态（已弃用但仍可用，自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数
             
         Returns:
             设备状态列表
         """
-        return await self._make_request(session, f"/organizations/{org_id}/devices/statuses", params)
+        return await self._collect_pages(session, f"/organizations/{org_id}/devices/statuses", params, max_items)
     
     # ========== 扩展的只读 API 方法 ==========
     
     async def get_network_wireless_ssids(self, session: aiohttp.ClientSession, 
-                                       network_id: str) -> List[Dict]:
+                                       network_id: str, force_refresh: bool = False) -> List[Dict]:
         """
-        获取网络无线SSID列表
+        获取网络无线SSID列表（结果缓存）
         
         Args:
             session: aiohttp客户端会话
             network_id: 网络ID
+            force_refresh: 忽略缓存，强制从API重新获取
             
         Returns:
             SSID列表
         """
         try:
-            result = await self._make_request(session, f"/networks/{network_id}/wireless/ssids")
+            result = await self._make_request(session, f"/networks/{network_id}/wireless/ssids",
+                                              force_refresh=force_refresh)
             # 确保返回的是列表，如果不是则返回空列表
             if isinstance(result, list):
                 return result
@@ -621,19 +1080,21 @@ class MerakiAPI:
         return await self._make_request(session, f"/devices/{serial}/switch/ports")
     
     async def get_organization_inventory_devices(self, session: aiohttp.ClientSession, 
-                                               org_id: str, **params) -> List[Dict]:
+                                               org_id: str, max_items: Optional[int] = None,
+                                               **params) -> List[Dict]:
         """
-        获取组织设备库存
+        获取组织设备库存（自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数
             
         Returns:
             设备库存列表
         """
-        return await self._make_request(session, f"/organizations/{org_id}/inventory/devices", params)
+        return await self._collect_pages(session, f"/organizations/{org_id}/inventory/devices", params, max_items)
     
     async def get_network_alerts_settings(self, session: aiohttp.ClientSession, 
                                         network_id: str) -> Dict:
@@ -1054,19 +1515,21 @@ class MerakiAPI:
         return await self._make_request(session, f"/organizations/{org_id}/clients/search", params)
 
     async def get_organization_uplinks_statuses(self, session: aiohttp.ClientSession, 
-                                              org_id: str, **params) -> List[Dict]:
+                                              org_id: str, max_items: Optional[int] = None,
+                                              **params) -> List[Dict]:
         """
-        获取组织上行链路状态
+        获取组织上行链路状态（自动分页）
         
         Args:
             session: aiohttp客户端会话
             org_id: 组织ID
+            max_items: 最多返回的条目数（None表示全部）
             **params: 查询参数
             
         Returns:
             上行链路状态列表
         """
-        return await self._make_request(session, f"/organizations/{org_id}/uplinks/statuses", params)
+        return await self._collect_pages(session, f"/organizations/{org_id}/uplinks/statuses", params, max_items)
 
     async def get_device_appliance_uplinks_settings(self, session: aiohttp.ClientSession, 
                                                    serial: str) -> Dict:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+告警一次遍历聚合
+
+AlertsLogWorkflow、DeviceInspectionWorkflow、NetworkHealthAnalysisWorkflow 原本各自拿到完整的
+告警列表，再按严重程度、类别分别用列表推导式重复扫描，告警有十万条时每个维度都要遍历一遍，
+完整列表还要写入Workflow历史。aggregate_alerts 在Activity内只遍历一次告警，同时得到：
+
+- 各维度计数: 严重程度、类别、告警类型、网络、设备类型，及未解决告警按严重程度的计数
+- 二维矩阵: 严重程度 × 类别 / 网络 / 设备类型（{行: {列: 数量}}，用于热力图）
+- 稀疏四维数据立方: [严重程度, 类别, 网络ID, 设备类型, 数量, 未解决数量]，
+  Workflow 可在其上做任意组合的分组汇总而不必重新遍历告警
+- 前 top_n 条严重告警（保持API返回顺序）
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+SEVERITIES = ("critical", "warning", "info")
+DEFAULT_TOP_ALERTS = 10
+
+_UNKNOWN = "unknown"
+
+
+def _device_type(alert: Dict[str, Any]) -> str:
+    device_type = alert.get("deviceType")
+    if device_type:
+        return str(device_type)
+    devices = (alert.get("scope") or {}).get("devices") or []
+    if devices and isinstance(devices[0], dict) and devices[0].get("productType"):
+        return str(devices[0]["productType"])
+    return _UNKNOWN
+
+
+def _count(counter: Dict[str, int], key: str, amount: int = 1):
+    counter[key] = counter.get(key, 0) + amount
+
+
+def _matrix(cells: Dict[Tuple[str, str], int]) -> Dict[str, Dict[str, int]]:
+    matrix: Dict[str, Dict[str, int]] = {}
+    for (row, column), count in cells.items():
+        matrix.setdefault(row, {})[column] = count
+    return matrix
+
+
+def aggregate_alerts(alerts: Iterable[Dict[str, Any]], top_n: int = DEFAULT_TOP_ALERTS) -> Dict[str, Any]:
+    """
+    一次遍历聚合告警
+
+    Args:
+        alerts: GET /organizations/{organizationId}/assurance/alerts 返回的告警
+        top_n: 返回的严重告警条数
+
+    Returns:
+        Dict: 聚合结果，包含:
+            - total (int) / unresolved (int): 告警总数、未解决（无 resolvedAt）告警数
+            - by_severity / unresolved_by_severity (Dict[str, int]): 按严重程度计数（critical、warning、info 总是存在）
+            - by_category / by_type / by_device_type (Dict[str, int]): 按类别、告警类型、设备类型计数
+            - by_network (Dict[str, Dict]): 网络ID -> {name, total, unresolved, critical, warning, info}
+            - severity_by_category / severity_by_network / severity_by_device_type (Dict[str, Dict[str, int]]):
+              严重程度 × 维度 矩阵
+            - cube (List[List]): [严重程度, 类别, 网络ID, 设备类型, 数量, 未解决数量]，按数量降序
+            - critical_alerts (List[Dict]): 前 top_n 条严重告警
+    """
+    total = unresolved = 0
+    by_severity = {severity: 0 for severity in SEVERITIES}
+    unresolved_by_severity = {severity: 0 for severity in SEVERITIES}
+    by_category: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    by_device_type: Dict[str, int] = {}
+    by_network: Dict[str, Dict[str, Any]] = {}
+    # (严重程度, 类别, 网络ID, 设备类型) -> [数量, 未解决数量]
+    cube: Dict[Tuple[str, str, str, str], List[int]] = {}
+    critical_alerts: List[Dict[str, Any]] = []
+
+    for alert in alerts:
+        if not isinstance(alert, dict):
+            continue
+        severity = alert.get("severity") or _UNKNOWN
+        category = alert.get("categoryType") or _UNKNOWN
+        network = alert.get("network") or {}
+        network_id = network.get("id") or _UNKNOWN
+        device_type = _device_type(alert)
+        is_open = not alert.get("resolvedAt")
+
+        total += 1
+        _count(by_severity, severity)
+        _count(by_category, category)
+        _count(by_type, alert.get("type") or _UNKNOWN)
+        _count(by_device_type, device_type)
+
+        network_counts = by_network.get(network_id)
+        if network_counts is None:
+            network_counts = by_network[network_id] = {
+                "name": network.get("name", ""), "total": 0, "unresolved": 0,
+                **{s: 0 for s in SEVERITIES}}
+        network_counts["total"] += 1
+        _count(network_counts, severity)
+
+        cell = cube.get((severity, category, network_id, device_type))
+        if cell is None:
+            cell = cube[(severity, category, network_id, device_type)] = [0, 0]
+        cell[0] += 1
+
+        if is_open:
+            unresolved += 1
+            _count(unresolved_by_severity, severity)
+            network_counts["unresolved"] += 1
+            cell[1] += 1
+
+        if severity == "critical" and len(critical_alerts) < top_n:
+            critical_alerts.append(alert)
+
+    # 二维矩阵由数据立方汇总，数据立方的大小只取决于不同组合的个数
+    severity_category: Dict[Tuple[str, str], int] = {}
+    severity_network: Dict[Tuple[str, str], int] = {}
+    severity_device_type: Dict[Tuple[str, str], int] = {}
+    for (severity, category, network_id, device_type), (count, _) in cube.items():
+        severity_category[(severity, category)] = severity_category.get((severity, category), 0) + count
+        severity_network[(severity, network_id)] = severity_network.get((severity, network_id), 0) + count
+        severity_device_type[(severity, device_type)] = severity_device_type.get((severity, device_type), 0) + count
+
+    return {
+        "total": total,
+        "unresolved": unresolved,
+        "by_severity": by_severity,
+        "unresolved_by_severity": unresolved_by_severity,
+        "by_category": by_category,
+        "by_type": by_type,
+        "by_device_type": by_device_type,
+        "by_network": by_network,
+        "severity_by_category": _matrix(severity_category),
+        "severity_by_network": _matrix(severity_network),
+        "severity_by_device_type": _matrix(severity_device_type),
+        "cube": sorted(([*key, count, open_count] for key, (count, open_count) in cube.items()),
+                       key=lambda row: (-row[4], row[:4])),
+        "critical_alerts": critical_alerts,
+    }
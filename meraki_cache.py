@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 读穿缓存
+
+网络列表、许可证概览、SSID、楼层平面图等接口一天只变化几次，
+却在几乎每个 Workflow 开头都被重新下载。本模块提供：
+
+- endpoint_template(): 把具体端点归一化为模板（如 /networks/{networkId}/clients）
+- SingleFlight: 相同请求并发时只发出一次，其余调用方共享结果
+- RequestCoalescer: 对所有GET请求做进程内合并，并按端点模板统计命中/未命中
+- TTLCache: 按端点模板设置TTL、按字节数做LRU淘汰的缓存
+- FloorPlanIndex: 楼层平面图名称索引，按楼层名直接定位所在网络
+
+缓存参数可通过环境变量调整：
+- MERAKI_CACHE_MAX_BYTES: 缓存总字节上限（默认 64MB，设为0关闭缓存）
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 慢变化端点的缓存时间（秒），键为 endpoint_template() 的结果
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    "/organizations/{organizationId}/networks": 300,
+    "/organizations/{organizationId}/licenses/overview": 3600,
+    "/networks/{networkId}/wireless/ssids": 1800,
+    "/networks/{networkId}/floorPlans": 1800,
+    "/networks/{networkId}/floorPlans/{floorPlanId}": 1800,
+}
+
+# 路径中紧跟在这些集合名之后的段为资源ID
+_ID_PARENTS = {
+    "organizations": "{organizationId}",
+    "networks": "{networkId}",
+    "devices": "{serial}",
+    "floorPlans": "{floorPlanId}",
+    "clients": "{clientId}",
+    "ssids": "{number}",
+    "configTemplates": "{configTemplateId}",
+    "admins": "{adminId}",
+    "httpServers": "{id}",
+}
+
+# 紧跟在集合名之后、但属于子资源而非ID的段
+_SUB_RESOURCES = {
+    "overview", "search", "statuses", "uplinks", "usageHistories", "applicationUsage",
+    "connectionStats", "availabilities", "bandwidthUsageHistory", "packetCaptures",
+}
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    将具体端点归一化为端点模板
+
+    示例:
+        /networks/L_123/clients          -> /networks/{networkId}/clients
+        /organizations/85/devices/statuses -> /organizations/{organizationId}/devices/statuses
+
+    Args:
+        endpoint: API端点（不含 base_url 和查询参数）
+
+    Returns:
+        端点模板
+    """
+    parts = endpoint.split("?", 1)[0].strip("/").split("/")
+    result = []
+    for i, part in enumerate(parts):
+        parent = parts[i - 1] if i > 0 else None
+        if parent in _ID_PARENTS and part not in _SUB_RESOURCES and result[-1] == parent:
+            result.append(_ID_PARENTS[parent])
+        else:
+            result.append(part)
+    return "/" + "/".join(result)
+
+
+class SingleFlight:
+    """并发请求合并：同一个键同时只执行一次加载，其余调用方等待并共享结果"""
+
+    def __init__(self):
+        self._inflight: Dict[Any, asyncio.Task] = {}
+
+    @property
+    def inflight(self) -> int:
+        """当前正在进行中的加载数"""
+        return len(self._inflight)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._inflight
+
+    def _forget(self, key: Any, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待者都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        执行加载或等待已在进行中的加载
+
+        加载在独立的任务中运行，发起者被取消（如Activity被取消）时
+        不会连带取消其他共享该结果的调用方。
+
+        Args:
+            key: 请求键
+            loader: 加载函数
+
+        Returns:
+            (结果, 是否共享了其他调用方的加载)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task), shared
+
+
+class RequestCoalescer:
+    """
+    进程内GET请求合并，按端点模板统计命中（共享）与未命中（实际发出）次数
+
+    默认由进程内所有 MerakiAPI 实例共享（见 get_default_request_coalescer），
+    调用方须在请求键中包含 API 密钥，避免不同密钥共享响应。
+    """
+
+    def __init__(self):
+        self._single_flight = SingleFlight()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    async def do(self, key: Any, template: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        合并执行请求
+
+        Args:
+            key: 请求键（方法、URL、查询参数）
+            template: 端点模板（统计标签）
+            loader: 实际发出请求的函数
+
+        Returns:
+            请求结果（与其他并发调用方共享，调用方不应修改）
+        """
+        # 在等待之前计数，发起者中途被取消时同样计入
+        self._counters[template]["hits" if key in self._single_flight else "misses"] += 1
+        result, _ = await self._single_flight.do(key, loader)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取合并统计信息
+
+        Returns:
+            Dict: inflight（进行中的请求数）和 endpoints（端点模板 -> hits/misses）
+        """
+        return {
+            "inflight": self._single_flight.inflight,
+            "endpoints": {template: dict(c) for template, c in self._counters.items()},
+        }
+
+
+_default_request_coalescer: Optional[RequestCoalescer] = None
+
+
+def get_default_request_coalescer() -> RequestCoalescer:
+    """获取进程级共享的默认请求合并器"""
+    global _default_request_coalescer
+    if _default_request_coalescer is None:
+        _default_request_coalescer = RequestCoalescer()
+    return _default_request_coalescer
+
+
+class TTLCache:
+    """按端点TTL过期、按字节数LRU淘汰、未命中时合并并发加载的缓存"""
+
+    def __init__(self, max_bytes: Optional[int] = None, ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            max_bytes: 缓存总字节上限（为None时读取 MERAKI_CACHE_MAX_BYTES，0表示关闭）
+            ttls: 端点模板 -> TTL秒数（为None时使用 DEFAULT_CACHE_TTLS）
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("MERAKI_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES))
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+
+        # key -> (过期时间, 字节数, 值)
+        self._entries: "OrderedDict[Any, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._single_flight = SingleFlight()
+        self._counters = {"hits": 0, "misses": 0, "shared_loads": 0, "evictions": 0, "refreshes": 0}
+
+    def ttl_for(self, template: str) -> Optional[float]:
+        """获取端点模板的TTL，未配置缓存时返回None"""
+        if self.max_bytes <= 0:
+            return None
+        return self.ttls.get(template)
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        """
+        读取缓存
+
+        Returns:
+            (是否命中, 值)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Any, value: Any, size: int, ttl: float):
+        """写入缓存，超出字节上限时淘汰最久未使用的条目"""
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters["evictions"] += 1
+
+    def _remove(self, key: Any):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    async def get_or_load(self, key: Any, loader: Callable[[], Awaitable[Tuple[Any, int]]],
+                          ttl: float, force_refresh: bool = False) -> Any:
+        """
+        读穿缓存：命中直接返回，未命中时加载并写入；并发未命中只加载一次
+
+        Args:
+            key: 缓存键
+            loader: 加载函数，返回 (值, 字节数)
+            ttl: 缓存时间（秒）
+            force_refresh: 忽略已缓存的值，强制重新加载
+
+        Returns:
+            缓存值（调用方不应修改返回的对象）
+        """
+        if force_refresh:
+            self._counters["refreshes"] += 1
+        else:
+            hit, value = self.get(key)
+            if hit:
+                self._counters["hits"] += 1
+                return value
+
+        async def load_and_store():
+            value, size = await loader()
+            self.set(key, value, size, ttl)
+            return value
+
+        self._counters["misses"] += 1
+        value, shared = await self._single_flight.do(("cache", key, force_refresh), load_and_store)
+        if shared:
+            self._counters["shared_loads"] += 1
+        return value
+
+    def invalidate(self, prefix: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            prefix: 只删除URL以此开头的条目（为None时清空全部）
+
+        Returns:
+            int: 删除的条目数
+        """
+        keys = [k for k in self._entries
+                if prefix is None or (isinstance(k, tuple) and str(k[1]).startswith(prefix))]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class FloorPlanIndex:
+    """
+    楼层平面图名称索引（Worker进程内）
+
+    每次获取网络楼层平面图时更新，之后按楼层名查询可直接定位到所在网络，
+    而不必逐个网络地查询楼层平面图。条目过期时间与楼层平面图缓存相同。
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTLS["/networks/{networkId}/floorPlans"]):
+        """
+        Args:
+            ttl: 索引条目的有效期（秒）
+        """
+        self.ttl = ttl
+        # network_id -> (更新时间, [{floorplan_id, floorplan_name, image_url}])
+        self._networks: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._counters = {"lookups": 0, "hits": 0}
+
+    def update(self, network_id: str, floorplans: List[Dict[str, Any]]):
+        """用 get_network_floor_plans 的结果替换该网络的索引条目"""
+        self._networks[network_id] = (time.monotonic(), [
+            {
+                "floorplan_id": fp.get("floorPlanId", ""),
+                "floorplan_name": fp.get("name", ""),
+                "image_url": fp.get("imageUrl", ""),
+            }
+            for fp in floorplans if isinstance(fp, dict)
+        ])
+
+    def find(self, network_ids: Iterable[str], floor_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        查找楼层平面图
+
+        Args:
+            network_ids: 要查找的网络ID（结果按此顺序排列）
+            floor_name: 楼层名称关键词（不区分大小写，为None时返回全部）
+
+        Returns:
+            List[Dict]: 匹配的楼层平面图 {network_id, floorplan_id, floorplan_name, image_url}，
+                        未被索引或已过期的网络不在结果中
+        """
+        self._counters["lookups"] += 1
+        keyword = (floor_name or "").lower()
+        now = time.monotonic()
+        result = []
+        for network_id in network_ids:
+            entry = self._networks.get(network_id)
+            if entry is None:
+                continue
+            updated_at, floorplans = entry
+            if now - updated_at > self.ttl:
+                del self._networks[network_id]
+                continue
+            result.extend({"network_id": network_id, **fp} for fp in floorplans
+                          if keyword in fp["floorplan_name"].lower())
+        if result:
+            self._counters["hits"] += 1
+        return result
+
+    def indexed_networks(self, network_ids: Iterable[str]) -> List[str]:
+        """
+        返回索引中有未过期条目的网络（包括没有楼层平面图的网络）
+
+        Args:
+            network_ids: 要检查的网络ID（结果按此顺序排列）
+
+        Returns:
+            List[str]: 已被索引的网络ID；不在其中的网络需要重新查询楼层平面图列表
+        """
+        now = time.monotonic()
+        return [network_id for network_id in network_ids
+                if network_id in self._networks and now - self._networks[network_id][0] <= self.ttl]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取索引统计信息"""
+        return {
+            "networks": len(self._networks),
+            "floorplans": sum(len(fps) for _, fps in self._networks.values()),
+            **self._counters,
+        }
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+客户端MAC索引（Worker进程内）
+
+LostDeviceTraceWorkflow 按MAC查找丢失设备时原本逐个网络拉取客户端列表，
+每次查找需要 O(网络数) 次API调用。ClientMacIndex 保存 MAC -> 最近一次出现的
+网络、接入AP序列号和 lastSeen：
+
+- 来源: get_organization_clients_search 的结果，以及 get_network_clients /
+  sweep_network_clients 定期扫描各网络客户端
+- 同一MAC只保留 lastSeen 最新的一次观测
+- 条目写入后 ttl 秒过期，超过 max_entries 时按最近最少使用淘汰，
+  访客流动频繁（10万+临时客户端）的园区内存占用也有上限
+
+参数可通过环境变量调整：
+- MERAKI_CLIENT_INDEX_TTL: 条目有效期秒数（默认 86400）
+- MERAKI_CLIENT_INDEX_MAX_ENTRIES: 最多保存的MAC数（默认 200000）
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+
+DEFAULT_CLIENT_INDEX_TTL = 86400
+DEFAULT_CLIENT_INDEX_MAX_ENTRIES = 200000
+
+
+def normalize_mac(mac: str) -> str:
+    """统一MAC地址格式为小写冒号分隔（aa:bb:cc:dd:ee:ff），无法识别时原样小写返回"""
+    digits = "".join(ch for ch in str(mac).lower() if ch in "0123456789abcdef")
+    if len(digits) != 12:
+        return str(mac).strip().lower()
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """lastSeen 可能是Unix时间戳或ISO 8601字符串，统一为时间戳"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class ClientMacIndex:
+    """MAC -> 最近所在网络/AP/lastSeen 的有界索引，带TTL和LRU淘汰"""
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            ttl: 条目有效期（秒，为None时读取 MERAKI_CLIENT_INDEX_TTL）
+            max_entries: 最多保存的MAC数（为None时读取 MERAKI_CLIENT_INDEX_MAX_ENTRIES）
+        """
+        self.ttl = ttl if ttl is not None else float(
+            os.getenv("MERAKI_CLIENT_INDEX_TTL", DEFAULT_CLIENT_INDEX_TTL))
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.getenv("MERAKI_CLIENT_INDEX_MAX_ENTRIES", DEFAULT_CLIENT_INDEX_MAX_ENTRIES))
+
+        # mac -> (过期时间, 条目)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters = {"lookups": 0, "hits": 0, "expired": 0, "evictions": 0, "updates": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, mac: str, network_id: str, source: str, client_id: Optional[str] = None,
+               ap_serial: Optional[str] = None, last_seen: Any = None, **extra: Any) -> bool:
+        """
+        记录一次客户端观测
+
+        Args:
+            mac: 客户端MAC地址
+            network_id: 所在网络ID
+            source: 观测来源（如 "search"、"network_clients"）
+            client_id: 客户端ID
+            ap_serial: 最近接入的AP（设备）序列号
+            last_seen: 最后出现时间（Unix时间戳或ISO字符串）
+            **extra: 其他保存到条目中的字段（如 network_name、description、ssid）
+
+        Returns:
+            是否写入（已有 lastSeen 更新的未过期观测时不覆盖）
+        """
+        key = normalize_mac(mac)
+        now = time.monotonic()
+        seen = _epoch(last_seen)
+        current = self._entries.get(key)
+        if current is not None and current[0] > now:
+            current_seen = current[1]["last_seen"]
+            if current_seen is not None and (seen is None or current_seen > seen):
+                return False
+        self._entries[key] = (now + self.ttl, {
+            "mac": key,
+            "network_id": network_id,
+            "client_id": client_id,
+            "ap_serial": ap_serial,
+            "last_seen": seen,
+            "source": source,
+            **{k: v for k, v in extra.items() if v is not None},
+        })
+        self._entries.move_to_end(key)
+        self._counters["updates"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+        return True
+
+    def add_network_clients(self, network_id: str, clients: Iterable[Dict[str, Any]],
+                            network_name: Optional[str] = None) -> int:
+        """
+        用 GET /networks/{networkId}/clients 的结果更新索引
+
+        Returns:
+            写入的条目数
+        """
+        written = 0
+        for client in clients:
+            if not isinstance(client, dict) or not client.get("mac"):
+                continue
+            written += self.record(
+                client["mac"], network_id, "network_clients",
+                client_id=client.get("id"), ap_serial=client.get("recentDeviceSerial"),
+                last_seen=client.get("lastSeen"), network_name=network_name,
+                ap_name=client.get("recentDeviceName"), description=client.get("description"),
+                ssid=client.get("ssid"))
+        return written
+
+    def add_search_result(self, result: Any) -> int:
+        """
+        用 GET /organizations/{organizationId}/clients/search 的结果更新索引
+
+        结果为 {mac, clientId, records: [{network: {id, name}, lastSeen, recentDeviceSerial, ...}]}，
+        每条 record 是该客户端在一个网络中的记录，按 lastSeen 保留最新的一条。
+
+        Returns:
+            写入的条目数
+        """
+        if not isinstance(result, dict) or not result.get("mac"):
+            return 0
+        written = 0
+        for record in result.get("records") or []:
+            network = record.get("network") or {}
+            if not network.get("id"):
+                continue
+            written += self.record(
+                result["mac"], network["id"], "search",
+                client_id=record.get("clientId") or result.get("clientId"),
+                ap_serial=record.get("recentDeviceSerial"), last_seen=record.get("lastSeen"),
+                network_name=network.get("name"), ap_name=record.get("recentDeviceName"),
+                description=record.get("description"), ssid=record.get("ssid"))
+        return written
+
+    def lookup(self, mac: str) -> Optional[Dict[str, Any]]:
+        """
+        查找客户端最近一次出现的位置
+
+        Returns:
+            {mac, network_id, client_id, ap_serial, last_seen, source, ...}，未索引或已过期时返回None
+        """
+        self._counters["lookups"] += 1
+        key = normalize_mac(mac)
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._counters["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return dict(entry)
+
+    def purge_expired(self) -> int:
+        """删除所有已过期的条目，返回删除数量"""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self._counters["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取索引统计信息（条目数、命中率、过期与淘汰次数）"""
+        lookups = self._counters["lookups"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
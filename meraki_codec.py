@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Temporal 压缩 Payload Codec
+
+设备定位等Workflow结果（如 workflow_results/8.json，28KB）以及Activity与Workflow之间
+传递的设备/客户端列表都以未压缩的JSON写入 Temporal 历史。CompressionCodec 将超过阈值的
+payload 整体序列化后压缩，并用 metadata 中的 encoding 标记压缩算法：
+
+- binary/zstd: 已安装 zstandard 时默认使用
+- binary/gzip: 未安装 zstandard 时回退到标准库 gzip
+
+解码时只处理带有上述标记的 payload，其余原样返回，因此启用前写入的历史仍可正常读取。
+Worker 与所有客户端（test.py、benchmark 等）都必须注册同一个 codec，否则无法读取压缩后的结果。
+
+压缩参数可通过环境变量调整：
+- MERAKI_CODEC_ALGORITHM: zstd / gzip / none（默认: 已安装 zstandard 时为 zstd，否则为 gzip；none 关闭压缩）
+- MERAKI_CODEC_THRESHOLD: 超过此字节数的 payload 才压缩（默认 4096）
+"""
+
+import dataclasses
+import gzip
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import DataConverter, PayloadCodec
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖
+    zstandard = None
+
+
+DEFAULT_THRESHOLD = 4096
+ENCODINGS = {"zstd": b"binary/zstd", "gzip": b"binary/gzip"}
+
+
+class CompressionCodec(PayloadCodec):
+    """按阈值压缩 payload 的 Temporal PayloadCodec，带压缩率和编解码耗时统计"""
+
+    def __init__(self, algorithm: Optional[str] = None, threshold: Optional[int] = None,
+                 level: Optional[int] = None):
+        """
+        Args:
+            algorithm: zstd / gzip / none（为None时读取 MERAKI_CODEC_ALGORITHM）
+            threshold: 超过此字节数才压缩（为None时读取 MERAKI_CODEC_THRESHOLD）
+            level: 压缩级别（默认 zstd 为3，gzip 为6）
+
+        Raises:
+            ValueError: 算法未知，或指定了 zstd 但未安装 zstandard 时
+        """
+        algorithm = algorithm or os.getenv("MERAKI_CODEC_ALGORITHM") or ("zstd" if zstandard else "gzip")
+        if algorithm not in ("zstd", "gzip", "none"):
+            raise ValueError(f"未知的压缩算法: {algorithm}")
+        if algorithm == "zstd" and zstandard is None:
+            raise ValueError("使用 zstd 压缩需要安装 zstandard")
+        self.algorithm = algorithm
+        self.threshold = threshold if threshold is not None else int(
+            os.getenv("MERAKI_CODEC_THRESHOLD", DEFAULT_THRESHOLD))
+        self.level = level if level is not None else (3 if algorithm == "zstd" else 6)
+
+        self._stats = {
+            "encoded": 0, "compressed": 0, "decoded": 0, "decompressed": 0,
+            "bytes_in": 0, "bytes_out": 0, "encode_seconds": 0.0, "decode_seconds": 0.0,
+        }
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.algorithm == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+    @staticmethod
+    def _decompress(encoding: bytes, data: bytes) -> bytes:
+        if encoding == ENCODINGS["zstd"]:
+            if zstandard is None:
+                raise ValueError("payload 使用 zstd 压缩，解码需要安装 zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        """压缩超过阈值且压缩后确实变小的 payload"""
+        started = time.perf_counter()
+        result = []
+        for payload in payloads:
+            self._stats["encoded"] += 1
+            if self.algorithm == "none":
+                result.append(payload)
+                continue
+            raw = payload.SerializeToString()
+            if len(raw) <= self.threshold:
+                result.append(payload)
+                continue
+            compressed = self._compress(raw)
+            if len(compressed) >= len(raw):
+                result.append(payload)
+                continue
+            self._stats["compressed"] += 1
+            self._stats["bytes_in"] += len(raw)
+            self._stats["bytes_out"] += len(compressed)
+            result.append(Payload(metadata={"encoding": ENCODINGS[self.algorithm]}, data=compressed))
+        self._stats["encode_seconds"] += time.perf_counter() - started
+        return result
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        """解压带压缩标记的 payload，其余原样返回"""
+        started = time.perf_counter()
+        result = []
+        for payload in payloads:
+            self._stats["decoded"] += 1
+            encoding = payload.metadata.get("encoding", b"")
+            if encoding not in ENCODINGS.values():
+                result.append(payload)
+                continue
+            self._stats["decompressed"] += 1
+            result.append(Payload.FromString(self._decompress(encoding, payload.data)))
+        self._stats["decode_seconds"] += time.perf_counter() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取压缩统计信息
+
+        Returns:
+            Dict: 压缩/解压次数、压缩前后字节数、压缩率（压缩后/压缩前）和编解码耗时
+        """
+        bytes_in = self._stats["bytes_in"]
+        return {
+            "algorithm": self.algorithm,
+            "threshold": self.threshold,
+            **{k: v for k, v in self._stats.items() if not k.endswith("_seconds")},
+            "ratio": round(self._stats["bytes_out"] / bytes_in, 4) if bytes_in else 1.0,
+            "encode_cpu_seconds": round(self._stats["encode_seconds"], 4),
+            "decode_cpu_seconds": round(self._stats["decode_seconds"], 4),
+        }
+
+
+def create_data_converter(codec: Optional[CompressionCodec] = None) -> DataConverter:
+    """
+    创建注册了压缩 codec 的 DataConverter，供 Client.connect(data_converter=...) 使用
+
+    Args:
+        codec: 压缩codec（为None时使用环境变量配置创建）
+
+    Returns:
+        DataConverter
+    """
+    return dataclasses.replace(DataConverter.default, payload_codec=codec or CompressionCodec())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络事件本地日志（按网络和产品类型的增量游标）
+
+GET /networks/{networkId}/events 只按时间范围查询，AlertsLogWorkflow 每次运行都重新下载
+同一批事件。EventLog 为每个 (网络ID, productType) 维护一个高水位（已保存的最新事件
+occurredAt），ingest_network_events Activity 以 startingAfter=高水位 只获取新事件并追加到
+本地日志，告警/日志类问题直接读取本地日志：
+
+- 日志按 UTC 日期分段: {root}/{网络ID}__{productType}/YYYYMMDD.jsonl，每行一个事件
+- 高水位与该时刻已保存事件的指纹一起记录在 {root}/state.json，startingAfter 边界上的
+  重复事件不会被重复写入
+- 保留期: 超过 MERAKI_EVENTS_RETENTION 秒（默认 30 天）的分段整段删除
+- 压缩: 已结束（早于当天）的分段按 occurredAt 排序、去重后以 gzip 重写为 .jsonl.gz
+
+存储目录可通过环境变量 MERAKI_EVENTS_DIR 指定（默认为系统临时目录下的 meraki_events）。
+多台Worker主机部署时，应将其指向共享存储，或固定由同一台主机执行采集和查询。
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_EVENTS_DIR = os.path.join(tempfile.gettempdir(), "meraki_events")
+DEFAULT_RETENTION_SECONDS = 30 * 86400
+
+_STATE_FILE = "state.json"
+_SEGMENT_PATTERN = re.compile(r"^(\d{8})\.jsonl(\.gz)?$")
+
+
+def event_time(event: Dict[str, Any]) -> Optional[float]:
+    """事件的 occurredAt -> Unix时间戳，无法解析时返回None"""
+    value = event.get("occurredAt")
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def event_fingerprint(event: Dict[str, Any]) -> str:
+    """事件内容指纹（事件本身没有ID）"""
+    return hashlib.sha1(json.dumps(event, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d")
+
+
+class EventLog:
+    """按 (网络ID, productType) 分流、按日期分段的网络事件本地日志"""
+
+    def __init__(self, root: Optional[str] = None, retention_seconds: Optional[float] = None):
+        """
+        Args:
+            root: 存储目录（为None时读取 MERAKI_EVENTS_DIR）
+            retention_seconds: 事件保留秒数（为None时读取 MERAKI_EVENTS_RETENTION）
+        """
+        self.root = root or os.getenv("MERAKI_EVENTS_DIR", DEFAULT_EVENTS_DIR)
+        self.retention_seconds = retention_seconds if retention_seconds is not None else float(
+            os.getenv("MERAKI_EVENTS_RETENTION", DEFAULT_RETENTION_SECONDS))
+        self._state: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def stream_key(network_id: str, product_type: str) -> str:
+        """事件流名称，同时作为分段目录名"""
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", f"{network_id}__{product_type}")
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        # 首次使用时才读取，MerakiActivities() 在Workflow中构造时不做I/O
+        if self._state is None:
+            try:
+                with open(os.path.join(self.root, _STATE_FILE), encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except FileNotFoundError:
+                self._state = {}
+        return self._state
+
+    def _save_state(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, _STATE_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # ==================== 写入 ====================
+
+    def high_water(self, network_id: str, product_type: str) -> Optional[str]:
+        """事件流已保存的最新事件 occurredAt（原始字符串，可直接作为 startingAfter），从未采集时返回None"""
+        with self._lock:
+            state = self._load_state().get(self.stream_key(network_id, product_type))
+        return state["occurredAt"] if state else None
+
+    def streams(self, network_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """已采集过的事件流：network_id、product_type、occurredAt（高水位）、updated_at"""
+        wanted = set(network_ids) if network_ids is not None else None
+        with self._lock:
+            state = self._load_state()
+            return [
+                {key: info[key] for key in ("network_id", "product_type", "occurredAt", "updated_at")}
+                for info in state.values() if wanted is None or info["network_id"] in wanted
+            ]
+
+    def append(self, network_id: str, product_type: str, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        追加事件：跳过早于高水位的事件和高水位边界上已保存过的事件，并推进高水位
+
+        Returns:
+            新写入的事件数
+        """
+        key = self.stream_key(network_id, product_type)
+        timed = sorted(
+            ((ts, event_fingerprint(event), event) for event in events
+             if isinstance(event, dict) for ts in [event_time(event)] if ts is not None),
+            key=lambda item: item[0],
+        )
+        with self._lock:
+            state = self._load_state().get(key)
+            mark = event_time(state) if state else None
+            seen_at_mark = set(state["fingerprints"]) if state else set()
+            new_events: List[Tuple[float, str, Dict[str, Any]]] = []
+            for ts, fingerprint, event in timed:
+                if mark is not None and (ts < mark or (ts == mark and fingerprint in seen_at_mark)):
+                    continue
+                new_events.append((ts, fingerprint, event))
+                if mark is None or ts > mark:
+                    mark, seen_at_mark = ts, set()
+                    state = {"occurredAt": event["occurredAt"]}
+                seen_at_mark.add(fingerprint)
+            if not new_events:
+                return 0
+
+            directory = os.path.join(self.root, key)
+            os.makedirs(directory, exist_ok=True)
+            by_day: Dict[str, List[str]] = {}
+            for ts, _, event in new_events:
+                by_day.setdefault(_day(ts), []).append(json.dumps(event, ensure_ascii=False))
+            for day, lines in by_day.items():
+                with open(os.path.join(directory, f"{day}.jsonl"), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+            self._state[key] = {
+                "occurredAt": state["occurredAt"],
+                "fingerprints": sorted(seen_at_mark),
+                "network_id": network_id,
+                "product_type": product_type,
+                "updated_at": time.time(),
+            }
+            self._save_state()
+        return len(new_events)
+
+    # ==================== 维护 ====================
+
+    def _segments(self, directory: str) -> List[Tuple[str, str]]:
+        """分段目录中的 (日期, 文件名)，按日期排序"""
+        if not os.path.isdir(directory):
+            return []
+        segments = []
+        for name in os.listdir(directory):
+            match = _SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append((match.group(1), name))
+        return sorted(segments)
+
+    def _streams(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """删除整段早于保留期的分段，返回删除的分段数"""
+        cutoff = _day((now if now is not None else time.time()) - self.retention_seconds)
+        removed = 0
+        with self._lock:
+            for stream in self._streams():
+                directory = os.path.join(self.root, stream)
+                for day, name in self._segments(directory):
+                    if day < cutoff:
+                        os.remove(os.path.join(directory, name))
+                        removed += 1
+        return removed
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        压缩已结束（早于当天）的分段：按 occurredAt 排序、去重后以 gzip 重写
+
+        Returns:
+            Dict: segments（压缩的分段数）、duplicates（去掉的重复事件数）、bytes_before、bytes_after
+        """
+        today = _day(now if now is not None else time.time())
+        result = {"segments": 0, "duplicates": 0, "bytes_before": 0, "bytes_after": 0}
+        with self._lock:
+            for stream in self._streams():
+                directory = os.path.join(self.root, stream)
+                days: Dict[str, List[str]] = {}
+                for day, name in self._segments(directory):
+                    days.setdefault(day, []).append(name)
+                for day, names in days.items():
+                    if day >= today or names == [f"{day}.jsonl.gz"]:
+                        continue
+                    events, seen = [], set()
+                    for name in names:
+                        path = os.path.join(directory, name)
+                        result["bytes_before"] += os.path.getsize(path)
+                        for event in self._read_segment(path):
+                            fingerprint = event_fingerprint(event)
+                            if fingerprint in seen:
+                                result["duplicates"] += 1
+                                continue
+                            seen.add(fingerprint)
+                            events.append(event)
+                    events.sort(key=lambda event: event_time(event) or 0.0)
+                    target = os.path.join(directory, f"{day}.jsonl.gz")
+                    tmp_path = f"{target}.tmp"
+                    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                        for event in events:
+                            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                    os.replace(tmp_path, target)
+                    for name in names:
+                        if name != f"{day}.jsonl.gz":
+                            os.remove(os.path.join(directory, name))
+                    result["segments"] += 1
+                    result["bytes_after"] += os.path.getsize(target)
+        return result
+
+    # ==================== 查询 ====================
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Dict[str, Any]]:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def read(self, network_ids: Optional[Iterable[str]] = None, product_type: Optional[str] = None,
+             start: Optional[float] = None, end: Optional[float] = None,
+             event_types: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        读取本地日志中的事件
+
+        Args:
+            network_ids: 只读取这些网络，None表示全部
+            product_type: 只读取此产品类型，None表示全部
+            start / end: occurredAt 时间范围（Unix时间戳），None表示不限
+            event_types: 只返回这些事件类型
+            limit: 最多返回的事件数（取最新的）
+
+        Returns:
+            List[Dict]: 事件（按 occurredAt 从新到旧），每个事件附带 productType
+        """
+        with self._lock:
+            state = dict(self._load_state())
+        wanted_networks = set(network_ids) if network_ids is not None else None
+        wanted_types = set(event_types) if event_types else None
+        start_day = _day(start) if start is not None else None
+        end_day = _day(end) if end is not None else None
+
+        matched: List[Tuple[float, int, Dict[str, Any]]] = []
+        counter = 0
+        for key, info in state.items():
+            if wanted_networks is not None and info["network_id"] not in wanted_networks:
+                continue
+            if product_type and info["product_type"] != product_type:
+                continue
+            directory = os.path.join(self.root, key)
+            for day, name in self._segments(directory):
+                if (start_day and day < start_day) or (end_day and day > end_day):
+                    continue
+                for event in self._read_segment(os.path.join(directory, name)):
+                    ts = event_time(event)
+                    if ts is None or (start is not None and ts < start) or (end is not None and ts > end):
+                        continue
+                    if wanted_types and event.get("type") not in wanted_types:
+                        continue
+                    counter += 1
+                    item = (ts, counter, {**event, "productType": info["product_type"]})
+                    if limit is None:
+                        matched.append(item)
+                    elif len(matched) < limit:
+                        heapq.heappush(matched, item)
+                    elif item > matched[0]:
+                        heapq.heapreplace(matched, item)
+        matched.sort(reverse=True)
+        return [event for _, _, event in matched]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取日志统计信息（事件流数、分段数、磁盘字节数）"""
+        with self._lock:
+            streams = len(self._load_state())
+            segments, size = 0, 0
+            for stream in self._streams():
+                directory = os.path.join(self.root, stream)
+                for _, name in self._segments(directory):
+                    segments += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return {"root": self.root, "streams": streams, "segments": segments, "bytes": size,
+                "retention_seconds": self.retention_seconds}
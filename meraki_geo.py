@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备地理空间索引（网格索引）
+
+DeviceLocationWorkflow、APDeviceQueryWorkflow 生成散点图时逐台设备读取 lat/lng，
+"某点50米内的AP"、"某矩形范围内的设备"都只能全量扫描。GeoIndex 把设备坐标放入
+固定大小的经纬度网格（默认 0.005° ≈ 550米）：
+
+- 半径查询: 只检查半径外接矩形覆盖的网格，再用大圆距离精确过滤，按距离排序
+- 矩形查询: 只检查矩形覆盖的网格（矩形覆盖的网格多于已占用网格时改为遍历已占用网格）
+- 地图聚合: 按 Web Mercator 瓦片把同一缩放级别下相邻的点合并为一个聚合点，
+  上千台设备的图表只需返回几十个点
+
+与设备搜索索引一样，每个设备快照构建一次，之后通过 sync() 增量更新。
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+EARTH_RADIUS_M = 6371008.8
+DEFAULT_CELL_DEGREES = 0.005
+# 每个256像素瓦片在每个方向上划分的聚合格数（4 即每个聚合格约64像素）
+DEFAULT_CLUSTER_CELLS_PER_TILE = 4
+
+Bounds = Tuple[float, float, float, float]  # (south, west, north, east)
+
+
+def _coordinates(device: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    lat, lng = device.get("lat"), device.get("lng")
+    if isinstance(lat, bool) or isinstance(lng, bool):
+        return None
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """两点之间的大圆距离（米）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _mercator(lat: float, lng: float) -> Tuple[float, float]:
+    """经纬度 -> Web Mercator 归一化坐标（0~1）"""
+    siny = min(max(math.sin(math.radians(lat)), -0.9999), 0.9999)
+    return (lng + 180.0) / 360.0, 0.5 - math.log((1 + siny) / (1 - siny)) / (4 * math.pi)
+
+
+def _in_bounds(lat: float, lng: float, bounds: Bounds) -> bool:
+    south, west, north, east = bounds
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lng <= east
+    return lng >= west or lng <= east  # 跨越180°经线
+
+
+class GeoIndex:
+    """一个组织的设备坐标网格索引，支持半径查询、矩形查询和按缩放级别聚合"""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        """
+        Args:
+            cell_degrees: 网格边长（度）
+        """
+        self.cell_degrees = cell_degrees
+        # serial -> (lat, lng, 设备记录)
+        self._points: Dict[str, Tuple[float, float, Dict[str, Any]]] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def clone(self) -> "GeoIndex":
+        """复制索引（网格逐个复制，设备记录共享），用于在线程池中更新副本后整体替换"""
+        other = GeoIndex(self.cell_degrees)
+        other._points = dict(self._points)
+        other._cells = defaultdict(set, {cell: set(members) for cell, members in self._cells.items()})
+        return other
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    # ==================== 更新 ====================
+
+    def upsert(self, device: Dict[str, Any]) -> str:
+        """
+        添加或更新一台设备
+
+        Returns:
+            "added" / "updated"（坐标变化） / "unchanged" / "skipped"（没有有效坐标，已有条目会被删除）
+        """
+        serial = str(device["serial"])
+        coordinates = _coordinates(device)
+        if coordinates is None:
+            self.remove(serial)
+            return "skipped"
+        lat, lng = coordinates
+        current = self._points.get(serial)
+        if current is not None and current[:2] == coordinates:
+            self._points[serial] = (lat, lng, device)
+            return "unchanged"
+        if current is not None:
+            self._discard(serial, current[0], current[1])
+        self._points[serial] = (lat, lng, device)
+        self._cells[self._cell(lat, lng)].add(serial)
+        return "updated" if current is not None else "added"
+
+    def _discard(self, serial: str, lat: float, lng: float):
+        cell = self._cell(lat, lng)
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(serial)
+            if not members:
+                del self._cells[cell]
+
+    def remove(self, serial: str) -> bool:
+        """删除设备，设备不存在时返回False"""
+        current = self._points.pop(serial, None)
+        if current is None:
+            return False
+        self._discard(serial, current[0], current[1])
+        return True
+
+    def sync(self, devices: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        用一个完整的设备快照增量更新索引：删除快照中已不存在的设备
+
+        Returns:
+            Dict: added / updated / unchanged / skipped / removed 设备数
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+        seen = set()
+        for device in devices:
+            if not isinstance(device, dict) or not device.get("serial"):
+                continue
+            seen.add(str(device["serial"]))
+            counts[self.upsert(device)] += 1
+        for serial in [s for s in self._points if s not in seen]:
+            self.remove(serial)
+            counts["removed"] += 1
+        return counts
+
+    # ==================== 查询 ====================
+
+    def _serials_in(self, bounds: Bounds) -> Iterable[str]:
+        south, west, north, east = bounds
+        lng_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        i0, i1 = math.floor(south / self.cell_degrees), math.floor(north / self.cell_degrees)
+        for lo, hi in lng_ranges:
+            j0, j1 = math.floor(lo / self.cell_degrees), math.floor(hi / self.cell_degrees)
+            if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._cells):
+                cells = [members for (i, j), members in self._cells.items()
+                         if i0 <= i <= i1 and j0 <= j <= j1]
+            else:
+                cells = [self._cells[(i, j)] for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+                         if (i, j) in self._cells]
+            for members in cells:
+                yield from members
+
+    def within_box(self, south: float, west: float, north: float, east: float,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找矩形范围内的设备
+
+        Args:
+            south / west / north / east: 矩形边界（west > east 表示跨越180°经线）
+            limit: 最多返回的设备数
+
+        Returns:
+            List[Dict]: 设备记录，按名称、序列号排序
+        """
+        bounds = (south, west, north, east)
+        matched = []
+        for serial in self._serials_in(bounds):
+            lat, lng, device = self._points[serial]
+            if _in_bounds(lat, lng, bounds):
+                matched.append(device)
+        matched.sort(key=lambda d: (str(d.get("name") or "").lower(), str(d.get("serial"))))
+        return matched if limit is None else matched[:limit]
+
+    def within_radius(self, lat: float, lng: float, radius_m: float,
+                      limit: Optional[int] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        查找距离某点 radius_m 米以内的设备
+
+        Returns:
+            List[Tuple[float, Dict]]: (距离米数, 设备记录)，按距离升序
+        """
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        cos_lat = math.cos(math.radians(lat))
+        dlng = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+        west, east = lng - dlng, lng + dlng
+        if dlng >= 180.0:
+            west, east = -180.0, 180.0
+        else:
+            west = west + 360.0 if west < -180.0 else west
+            east = east - 360.0 if east > 180.0 else east
+        bounds = (max(-90.0, lat - dlat), west, min(90.0, lat + dlat), east)
+
+        matched = []
+        for serial in self._serials_in(bounds):
+            point_lat, point_lng, device = self._points[serial]
+            distance = haversine_m(lat, lng, point_lat, point_lng)
+            if distance <= radius_m:
+                matched.append((distance, device))
+        matched.sort(key=lambda item: (item[0], str(item[1].get("serial"))))
+        return matched if limit is None else matched[:limit]
+
+    def cluster(self, zoom: int, bounds: Optional[Bounds] = None,
+                serials: Optional[Iterable[str]] = None,
+                cells_per_tile: int = DEFAULT_CLUSTER_CELLS_PER_TILE) -> List[Dict[str, Any]]:
+        """
+        按地图缩放级别聚合设备
+
+        Args:
+            zoom: Web Mercator 缩放级别（0~22）
+            bounds: 只聚合此矩形 (south, west, north, east) 内的设备
+            serials: 只聚合这些设备
+            cells_per_tile: 每个瓦片每个方向划分的聚合格数，越大聚合越细
+
+        Returns:
+            List[Dict]: 聚合点，按设备数降序；每个聚合点包含 lat、lng（质心）、count，
+                单台设备的聚合点另含 serial、name，多台设备的另含 bounds [south, west, north, east]
+        """
+        scale = (2 ** max(0, min(int(zoom), 22))) * cells_per_tile
+        if serials is not None:
+            candidates = [s for s in dict.fromkeys(serials) if s in self._points]
+        elif bounds is not None:
+            candidates = list(self._serials_in(bounds))
+        else:
+            candidates = list(self._points)
+
+        groups: Dict[Tuple[int, int], List[Any]] = {}
+        for serial in candidates:
+            lat, lng, device = self._points[serial]
+            if bounds is not None and not _in_bounds(lat, lng, bounds):
+                continue
+            x, y = _mercator(lat, lng)
+            key = (int(x * scale), int(y * scale))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, lat, lng, lat, lng, lat, lng, device]
+                continue
+            group[0] += 1
+            group[1] += lat
+            group[2] += lng
+            group[3], group[4] = min(group[3], lat), min(group[4], lng)
+            group[5], group[6] = max(group[5], lat), max(group[6], lng)
+
+        clusters = []
+        for count, sum_lat, sum_lng, south, west, north, east, device in groups.values():
+            if count == 1:
+                clusters.append({"lat": sum_lat, "lng": sum_lng, "count": 1,
+                                 "serial": device.get("serial"), "name": device.get("name", "")})
+            else:
+                clusters.append({"lat": round(sum_lat / count, 7), "lng": round(sum_lng / count, 7),
+                                 "count": count, "bounds": [south, west, north, east]})
+        clusters.sort(key=lambda c: (-c["count"], c["lat"], c["lng"]))
+        return clusters
+
+    def stats(self) -> Dict[str, Any]:
+        """获取索引统计信息（有坐标的设备数、已占用网格数）"""
+        return {"devices": len(self._points), "cells": len(self._cells), "cell_degrees": self.cell_degrees}
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki 本地库存镜像（SQLite）
+
+几乎每个 Workflow 都从云端重新列出设备、网络或库存。InventoryStore 在 Worker 本地
+用 SQLite（WAL 模式）保存组织、网络、设备和库存，由 InventorySyncWorkflow 定期调用
+sync_inventory Activity 增量同步：
+
+- 每行保存原始JSON及其哈希，同步时只写入哈希变化的行，删除云端已不存在的行
+- 按序列号、MAC、型号、网络ID建立B树索引；名称子串查询使用FTS5三元组（trigram）全文索引，
+  避免 LIKE '%…%' 全表扫描（SQLite未编译FTS5或关键词少于3个字符时回退到 LIKE）
+
+数据库路径可通过环境变量 MERAKI_INVENTORY_DB 指定（默认为系统临时目录下的 meraki_inventory.sqlite3）。
+多台Worker主机部署时，每台主机各自维护一份镜像。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_INVENTORY_DB = os.path.join(tempfile.gettempdir(), "meraki_inventory.sqlite3")
+
+# 表名 -> (主键字段, 列名 -> 记录中的字段)
+TABLES: Dict[str, tuple] = {
+    "organizations": ("id", {"name": "name"}),
+    "networks": ("id", {"name": "name"}),
+    "devices": ("serial", {"network_id": "networkId", "name": "name", "mac": "mac",
+                           "model": "model", "product_type": "productType"}),
+    "inventory": ("serial", {"network_id": "networkId", "name": "name", "mac": "mac",
+                             "model": "model", "product_type": "productType"}),
+}
+
+# 名称子串查询使用的FTS5三元组索引至少需要的关键词长度
+FTS_MIN_QUERY_LENGTH = 3
+
+# 需要建立索引的列
+_INDEXED_COLUMNS = {
+    "networks": ["name"],
+    "devices": ["network_id", "name", "mac", "model"],
+    "inventory": ["network_id", "mac", "model"],
+}
+
+
+def row_hash(record: Dict[str, Any]) -> str:
+    """记录内容的哈希（键排序后的JSON），用于判断行是否变化"""
+    return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _column_value(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column == "mac":
+        return str(value).lower()
+    return value if isinstance(value, (str, int, float)) else json.dumps(value, ensure_ascii=False)
+
+
+class InventoryStore:
+    """组织、网络、设备和库存的本地SQLite镜像"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 数据库文件路径（为None时读取 MERAKI_INVENTORY_DB）
+        """
+        self.path = path or os.getenv("MERAKI_INVENTORY_DB", DEFAULT_INVENTORY_DB)
+        self._conn: Optional[sqlite3.Connection] = None
+        # sqlite3 连接不能被多个线程同时使用，Activity 通过 asyncio.to_thread 调用时串行化
+        self._lock = threading.Lock()
+        # SQLite 是否支持 FTS5 三元组分词器（建表时检测）
+        self._fts = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._fts = self._create_name_fts(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        for table, (key, columns) in TABLES.items():
+            extra = "".join(f", {column} TEXT" for column in columns)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"{key} TEXT PRIMARY KEY, org_id TEXT NOT NULL{extra}, "
+                f"data TEXT NOT NULL, hash TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_org_id ON {table} (org_id)")
+            for column in _INDEXED_COLUMNS.get(table, []):
+                collate = " COLLATE NOCASE" if column == "name" else ""
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column}{collate})")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "org_id TEXT NOT NULL, kind TEXT NOT NULL, synced_at REAL NOT NULL, "
+            "rows INTEGER NOT NULL, changed INTEGER NOT NULL, PRIMARY KEY (org_id, kind))"
+        )
+        conn.commit()
+
+    @staticmethod
+    def _create_name_fts(conn: sqlite3.Connection) -> bool:
+        """
+        为每张表的 name 列创建FTS5三元组外部内容索引，并用触发器与表保持同步
+
+        Returns:
+            bool: 是否创建成功（SQLite未编译FTS5时返回False，名称查询回退到 LIKE）
+        """
+        try:
+            for table in TABLES:
+                fts = f"{table}_name_fts"
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).fetchone()
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"name, content='{table}', content_rowid='rowid', tokenize='trigram')"
+                )
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts} (rowid, name) VALUES (new.rowid, new.name); END"
+                )
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.rowid, old.name); END"
+                )
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name ON {table} BEGIN "
+                    f"INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.rowid, old.name); "
+                    f"INSERT INTO {fts} (rowid, name) VALUES (new.rowid, new.name); END"
+                )
+                if not exists:
+                    # 升级已有的数据库：为已存在的行建立索引
+                    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+            conn.commit()
+            return True
+        except sqlite3.OperationalError:
+            conn.rollback()
+            return False
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== 写入 ====================
+
+    def upsert(self, table: str, org_id: str, records: List[Dict[str, Any]],
+               delete_missing: bool = True) -> Dict[str, int]:
+        """
+        增量写入一个组织的全部记录：只写入哈希变化的行
+
+        Args:
+            table: 表名（organizations / networks / devices / inventory）
+            org_id: 组织ID
+            records: 云端返回的完整记录列表
+            delete_missing: 删除本地存在但 records 中没有的行（records 必须是该组织的全量数据）
+
+        Returns:
+            Dict: inserted / updated / unchanged / deleted 行数
+        """
+        key, columns = TABLES[table]
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            existing = dict(conn.execute(f"SELECT {key}, hash FROM {table} WHERE org_id = ?", (org_id,)))
+            seen = set()
+            rows = []
+            for record in records:
+                if not isinstance(record, dict) or not record.get(key):
+                    continue
+                record_key = str(record[key])
+                seen.add(record_key)
+                digest = row_hash(record)
+                old_hash = existing.get(record_key)
+                if old_hash == digest:
+                    counts["unchanged"] += 1
+                    continue
+                counts["updated" if old_hash else "inserted"] += 1
+                rows.append([record_key, org_id]
+                            + [_column_value(column, record.get(field)) for column, field in columns.items()]
+                            + [json.dumps(record, ensure_ascii=False), digest, now])
+
+            names = [key, "org_id", *columns, "data", "hash", "updated_at"]
+            updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+            with conn:
+                if rows:
+                    conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                        f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+                        rows,
+                    )
+                if delete_missing:
+                    stale = [(k,) for k in existing if k not in seen]
+                    if stale:
+                        conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", stale)
+                    counts["deleted"] = len(stale)
+                conn.execute(
+                    "INSERT INTO sync_state (org_id, kind, synced_at, rows, changed) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(org_id, kind) DO UPDATE SET synced_at = excluded.synced_at, "
+                    "rows = excluded.rows, changed = excluded.changed",
+                    (org_id, table, now, len(seen), len(rows) + counts["deleted"]),
+                )
+        return counts
+
+    # ==================== 查询 ====================
+
+    def last_synced(self, org_id: str, table: str = "devices") -> Optional[float]:
+        """某组织某张表最近一次同步的时间戳（从未同步时返回None）"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT synced_at FROM sync_state WHERE org_id = ? AND kind = ?", (org_id, table)).fetchone()
+        return row["synced_at"] if row else None
+
+    def get(self, table: str, key_value: str) -> Optional[Dict[str, Any]]:
+        """按主键（组织/网络ID或序列号）获取记录"""
+        key, _ = TABLES[table]
+        with self._lock:
+            row = self._connect().execute(f"SELECT data FROM {table} WHERE {key} = ?", (key_value,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def find(self, table: str, org_id: Optional[str] = None, name: Optional[str] = None,
+             limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        按条件查找记录（条件之间为AND）
+
+        Args:
+            table: 表名
+            org_id: 组织ID
+            name: 名称子串（不区分大小写；不少于 FTS_MIN_QUERY_LENGTH 个字符时使用FTS5三元组索引）
+            limit: 最多返回的条数
+            **filters: 列名 -> 精确匹配值（如 serial、mac、model、network_id、product_type）
+
+        Returns:
+            List[Dict]: 原始记录，按名称排序
+        """
+        key, columns = TABLES[table]
+        clauses, params = [], []
+        if org_id is not None:
+            clauses.append("org_id = ?")
+            params.append(org_id)
+        if name and self._uses_fts(name):
+            # 三元组分词器把双引号短语当作连续的三元组序列，即名称子串
+            clauses.append(f"rowid IN (SELECT rowid FROM {table}_name_fts WHERE {table}_name_fts MATCH ?)")
+            params.append('"' + name.replace('"', '""') + '"')
+        elif name:
+            clauses.append("name LIKE ? ESCAPE '\\' COLLATE NOCASE")
+            escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column != key and column not in columns:
+                raise ValueError(f"{table} 表没有列: {column}")
+            clauses.append(f"{column} = ?")
+            params.append(_column_value(column, value))
+        sql = f"SELECT data FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY name COLLATE NOCASE, {key}" if "name" in columns else f" ORDER BY {key}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def _uses_fts(self, name: str) -> bool:
+        """名称子串查询能否使用FTS5三元组索引（需先建立连接）"""
+        if len(name) < FTS_MIN_QUERY_LENGTH:
+            return False
+        with self._lock:
+            self._connect()
+        return self._fts
+
+    def stats(self) -> Dict[str, Any]:
+        """获取每张表的行数"""
+        with self._lock:
+            conn = self._connect()
+            counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+        return {"path": self.path, **counts}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 响应解码器
+
+5000台设备的一页响应可达数MB，在事件循环线程上用标准库 json 解码会阻塞
+同一 Worker 内的所有 Activity 协程。JSONDecoder：
+
+- 安装了 orjson 时使用 orjson（比标准库快数倍），否则回退到标准库 json
+- 响应体超过阈值时在线程池中解码，不阻塞事件循环
+
+解码参数可通过环境变量调整：
+- MERAKI_JSON_OFFLOAD_BYTES: 超过此字节数的响应在线程池中解码（默认 256KB，设为0表示总是在线程池中解码）
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+DEFAULT_OFFLOAD_BYTES = 256 * 1024
+
+
+class JSONDecoder:
+    """可插拔的JSON解码器，大响应在线程池中解码"""
+
+    def __init__(self, offload_bytes: Optional[int] = None, use_orjson: Optional[bool] = None):
+        """
+        Args:
+            offload_bytes: 超过此字节数时在线程池中解码（为None时读取 MERAKI_JSON_OFFLOAD_BYTES）
+            use_orjson: 是否使用 orjson（为None时已安装即使用）
+        """
+        self.offload_bytes = offload_bytes if offload_bytes is not None else int(
+            os.getenv("MERAKI_JSON_OFFLOAD_BYTES", DEFAULT_OFFLOAD_BYTES))
+        self.use_orjson = orjson is not None if use_orjson is None else (use_orjson and orjson is not None)
+        self._stats = {"decoded": 0, "offloaded": 0, "bytes": 0, "seconds": 0.0}
+
+    @property
+    def backend(self) -> str:
+        """当前使用的解码库名称"""
+        return "orjson" if self.use_orjson else "json"
+
+    def loads(self, body: bytes) -> Any:
+        """
+        同步解码
+
+        Args:
+            body: 响应体字节
+
+        Returns:
+            解码后的数据，空响应体返回None
+        """
+        if not body.strip():
+            return None
+        if self.use_orjson:
+            return orjson.loads(body)
+        return json.loads(body)
+
+    async def decode(self, body: bytes) -> Any:
+        """
+        解码响应体，超过阈值时在线程池中执行
+
+        Args:
+            body: 响应体字节
+
+        Returns:
+            解码后的数据，空响应体返回None
+        """
+        started = time.perf_counter()
+        if len(body) > self.offload_bytes:
+            self._stats["offloaded"] += 1
+            data = await asyncio.to_thread(self.loads, body)
+        else:
+            data = self.loads(body)
+        self._stats["decoded"] += 1
+        self._stats["bytes"] += len(body)
+        self._stats["seconds"] += time.perf_counter() - started
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """获取解码统计信息（解码次数、线程池解码次数、字节数、耗时）"""
+        return {
+            "backend": self.backend,
+            "offload_bytes": self.offload_bytes,
+            "decoded": self._stats["decoded"],
+            "offloaded": self._stats["offloaded"],
+            "bytes": self._stats["bytes"],
+            "seconds": round(self._stats["seconds"], 3),
+        }
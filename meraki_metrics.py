@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 请求指标
+
+MerakiAPI 的每次HTTP往返、每次逻辑调用（含限速等待与重试）和每次分页遍历都按端点模板
+（如 /networks/{networkId}/clients，而不是完整URL）记录:
+
+- 请求延迟直方图（每次HTTP往返，按状态码区分）
+- 响应字节数、状态码计数
+- 重试次数（按原因：rate_limited / server_error / connection_error）
+- 调用延迟直方图（从第一次排队到最终成功或失败，按结果区分）
+- 每次分页遍历获取的页数
+
+进程内聚合结果可通过 RequestMetrics.stats() 查看（按总耗时降序，便于找出拖慢Workflow的端点），
+同时导出到已安装的可选依赖：
+
+- prometheus_client: 注册到默认 Registry，设置 MERAKI_METRICS_PORT 后由 Worker 启动 /metrics 端点
+- opentelemetry-api: 通过全局 MeterProvider 导出（应用未配置 SDK 时为空操作）；同时为每次逻辑调用创建
+  CLIENT span（名称如 "GET /networks/{networkId}/clients"），作为当前 Activity span 的子span，
+  配合 Worker 的 Temporal TracingInterceptor 形成 Workflow → Activity → HTTP请求 的调用链
+
+环境变量：
+- MERAKI_METRICS_EXPORTERS: 启用的导出器，逗号分隔（默认 prometheus,opentelemetry；none 表示只做进程内统计）
+- MERAKI_METRICS_PORT: Prometheus /metrics 端口（默认不启动）
+"""
+
+import bisect
+import contextlib
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import prometheus_client
+except ImportError:  # prometheus_client 为可选依赖
+    prometheus_client = None
+
+try:
+    from opentelemetry import metrics as otel_metrics, trace as otel_trace
+except ImportError:  # opentelemetry-api 为可选依赖
+    otel_metrics = otel_trace = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORTERS = "prometheus,opentelemetry"
+# 与 prometheus_client 默认桶一致（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+METRIC_PREFIX = "meraki_api"
+
+
+class _Histogram:
+    """固定桶直方图，分位数按桶内线性插值估算（同 Prometheus histogram_quantile）"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+class _PrometheusExporter:
+    """prometheus_client 导出器（进程内只创建一次，避免重复注册）"""
+
+    def __init__(self):
+        self.request_duration = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_request_duration_seconds", "Meraki API HTTP往返延迟",
+            ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS)
+        self.response_bytes = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_response_bytes", "Meraki API 响应字节数", ["endpoint", "method"])
+        self.retries = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_retries", "Meraki API 重试次数", ["endpoint", "reason"])
+        self.call_duration = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_call_duration_seconds", "Meraki API 调用延迟（含限速等待与重试）",
+            ["endpoint", "method", "outcome"], buckets=LATENCY_BUCKETS)
+        self.pages = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_pages_per_call", "Meraki API 每次分页遍历的页数",
+            ["endpoint"], buckets=PAGE_BUCKETS)
+
+    def request(self, endpoint: str, method: str, status: str, seconds: float, size: int):
+        self.request_duration.labels(endpoint, method, status).observe(seconds)
+        self.response_bytes.labels(endpoint, method).inc(size)
+
+    def retry(self, endpoint: str, reason: str):
+        self.retries.labels(endpoint, reason).inc()
+
+    def call(self, endpoint: str, method: str, outcome: str, seconds: float):
+        self.call_duration.labels(endpoint, method, outcome).observe(seconds)
+
+    def page_count(self, endpoint: str, pages: int):
+        self.pages.labels(endpoint).observe(pages)
+
+
+class _OpenTelemetryExporter:
+    """OpenTelemetry 导出器（使用全局 MeterProvider）"""
+
+    def __init__(self):
+        meter = otel_metrics.get_meter("meraki_api")
+        self.request_duration = meter.create_histogram(
+            "meraki.api.request.duration", unit="s", description="Meraki API HTTP往返延迟")
+        self.response_size = meter.create_counter(
+            "meraki.api.response.size", unit="By", description="Meraki API 响应字节数")
+        self.retries = meter.create_counter(
+            "meraki.api.retries", unit="{retry}", description="Meraki API 重试次数")
+        self.call_duration = meter.create_histogram(
+            "meraki.api.call.duration", unit="s", description="Meraki API 调用延迟（含限速等待与重试）")
+        self.pages = meter.create_histogram(
+            "meraki.api.pages", unit="{page}", description="Meraki API 每次分页遍历的页数")
+
+    def request(self, endpoint: str, method: str, status: str, seconds: float, size: int):
+        attributes = {"http.route": endpoint, "http.request.method": method,
+                      "http.response.status_code": status}
+        self.request_duration.record(seconds, attributes)
+        self.response_size.add(size, {"http.route": endpoint, "http.request.method": method})
+
+    def retry(self, endpoint: str, reason: str):
+        self.retries.add(1, {"http.route": endpoint, "meraki.retry.reason": reason})
+
+    def call(self, endpoint: str, method: str, outcome: str, seconds: float):
+        self.call_duration.record(seconds, {"http.route": endpoint, "http.request.method": method,
+                                            "meraki.outcome": outcome})
+
+    def page_count(self, endpoint: str, pages: int):
+        self.pages.record(pages, {"http.route": endpoint})
+
+
+_exporters: Dict[str, Any] = {}
+
+
+def _get_exporter(name: str) -> Optional[Any]:
+    """按名称获取进程级共享导出器，依赖未安装时返回None"""
+    if name in _exporters:
+        return _exporters[name]
+    exporter = None
+    if name == "prometheus" and prometheus_client is not None:
+        exporter = _PrometheusExporter()
+    elif name in ("opentelemetry", "otel") and otel_metrics is not None:
+        exporter = _OpenTelemetryExporter()
+    elif name not in ("prometheus", "opentelemetry", "otel", "none", ""):
+        logger.warning(f"未知的指标导出器: {name}")
+    _exporters[name] = exporter
+    return exporter
+
+
+def start_metrics_server(port: Optional[int] = None) -> bool:
+    """
+    启动 Prometheus /metrics HTTP端点
+
+    Args:
+        port: 端口（为None时读取环境变量 MERAKI_METRICS_PORT，未设置则不启动）
+
+    Returns:
+        bool: 是否已启动
+    """
+    if port is None:
+        value = os.getenv("MERAKI_METRICS_PORT")
+        if not value:
+            return False
+        port = int(value)
+    if prometheus_client is None:
+        logger.warning("未安装 prometheus_client，无法启动 /metrics 端点")
+        return False
+    prometheus_client.start_http_server(port)
+    logger.info(f"Meraki API 指标: http://0.0.0.0:{port}/metrics")
+    return True
+
+
+class _EndpointStats:
+    """单个端点模板的进程内统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Dict[str, int] = {}
+        self.bytes = 0
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.call_latency = _Histogram(LATENCY_BUCKETS)
+        self.retries: Dict[str, int] = {}
+        self.pages = _Histogram(PAGE_BUCKETS)
+
+
+class RequestMetrics:
+    """按端点模板记录 Meraki API 请求指标，并转发给已启用的导出器"""
+
+    def __init__(self, exporters: Optional[str] = None):
+        """
+        Args:
+            exporters: 启用的导出器，逗号分隔（为None时读取环境变量 MERAKI_METRICS_EXPORTERS）
+        """
+        if exporters is None:
+            exporters = os.getenv("MERAKI_METRICS_EXPORTERS", DEFAULT_EXPORTERS)
+        names = [name.strip().lower() for name in exporters.split(",") if name.strip()]
+        self.exporters = [exporter for exporter in map(_get_exporter, names) if exporter is not None]
+        self.tracer = (otel_trace.get_tracer("meraki_api")
+                       if otel_trace is not None and ({"opentelemetry", "otel"} & set(names)) else None)
+        self._endpoints: Dict[Tuple[str, str], _EndpointStats] = {}
+
+    def _endpoint(self, endpoint: str, method: str) -> _EndpointStats:
+        stats = self._endpoints.get((method, endpoint))
+        if stats is None:
+            stats = self._endpoints[(method, endpoint)] = _EndpointStats()
+        return stats
+
+    def span(self, endpoint: str, method: str, url: str):
+        """
+        为一次逻辑调用创建 CLIENT span（未安装 opentelemetry-api 时不创建）
+
+        Args:
+            endpoint: 端点模板（span 名称和 http.route）
+            method: HTTP方法
+            url: 完整请求URL
+
+        Returns:
+            上下文管理器，进入时得到 span 或 None；异常会记录到 span 并标记为错误
+        """
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.start_as_current_span(
+            f"{method} {endpoint}", kind=otel_trace.SpanKind.CLIENT,
+            attributes={"http.route": endpoint, "http.request.method": method, "url.full": url})
+
+    def record_request(self, endpoint: str, method: str, status: Any, seconds: float, size: int,
+                       span: Any = None):
+        """
+        记录一次HTTP往返
+
+        Args:
+            endpoint: 端点模板
+            method: HTTP方法
+            status: 状态码（网络错误时为 "error"）
+            seconds: 往返耗时（含读取响应体）
+            size: 响应字节数
+            span: 本次调用的 span（记录最后一次往返的状态码和字节数）
+        """
+        if span is not None:
+            if isinstance(status, int):
+                span.set_attribute("http.response.status_code", status)
+            span.set_attribute("http.response.body.size", size)
+        status = str(status)
+        stats = self._endpoint(endpoint, method)
+        stats.requests += 1
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.bytes += size
+        stats.latency.observe(seconds)
+        for exporter in self.exporters:
+            exporter.request(endpoint, method, status, seconds, size)
+
+    def record_retry(self, endpoint: str, method: str, reason: str, delay: float = 0.0, span: Any = None):
+        """记录一次重试（reason: rate_limited / server_error / connection_error；delay: 重试前等待秒数）"""
+        if span is not None:
+            span.add_event("retry", {"meraki.retry.reason": reason, "meraki.retry.delay": delay})
+        retries = self._endpoint(endpoint, method).retries
+        retries[reason] = retries.get(reason, 0) + 1
+        for exporter in self.exporters:
+            exporter.retry(endpoint, reason)
+
+    def record_call(self, endpoint: str, method: str, outcome: str, seconds: float):
+        """
+        记录一次逻辑调用
+
+        Args:
+            endpoint: 端点模板
+            method: HTTP方法
+            outcome: ok，或最终失败的原因（client_error / rate_limited / server_error / connection_error）
+            seconds: 从第一次排队到返回或抛出异常的耗时
+        """
+        stats = self._endpoint(endpoint, method)
+        stats.calls += 1
+        stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+        stats.call_latency.observe(seconds)
+        for exporter in self.exporters:
+            exporter.call(endpoint, method, outcome, seconds)
+
+    def record_pages(self, endpoint: str, pages: int):
+        """记录一次分页遍历获取的页数"""
+        self._endpoint(endpoint, "GET").pages.observe(pages)
+        for exporter in self.exporters:
+            exporter.page_count(endpoint, pages)
+
+    def reset(self):
+        """清空进程内统计（不影响已导出的指标）"""
+        self._endpoints.clear()
+
+    def stats(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """
+        获取按端点模板的统计，按调用总耗时降序
+
+        Args:
+            top: 只返回总耗时最高的前 top 个端点（None表示全部）
+
+        Returns:
+            Dict: exporters（已启用的导出器）、endpoints（"GET /networks/{networkId}/clients" -> 统计）
+        """
+        rows: List[Tuple[float, str, Dict[str, Any]]] = []
+        for (method, endpoint), s in self._endpoints.items():
+            rows.append((s.call_latency.sum, f"{method} {endpoint}", {
+                "calls": s.calls,
+                "outcomes": dict(s.outcomes),
+                "call_seconds": round(s.call_latency.sum, 3),
+                "call_p95_ms": round(s.call_latency.quantile(0.95) * 1000, 1),
+                "requests": s.requests,
+                "statuses": dict(s.statuses),
+                "retries": dict(s.retries),
+                "bytes": s.bytes,
+                "avg_bytes": round(s.bytes / s.requests) if s.requests else 0,
+                "latency_ms": {
+                    "p50": round(s.latency.quantile(0.5) * 1000, 1),
+                    "p95": round(s.latency.quantile(0.95) * 1000, 1),
+                    "p99": round(s.latency.quantile(0.99) * 1000, 1),
+                    "avg": round(s.latency.sum / s.latency.count * 1000, 1) if s.latency.count else 0.0,
+                    "max": round(s.latency.max * 1000, 1),
+                },
+                "paginated_calls": s.pages.count,
+                "avg_pages": round(s.pages.sum / s.pages.count, 2) if s.pages.count else 0.0,
+                "max_pages": int(s.pages.max),
+            }))
+        rows.sort(key=lambda row: (-row[0], row[1]))
+        if top is not None:
+            rows = rows[:top]
+        return {
+            "exporters": [type(exporter).__name__.strip("_").replace("Exporter", "").lower()
+                          for exporter in self.exporters],
+            "endpoints": {name: stats for _, name, stats in rows},
+        }
+
+
+_default_request_metrics: Optional[RequestMetrics] = None
+
+
+def get_default_request_metrics() -> RequestMetrics:
+    """获取进程级共享的默认请求指标"""
+    global _default_request_metrics
+    if _default_request_metrics is None:
+        _default_request_metrics = RequestMetrics()
+    return _default_request_metrics
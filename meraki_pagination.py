@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 分页引擎
+
+Meraki 列表接口通过 RFC 5988 Link 响应头返回分页信息，例如:
+    Link: <https://api.meraki.cn/api/v1/organizations/1/devices?perPage=1000&startingAfter=Q2XX>; rel=next
+
+paginate() 沿着 rel=next 链接逐页获取数据，并在调用方处理当前页时
+预取下一页，可选地限制返回的最大条目数。
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+
+# fetch(url) -> (响应数据, 下一页URL)；url 为 None 表示请求第一页
+FetchPage = Callable[[Optional[str]], Awaitable[Tuple[Any, Optional[str]]]]
+
+
+@dataclass
+class Page:
+    """一页分页结果"""
+
+    items: List[Any]
+    # 下一页的完整URL（即分页游标），最后一页为None
+    next_url: Optional[str]
+    # 页码，从0开始
+    index: int
+
+
+def extract_items(data: Any, items_key: Optional[str] = None) -> List[Any]:
+    """
+    从响应数据中提取条目列表
+
+    Args:
+        data: 响应数据
+        items_key: 条目所在字段（如网络事件接口的 "events"），为None时响应本身即列表
+
+    Returns:
+        条目列表，无法识别时返回空列表
+    """
+    if items_key and isinstance(data, dict):
+        data = data.get(items_key)
+    return data if isinstance(data, list) else []
+
+
+async def paginate(fetch: FetchPage, max_items: Optional[int] = None,
+                   items_key: Optional[str] = None, prefetch: bool = True,
+                   start_url: Optional[str] = None) -> AsyncIterator[Page]:
+    """
+    沿 Link: rel=next 逐页获取数据
+
+    Args:
+        fetch: 获取一页数据的协程函数
+        max_items: 最多返回的条目总数（None表示不限制）
+        items_key: 条目所在字段
+        prefetch: 是否在处理当前页时预取下一页
+        start_url: 从指定的下一页URL继续（用于断点续传），None表示从第一页开始
+
+    Yields:
+        Page: 每一页的条目及下一页游标
+    """
+    remaining = max_items
+    pending = asyncio.ensure_future(fetch(start_url))
+    index = 0
+    try:
+        while pending is not None:
+            data, next_url = await pending
+            pending = None
+            items = extract_items(data, items_key)
+
+            if remaining is not None:
+                if len(items) >= remaining:
+                    items = items[:remaining]
+                    next_url = None
+                remaining -= len(items)
+
+            if next_url and items:
+                if prefetch:
+                    pending = asyncio.ensure_future(fetch(next_url))
+            else:
+                next_url = None
+
+            yield Page(items=items, next_url=next_url, index=index)
+            index += 1
+
+            if next_url and pending is None:
+                pending = asyncio.ensure_future(fetch(next_url))
+    finally:
+        # 调用方提前结束迭代时取消未使用的预取请求
+        if pending is not None:
+            pending.cancel()
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
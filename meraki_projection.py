@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Activity 返回结果的字段投影
+
+FirmwareSummaryWorkflow 只用到设备的 model、firmware、productType，
+但每个设备的 tags、notes、address、url 等字段都会写入 Temporal 历史。
+列表类 Activity 接受 fields 参数，在返回前裁剪每条记录：
+
+- 字段列表: ["serial", "model", "network.name"]（支持用 . 访问嵌套字段）
+- 命名投影: "firmware"、"geo" 等，见 PROJECTIONS
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+
+# 命名投影 -> 保留的字段
+PROJECTIONS: Dict[str, List[str]] = {
+    # 设备
+    "identity": ["serial", "name", "model", "mac", "networkId", "productType"],
+    "firmware": ["serial", "model", "firmware", "productType", "networkId"],
+    "geo": ["serial", "name", "model", "networkId", "lat", "lng", "address", "floorPlanId"],
+    "status": ["serial", "name", "model", "networkId", "productType", "status", "lastReportedAt"],
+    # 网络
+    "network": ["id", "name", "productTypes", "timeZone", "tags"],
+    # 客户端
+    "client": ["id", "mac", "description", "ip", "user", "ssid", "vlan", "status",
+               "recentDeviceSerial", "recentDeviceName", "lastSeen"],
+    # 告警
+    "alert": ["id", "type", "categoryType", "severity", "title", "description", "startedAt",
+              "resolvedAt", "network.id", "network.name", "scope.devices"],
+}
+
+Fields = Union[List[str], str, None]
+
+
+def resolve_fields(fields: Fields) -> Optional[List[str]]:
+    """
+    将 fields 参数解析为字段列表
+
+    Args:
+        fields: 字段列表、命名投影名称或None
+
+    Returns:
+        字段列表，None表示不投影
+
+    Raises:
+        ValueError: 命名投影不存在时
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        if fields not in PROJECTIONS:
+            raise ValueError(f"未知的字段投影: {fields!r}，可选: {', '.join(sorted(PROJECTIONS))}")
+        return PROJECTIONS[fields]
+    return list(fields)
+
+
+def _compile(fields: List[str]) -> Dict[str, Any]:
+    # ["a", "b.c", "b.d"] -> {"a": None, "b": {"c": None, "d": None}}
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is None and part in node:
+                break  # 已保留整个父字段
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _pick(record: Any, tree: Dict[str, Any]) -> Any:
+    if not isinstance(record, dict):
+        return record
+    result = {}
+    for key, sub in tree.items():
+        if key in record:
+            result[key] = record[key] if sub is None else _pick(record[key], sub)
+    return result
+
+
+def project(items: List[Any], fields: Fields) -> List[Any]:
+    """
+    只保留每条记录中的指定字段
+
+    Args:
+        items: 记录列表
+        fields: 字段列表、命名投影名称或None（不投影）
+
+    Returns:
+        投影后的记录列表（记录中不存在的字段不会补齐）
+    """
+    field_list = resolve_fields(fields)
+    if field_list is None or not isinstance(items, list):
+        return items
+    tree = _compile(field_list)
+    return [_pick(item, tree) for item in items]
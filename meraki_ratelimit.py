@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 限速器
+
+Meraki Dashboard API 对每个组织限制约 10 请求/秒，超过后返回 429。
+本模块提供异步令牌桶，按组织ID和API密钥分别限速，
+同一 Worker 进程内的所有 MerakiAPI 实例默认共享同一个限速器。
+
+限速参数可通过环境变量调整：
+- MERAKI_ORG_RATE: 每个组织每秒补充的令牌数（默认 10）
+- MERAKI_ORG_BURST: 每个组织的突发容量（默认 10）
+- MERAKI_KEY_RATE: 每个API密钥每秒补充的令牌数（默认 100）
+- MERAKI_KEY_BURST: 每个API密钥的突发容量（默认 100）
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Any
+
+
+DEFAULT_ORG_RATE = 10.0
+DEFAULT_ORG_BURST = 10
+DEFAULT_KEY_RATE = 100.0
+DEFAULT_KEY_BURST = 100
+
+
+class TokenBucket:
+    """异步令牌桶，等待者按先来先服务顺序获得令牌"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量（允许的最大突发请求数）
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate 和 burst 必须大于0")
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """
+        获取一个令牌，令牌不足时等待
+
+        Returns:
+            float: 本次等待的秒数
+        """
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """获取令牌桶状态"""
+        self._refill()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 3),
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "total_wait_seconds": round(self.total_wait, 3),
+        }
+
+
+class MerakiRateLimiter:
+    """按组织ID和API密钥分别限速的限速器"""
+
+    def __init__(self, org_rate: Optional[float] = None, org_burst: Optional[int] = None,
+                 key_rate: Optional[float] = None, key_burst: Optional[int] = None):
+        """
+        Args:
+            org_rate: 每个组织每秒补充的令牌数
+            org_burst: 每个组织的突发容量
+            key_rate: 每个API密钥每秒补充的令牌数
+            key_burst: 每个API密钥的突发容量
+        """
+        self.org_rate = org_rate if org_rate is not None else float(
+            os.getenv("MERAKI_ORG_RATE", DEFAULT_ORG_RATE))
+        self.org_burst = org_burst if org_burst is not None else int(
+            os.getenv("MERAKI_ORG_BURST", DEFAULT_ORG_BURST))
+        self.key_rate = key_rate if key_rate is not None else float(
+            os.getenv("MERAKI_KEY_RATE", DEFAULT_KEY_RATE))
+        self.key_burst = key_burst if key_burst is not None else int(
+            os.getenv("MERAKI_KEY_BURST", DEFAULT_KEY_BURST))
+
+        self._org_buckets: Dict[str, TokenBucket] = {}
+        self._key_buckets: Dict[str, TokenBucket] = {}
+
+    def _org_bucket(self, org_id: str) -> TokenBucket:
+        bucket = self._org_buckets.get(org_id)
+        if bucket is None:
+            bucket = self._org_buckets[org_id] = TokenBucket(self.org_rate, self.org_burst)
+        return bucket
+
+    def _key_bucket(self, api_key: str) -> TokenBucket:
+        bucket = self._key_buckets.get(api_key)
+        if bucket is None:
+            bucket = self._key_buckets[api_key] = TokenBucket(self.key_rate, self.key_burst)
+        return bucket
+
+    async def acquire(self, api_key: str, org_id: Optional[str] = None) -> float:
+        """
+        为一次请求获取令牌：先占用API密钥额度，再占用组织额度（组织未知时跳过）
+
+        Args:
+            api_key: API密钥
+            org_id: 组织ID
+
+        Returns:
+            float: 总等待秒数
+        """
+        waited = await self._key_bucket(api_key).acquire()
+        if org_id:
+            waited += await self._org_bucket(org_id).acquire()
+        return waited
+
+    def queue_depth(self) -> int:
+        """当前所有令牌桶中等待的请求总数"""
+        return (sum(b.waiting for b in self._org_buckets.values())
+                + sum(b.waiting for b in self._key_buckets.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取限速器统计信息
+
+        Returns:
+            Dict: 总排队数以及每个组织/API密钥令牌桶的状态（API密钥只显示末4位）
+        """
+        return {
+            "queue_depth": self.queue_depth(),
+            "organizations": {org_id: b.stats() for org_id, b in self._org_buckets.items()},
+            "api_keys": {f"...{key[-4:]}": b.stats() for key, b in self._key_buckets.items()},
+        }
+
+
+_default_rate_limiter: Optional[MerakiRateLimiter] = None
+
+
+def get_default_rate_limiter() -> MerakiRateLimiter:
+    """获取进程级共享的默认限速器"""
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        _default_rate_limiter = MerakiRateLimiter()
+    return _default_rate_limiter
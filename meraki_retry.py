@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki API 重试引擎
+
+- 429: 优先按响应头 Retry-After 等待后重试（不超过 MERAKI_RETRY_MAX_DELAY）
+- 5xx / 408 / 网络错误: 使用 decorrelated jitter 退避后重试
+- 其他 4xx: 请求本身有误，立即放弃，抛出不可重试的 MerakiClientError
+
+重试参数可通过环境变量调整：
+- MERAKI_RETRY_MAX_ATTEMPTS: 单次请求最多尝试次数（默认 5）
+- MERAKI_RETRY_BASE_DELAY: 退避基础延迟，秒（默认 0.5）
+- MERAKI_RETRY_MAX_DELAY: 单次退避最大延迟，秒（默认 30）
+"""
+
+import os
+import random
+from typing import Dict, Optional, Any
+
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+# 429 未携带 Retry-After 时的默认等待时间（Meraki 文档建议值）
+DEFAULT_RETRY_AFTER = 1.0
+
+
+# ==================== 异常类型 ====================
+
+class MerakiAPIError(Exception):
+    """Meraki API 请求失败"""
+
+    retryable = True
+
+    def __init__(self, message: str, status: Optional[int] = None, endpoint: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.endpoint = endpoint
+
+
+class MerakiClientError(MerakiAPIError):
+    """4xx 客户端错误（参数错误、无权限、资源不存在等），重试无法成功"""
+
+    retryable = False
+
+
+class MerakiRateLimitError(MerakiAPIError):
+    """429 请求过多，重试次数用尽后抛出"""
+
+    def __init__(self, message: str, status: Optional[int] = None, endpoint: Optional[str] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message, status, endpoint)
+        self.retry_after = retry_after
+
+
+class MerakiServerError(MerakiAPIError):
+    """5xx 服务端错误，重试次数用尽后抛出"""
+
+
+class MerakiConnectionError(MerakiAPIError):
+    """网络连接错误或超时，重试次数用尽后抛出"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 响应头值（秒数或 HTTP 日期）
+
+    Returns:
+        等待秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_for_status(status: int, endpoint: str, reason: str = "",
+                     retry_after: Optional[str] = None) -> MerakiAPIError:
+    """
+    根据HTTP状态码构造对应的异常
+
+    Args:
+        status: HTTP状态码
+        endpoint: API端点
+        reason: 错误原因（响应体或状态描述）
+        retry_after: Retry-After 响应头
+
+    Returns:
+        对应类型的 MerakiAPIError
+    """
+    message = f"Meraki API请求失败: {endpoint} {reason}".rstrip() + f" (状态码: {status})"
+    if status == 429:
+        return MerakiRateLimitError(message, status, endpoint, parse_retry_after(retry_after))
+    if status >= 500 or status == 408:
+        return MerakiServerError(message, status, endpoint)
+    return MerakiClientError(message, status, endpoint)
+
+
+def error_kind(error: MerakiAPIError) -> str:
+    """
+    异常归类，用于重试统计和请求指标
+
+    Args:
+        error: 请求异常
+
+    Returns:
+        rate_limited / server_error / connection_error / client_error
+    """
+    if isinstance(error, MerakiRateLimitError):
+        return "rate_limited"
+    if isinstance(error, MerakiServerError):
+        return "server_error"
+    if isinstance(error, MerakiClientError):
+        return "client_error"
+    return "connection_error"
+
+
+# ==================== 重试策略 ====================
+
+class RetryPolicy:
+    """带统计信息的重试策略"""
+
+    def __init__(self, max_attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None):
+        """
+        Args:
+            max_attempts: 单次请求最多尝试次数（包含首次请求）
+            base_delay: 退避基础延迟（秒）
+            max_delay: 单次退避最大延迟（秒）
+        """
+        self.max_attempts = max_attempts if max_attempts is not None else int(
+            os.getenv("MERAKI_RETRY_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        self.base_delay = base_delay if base_delay is not None else float(
+            os.getenv("MERAKI_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY))
+        self.max_delay = max_delay if max_delay is not None else float(
+            os.getenv("MERAKI_RETRY_MAX_DELAY", DEFAULT_MAX_DELAY))
+
+        self._stats = {
+            "retries": 0,
+            "retries_by_reason": {"rate_limited": 0, "server_error": 0, "connection_error": 0},
+            "give_ups": 0,
+            "non_retryable": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def next_delay(self, error: MerakiAPIError, attempt: int,
+                   previous_delay: Optional[float] = None) -> Optional[float]:
+        """
+        计算下一次重试前的等待时间
+
+        Args:
+            error: 本次请求的异常
+            attempt: 已尝试次数（从1开始）
+            previous_delay: 上一次的退避时间
+
+        Returns:
+            等待秒数；不应重试时返回None
+        """
+        if not error.retryable:
+            self._stats["non_retryable"] += 1
+            return None
+        if attempt >= self.max_attempts:
+            self._stats["give_ups"] += 1
+            return None
+
+        reason = error_kind(error)
+        if isinstance(error, MerakiRateLimitError):
+            delay = error.retry_after if error.retry_after is not None else DEFAULT_RETRY_AFTER
+            # 异常的 Retry-After（如数小时）会让Activity等待超过 start_to_close 超时，按最大退避封顶
+            delay = min(self.max_delay, delay)
+        else:
+            # decorrelated jitter: sleep = min(cap, random(base, prev * 3))
+            prev = previous_delay or self.base_delay
+            delay = min(self.max_delay, random.uniform(self.base_delay, prev * 3))
+
+        self._stats["retries"] += 1
+        self._stats["retries_by_reason"][reason] += 1
+        self._stats["wait_seconds"] += delay
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """获取重试统计信息（重试次数、放弃次数、累计等待时间）"""
+        return {
+            "max_attempts": self.max_attempts,
+            "retries": self._stats["retries"],
+            "retries_by_reason": dict(self._stats["retries_by_reason"]),
+            "give_ups": self._stats["give_ups"],
+            "non_retryable": self._stats["non_retryable"],
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+        }
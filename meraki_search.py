@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备搜索索引（三元组倒排索引）
+
+按名称搜索设备原本需要下载组织的全部设备，再对每台设备做一次 `keyword in name`，
+设备数上万时每次查询都要重复这一过程。DeviceSearchIndex 对设备的
+name、hostname、serial、model、tags 建立三元组（trigram）倒排索引：
+
+- 每个字段小写后首尾加标记再切分三元组，首标记用于前缀查询，尾部补两个标记，
+  使长度为1~2的查询也能通过"以查询串开头的三元组"找到候选
+- 查询时取各三元组倒排表的交集作为候选，再对候选逐一校验并打分：
+  完全匹配 > 字段前缀 > 单词前缀 > 子串，字段权重 name > serial > hostname > model > tags
+- 多个关键词（空格分隔）之间为AND，得分相加
+- 每个库存快照构建一次索引，之后的快照通过 sync() 增量更新：
+  只有被索引的字段变化的设备才重建三元组，其余只替换记录
+
+索引快照的最长使用时间可通过环境变量 MERAKI_SEARCH_MAX_AGE 调整（默认 300 秒）。
+"""
+
+import heapq
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_SEARCH_MAX_AGE = 300
+DEFAULT_SEARCH_LIMIT = 50
+
+# 被索引的字段 -> 打分权重
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 4.0,
+    "serial": 3.0,
+    "hostname": 2.0,
+    "model": 1.5,
+    "tags": 1.0,
+}
+
+_BEGIN, _END = "\x02", "\x03"
+_WORD_SEPARATORS = " -_./:"
+
+# 匹配类型得分
+_EXACT, _PREFIX, _WORD_PREFIX, _SUBSTRING = 4, 3, 2, 1
+
+
+def _field_texts(device: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """提取设备被索引的字段（小写），tags 中每个标签单独作为一个文本"""
+    texts = []
+    for field in FIELD_WEIGHTS:
+        value = device.get(field)
+        if not value:
+            continue
+        if field == "tags":
+            tags = value.split() if isinstance(value, str) else value
+            texts.extend(("tags", str(tag).lower()) for tag in tags if tag)
+        else:
+            texts.append((field, str(value).lower()))
+    return tuple(texts)
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = _BEGIN + text + _END + _END
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _match_kind(term: str, text: str, prefix: bool) -> int:
+    if text == term:
+        return _EXACT
+    if text.startswith(term):
+        return _PREFIX
+    if prefix:
+        return 0
+    position = text.find(term)
+    if position < 0:
+        return 0
+    while position >= 0:
+        if text[position - 1] in _WORD_SEPARATORS:
+            return _WORD_PREFIX
+        position = text.find(term, position + 1)
+    return _SUBSTRING
+
+
+class DeviceSearchIndex:
+    """一个组织的设备三元组倒排索引，支持增量更新、排序和分页"""
+
+    def __init__(self):
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._texts: Dict[int, Tuple[Tuple[str, str], ...]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._next_id = 0
+        # 文档ID -> 在最近一次快照中的位置（即API返回顺序）
+        self._positions: Dict[int, int] = {}
+        # 三元组 -> 文档ID集合；1~2字符前缀 -> 以其开头的三元组
+        self._postings: Dict[str, Set[int]] = {}
+        self._gram_prefixes: Dict[str, Set[str]] = defaultdict(set)
+        self.synced_at: Optional[float] = None
+        self._stats = {"snapshots": 0, "searches": 0, "search_seconds": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, serial: str) -> bool:
+        return serial in self._doc_ids
+
+    def is_stale(self, max_age: Optional[float]) -> bool:
+        """索引从未同步，或最近一次同步早于 max_age 秒前（None表示不限）"""
+        if self.synced_at is None:
+            return True
+        return max_age is not None and time.time() - self.synced_at > max_age
+
+    # ==================== 更新 ====================
+
+    def clone(self) -> "DeviceSearchIndex":
+        """
+        复制索引（倒排表逐个复制，设备记录共享），用于在线程池中更新副本后整体替换，
+        更新期间的查询仍使用原索引，不会看到更新到一半的状态
+        """
+        other = DeviceSearchIndex()
+        other._docs = dict(self._docs)
+        other._texts = dict(self._texts)
+        other._doc_ids = dict(self._doc_ids)
+        other._next_id = self._next_id
+        other._positions = dict(self._positions)
+        other._postings = {gram: set(docs) for gram, docs in self._postings.items()}
+        other._gram_prefixes = defaultdict(set, {key: set(grams) for key, grams in self._gram_prefixes.items()})
+        other.synced_at = self.synced_at
+        # 统计计数在副本之间延续
+        other._stats = self._stats
+        return other
+
+    def _add_grams(self, doc_id: int, texts: Tuple[Tuple[str, str], ...]):
+        for _, text in texts:
+            for gram in _trigrams(text):
+                docs = self._postings.get(gram)
+                if docs is None:
+                    docs = self._postings[gram] = set()
+                    self._gram_prefixes[gram[0]].add(gram)
+                    self._gram_prefixes[gram[:2]].add(gram)
+                docs.add(doc_id)
+
+    def _remove_grams(self, doc_id: int, texts: Tuple[Tuple[str, str], ...]):
+        for _, text in texts:
+            for gram in _trigrams(text):
+                docs = self._postings.get(gram)
+                if docs is None:
+                    continue
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[gram]
+                    for key in (gram[0], gram[:2]):
+                        grams = self._gram_prefixes[key]
+                        grams.discard(gram)
+                        if not grams:
+                            del self._gram_prefixes[key]
+
+    def upsert(self, device: Dict[str, Any]) -> str:
+        """
+        添加或更新一台设备
+
+        Args:
+            device: 设备记录（必须包含 serial）
+
+        Returns:
+            "added" / "updated"（被索引的字段变化） / "unchanged"（只替换记录）
+        """
+        serial = str(device["serial"])
+        texts = _field_texts(device)
+        doc_id = self._doc_ids.get(serial)
+        if doc_id is None:
+            doc_id = self._doc_ids[serial] = self._next_id
+            self._next_id += 1
+            self._add_grams(doc_id, texts)
+            outcome = "added"
+        elif texts != self._texts[doc_id]:
+            self._remove_grams(doc_id, self._texts[doc_id])
+            self._add_grams(doc_id, texts)
+            outcome = "updated"
+        else:
+            outcome = "unchanged"
+        self._docs[doc_id] = device
+        self._texts[doc_id] = texts
+        return outcome
+
+    def remove(self, serial: str) -> bool:
+        """从索引中删除设备，设备不存在时返回False"""
+        doc_id = self._doc_ids.pop(serial, None)
+        if doc_id is None:
+            return False
+        self._remove_grams(doc_id, self._texts.pop(doc_id))
+        del self._docs[doc_id]
+        self._positions.pop(doc_id, None)
+        return True
+
+    def sync(self, devices: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        用一个完整的库存快照增量更新索引：删除快照中已不存在的设备
+
+        Args:
+            devices: 组织的全部设备
+
+        Returns:
+            Dict: added / updated / unchanged / removed 设备数
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        positions = {}
+        for device in devices:
+            if not isinstance(device, dict) or not device.get("serial"):
+                continue
+            seen.add(str(device["serial"]))
+            counts[self.upsert(device)] += 1
+            positions.setdefault(self._doc_ids[str(device["serial"])], len(positions))
+        for serial in [s for s in self._doc_ids if s not in seen]:
+            self.remove(serial)
+            counts["removed"] += 1
+        self._positions = positions
+        self.synced_at = time.time()
+        self._stats["snapshots"] += 1
+        return counts
+
+    # ==================== 查询 ====================
+
+    def get(self, serial: str) -> Optional[Dict[str, Any]]:
+        """按序列号获取设备记录"""
+        doc_id = self._doc_ids.get(serial)
+        return self._docs.get(doc_id) if doc_id is not None else None
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """索引中的全部设备（按最近一次快照中的顺序，即API返回顺序）"""
+        return [self._docs[doc_id] for doc_id in sorted(self._docs, key=self._position_key)]
+
+    def _position_key(self, doc_id: int) -> Tuple[int, int]:
+        # 快照之外单独 upsert 的设备排在最后
+        return (self._positions.get(doc_id, len(self._positions)), doc_id)
+
+    def _sort_key(self, doc_id: int) -> Tuple[str, str]:
+        device = self._docs[doc_id]
+        return (str(device.get("name") or "").lower(), str(device.get("serial") or ""))
+
+    def _candidates(self, term: str, prefix: bool) -> Set[int]:
+        key = _BEGIN + term if prefix else term
+        if len(key) >= 3:
+            grams = [key[i:i + 3] for i in range(len(key) - 2)]
+            postings = [self._postings.get(gram) for gram in grams]
+            if not all(postings):
+                return set()
+            postings.sort(key=len)
+            return postings[0].intersection(*postings[1:])
+        # 不足三个字符：合并所有以 key 开头的三元组的倒排表
+        result: Set[int] = set()
+        for gram in self._gram_prefixes.get(key, ()):
+            result |= self._postings[gram]
+        return result
+
+    def filter_name(self, substring: str) -> List[Dict[str, Any]]:
+        """
+        按名称字面子串过滤设备（等价于 `substring.lower() in name.lower()`）
+
+        与 search() 不同，查询串不按空格拆分成多个关键词，结果也不打分，
+        只用三元组倒排表缩小候选范围。
+
+        Args:
+            substring: 名称子串（不区分大小写）
+
+        Returns:
+            List[Dict]: 名称包含该子串的设备，按最近一次快照中的顺序（即API返回顺序）排列
+        """
+        term = substring.lower()
+        if not term:
+            return self.devices()
+        matches = [doc_id for doc_id in self._candidates(term, False)
+                   if term in str(self._docs[doc_id].get("name") or "").lower()]
+        return [self._docs[doc_id] for doc_id in sorted(matches, key=self._position_key)]
+
+    def search(self, query: str, offset: int = 0, limit: Optional[int] = DEFAULT_SEARCH_LIMIT,
+               fields: Optional[Iterable[str]] = None, prefix: bool = False) -> Dict[str, Any]:
+        """
+        搜索设备
+
+        Args:
+            query: 关键词（不区分大小写，空格分隔的多个关键词之间为AND）
+            offset: 跳过的结果数
+            limit: 最多返回的结果数（None表示全部）
+            fields: 只在这些字段中匹配（默认全部被索引的字段）
+            prefix: 只匹配以关键词开头的字段
+
+        Returns:
+            Dict: 搜索结果，包含:
+                - total (int): 匹配的设备总数
+                - offset / limit: 分页参数
+                - items (List[Dict]): 本页设备记录，按得分降序、名称升序排列
+        """
+        started = time.perf_counter()
+        terms = query.lower().split()
+        allowed = set(fields) if fields is not None else None
+        if allowed is not None and not allowed <= FIELD_WEIGHTS.keys():
+            raise ValueError(f"不支持搜索的字段: {', '.join(sorted(allowed - FIELD_WEIGHTS.keys()))}")
+
+        scored: List[Tuple[float, str, str, int]] = []
+        if terms:
+            candidate_sets = sorted((self._candidates(term, prefix) for term in terms), key=len)
+            candidates = candidate_sets[0].intersection(*candidate_sets[1:])
+            for doc_id in candidates:
+                score = 0.0
+                for term in terms:
+                    best = 0.0
+                    for field, text in self._texts[doc_id]:
+                        if allowed is not None and field not in allowed:
+                            continue
+                        kind = _match_kind(term, text, prefix)
+                        if kind and kind * FIELD_WEIGHTS[field] > best:
+                            best = kind * FIELD_WEIGHTS[field]
+                    if not best:
+                        break
+                    score += best
+                else:
+                    scored.append((-score, *self._sort_key(doc_id), doc_id))
+
+        if limit is None:
+            page = sorted(scored)[offset:]
+        else:
+            page = heapq.nsmallest(offset + limit, scored)[offset:]
+        self._stats["searches"] += 1
+        self._stats["search_seconds"] += time.perf_counter() - started
+        return {
+            "total": len(scored),
+            "offset": offset,
+            "limit": limit,
+            "items": [self._docs[entry[-1]] for entry in page],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取索引统计信息
+
+        Returns:
+            Dict: 设备数、三元组数、倒排表总长度、快照次数、查询次数和平均查询耗时
+        """
+        searches = self._stats["searches"]
+        return {
+            "devices": len(self._docs),
+            "grams": len(self._postings),
+            "postings": sum(len(docs) for docs in self._postings.values()),
+            "snapshots": self._stats["snapshots"],
+            "searches": searches,
+            "avg_search_ms": round(self._stats["search_seconds"] / searches * 1000, 4) if searches else 0.0,
+            "synced_at": self.synced_at,
+        }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meraki HTTP 连接池
+
+为整个 Worker 进程提供一个长生命周期、经过调优的 aiohttp.ClientSession，
+避免每个 Activity 都重新建立 TCP+TLS 连接。
+
+连接池参数可通过环境变量调整：
+- MERAKI_POOL_LIMIT: 连接池总连接数上限（默认 100）
+- MERAKI_POOL_LIMIT_PER_HOST: 单个主机连接数上限（默认 20）
+- MERAKI_POOL_KEEPALIVE: 空闲连接保活时间，秒（默认 60）
+- MERAKI_POOL_DNS_TTL: DNS 缓存时间，秒（默认 300）
+"""
+
+import os
+from typing import Dict, Optional, Any
+
+import aiohttp
+
+
+DEFAULT_POOL_LIMIT = 100
+DEFAULT_POOL_LIMIT_PER_HOST = 20
+DEFAULT_KEEPALIVE_TIMEOUT = 60.0
+DEFAULT_DNS_CACHE_TTL = 300
+
+
+class MerakiSessionPool:
+    """Worker 级共享的 aiohttp 连接池"""
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 keepalive_timeout: Optional[float] = None, ttl_dns_cache: Optional[int] = None):
+        """
+        初始化连接池配置（不会立即创建连接，需调用 open()）
+
+        Args:
+            limit: 连接池总连接数上限
+            limit_per_host: 单个主机连接数上限
+            keepalive_timeout: 空闲连接保活时间（秒）
+            ttl_dns_cache: DNS 缓存时间（秒）
+        """
+        self.limit = limit if limit is not None else int(
+            os.getenv("MERAKI_POOL_LIMIT", DEFAULT_POOL_LIMIT))
+        self.limit_per_host = limit_per_host if limit_per_host is not None else int(
+            os.getenv("MERAKI_POOL_LIMIT_PER_HOST", DEFAULT_POOL_LIMIT_PER_HOST))
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else float(
+            os.getenv("MERAKI_POOL_KEEPALIVE", DEFAULT_KEEPALIVE_TIMEOUT))
+        self.ttl_dns_cache = ttl_dns_cache if ttl_dns_cache is not None else int(
+            os.getenv("MERAKI_POOL_DNS_TTL", DEFAULT_DNS_CACHE_TTL))
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._counters = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+        }
+
+    @property
+    def is_open(self) -> bool:
+        """连接池是否已打开"""
+        return self._session is not None and not self._session.closed
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        获取共享会话
+
+        Raises:
+            RuntimeError: 连接池尚未打开时
+        """
+        if not self.is_open:
+            raise RuntimeError("连接池尚未打开，请先调用 open()")
+        return self._session
+
+    async def open(self) -> aiohttp.ClientSession:
+        """创建共享会话（重复调用时返回已存在的会话）"""
+        if self.is_open:
+            return self._session
+
+        self._connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            trace_configs=[self._build_trace_config()],
+        )
+        return self._session
+
+    async def close(self):
+        """关闭共享会话并释放所有连接"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            Dict: 包含配置、当前连接占用情况和连接复用计数
+        """
+        idle = 0
+        acquired = 0
+        if self._connector is not None and not self._connector.closed:
+            # aiohttp 未公开空闲/占用连接数，这里读取连接器内部状态
+            idle = sum(len(conns) for conns in getattr(self._connector, "_conns", {}).values())
+            acquired = len(getattr(self._connector, "_acquired", ()))
+
+        created = self._counters["connections_created"]
+        reused = self._counters["connections_reused"]
+        return {
+            "open": self.is_open,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "idle_connections": idle,
+            "acquired_connections": acquired,
+            "requests": self._counters["requests"],
+            "connections_created": created,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / (created + reused), 4) if (created + reused) else 0.0,
+        }
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """通过 aiohttp 追踪钩子统计新建连接与复用连接"""
+        trace_config = aiohttp.TraceConfig()
+        counters = self._counters
+
+        async def on_request_start(session, context, params):
+            counters["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            counters["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            counters["connections_reused"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
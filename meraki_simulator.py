@@ -0,0 +1,1030 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 Meraki Dashboard API 模拟服务（用于离线压测和基准测试）
+
+test.py 只能连接真实的 api.meraki.cn 组织，无法离线压测。MerakiSimulator 基于 aiohttp.web
+提供 merakiAPI.py 调用的全部端点，数据由可配置规模的合成组织确定性生成（同一 seed 结果相同）：
+
+- 组织、网络、设备（安全网关/交换机/AP/摄像头/传感器）、设备状态、客户端、楼层平面图、
+  保障告警、网络事件（每个事件流按固定间隔持续产生）、上行链路丢包/延迟
+- 列表端点支持 perPage 并返回 Link: rel=first/next 分页头（游标为不透明的 startingAfter，
+  网络事件的 startingAfter 为 occurredAt 时间）
+- 每个组织的请求按令牌桶限速（默认 10 rps），超出时返回 429 和 Retry-After
+- 每个请求可注入固定延迟和随机抖动
+- stats() 按端点模板统计请求数、429 次数和响应字节数，GET /organizations/{id}/apiRequests/overview
+  也返回这些计数
+
+用法：
+  python meraki_simulator.py --port 8080 --networks 50 --devices-per-network 40
+  然后将 MERAKI_BASE_URL 设为 http://127.0.0.1:8080/api/v1 启动 worker.py，
+  或在代码中使用 MerakiAPI(base_url=simulator.base_url)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from aiohttp import web
+
+
+DEFAULT_ORG_ID = "850617379619606726"
+DEFAULT_RATE_LIMIT = 10.0
+API_PREFIX = "/api/v1"
+
+_BASE_LAT, _BASE_LNG = 31.2304, 121.4737
+_MODELS = {
+    "appliance": "MX68",
+    "switch": "MS225-48LP",
+    "wireless": "MR46",
+    "camera": "MV12W",
+    "sensor": "MT10",
+}
+_EVENT_TYPES = {
+    "wireless": ["association", "disassociation", "8021x_auth", "wpa_auth", "dhcp_lease"],
+    "appliance": ["dhcp_lease", "vpn_connectivity_change", "uplink_change", "ids_alerted"],
+    "switch": ["port_status", "stp_port_role_change", "dhcp_snooping"],
+    "camera": ["motion_alert", "video_wall_change"],
+    "sensor": ["sensor_alert", "sensor_reading"],
+}
+_ALERT_TYPES = [
+    ("connectivity", "Device went offline", "critical"),
+    ("connectivity", "Uplink failover", "warning"),
+    ("device_health", "High CPU usage", "warning"),
+    ("device_health", "Power supply failure", "critical"),
+    ("network", "DHCP pool exhausted", "warning"),
+    ("network", "Rogue AP detected", "info"),
+    ("configuration", "Firmware upgrade available", "info"),
+]
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _parse_time(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _noise(*parts: Any) -> float:
+    """确定性伪随机数（0~1），用于按需生成的数据"""
+    return zlib.crc32("|".join(map(str, parts)).encode()) / 0xFFFFFFFF
+
+
+@dataclass
+class SimulatorConfig:
+    """合成组织规模与服务行为"""
+    organizations: int = 1
+    networks: int = 10  # 每个组织的网络数
+    devices_per_network: int = 20
+    clients_per_network: int = 50
+    alerts: int = 200  # 每个组织的保障告警数
+    floors_per_network: int = 2
+    event_interval_seconds: float = 300.0  # 每个事件流产生事件的间隔
+    rate_limit: float = DEFAULT_RATE_LIMIT  # 每个组织每秒请求数，0表示不限速
+    burst: Optional[float] = None  # 令牌桶容量（默认等于 rate_limit）
+    latency_ms: float = 0.0  # 每个请求的固定延迟
+    jitter_ms: float = 0.0  # 在固定延迟上叠加的随机延迟（0~jitter_ms）
+    seed: int = 0
+    org_ids: List[str] = field(default_factory=list)  # 指定组织ID（不足时自动生成），默认第一个为 DEFAULT_ORG_ID
+
+
+class _Paged:
+    """列表端点的返回值，由中间件统一分页"""
+
+    def __init__(self, items: List[Any], default_per_page: int = 1000, max_per_page: int = 1000):
+        self.items = items
+        self.default_per_page = default_per_page
+        self.max_per_page = max_per_page
+
+
+class MerakiSimulator:
+    """模拟 Meraki Dashboard API v1 的本地HTTP服务"""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        """
+        Args:
+            config: 合成组织规模与服务行为（为None时使用默认配置）
+        """
+        self.config = config or SimulatorConfig()
+        self.started_at = time.time()
+        # 网络事件从一周前开始按固定间隔产生
+        self.events_epoch = self.started_at - 7 * 86400
+        self._rng = random.Random(self.config.seed)
+        self._buckets: Dict[str, List[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.host = "127.0.0.1"
+        self.port = 0
+
+        self.orgs: List[Dict[str, Any]] = []
+        self.networks: Dict[str, List[Dict[str, Any]]] = {}
+        self.network_by_id: Dict[str, Dict[str, Any]] = {}
+        self.devices: Dict[str, List[Dict[str, Any]]] = {}
+        self.device_by_serial: Dict[str, Dict[str, Any]] = {}
+        self.devices_by_network: Dict[str, List[Dict[str, Any]]] = {}
+        self.statuses: Dict[str, str] = {}
+        self.clients_by_network: Dict[str, List[Dict[str, Any]]] = {}
+        self.client_by_mac: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.floor_plans: Dict[str, List[Dict[str, Any]]] = {}
+        self.alerts: Dict[str, List[Dict[str, Any]]] = {}
+        self._generate()
+
+    # ==================== 数据生成 ====================
+
+    def _generate(self):
+        config, rng = self.config, self._rng
+        org_ids = list(config.org_ids) or [DEFAULT_ORG_ID]
+        while len(org_ids) < config.organizations:
+            org_ids.append(str(100000000000000000 + len(org_ids)))
+        device_counter = client_counter = 0
+
+        for org_index, org_id in enumerate(org_ids[:max(1, config.organizations)]):
+            self.orgs.append({
+                "id": org_id, "name": f"Simulated Org {org_index + 1}",
+                "url": f"https://n1.meraki.cn/o/{org_id}/manage/organization/overview",
+                "api": {"enabled": True}, "licensing": {"model": "co-term"},
+                "cloud": {"region": {"name": "China"}},
+            })
+            networks, devices = [], []
+            for n in range(config.networks):
+                network_id = f"L_{org_index:02d}{n:06d}"
+                product_types = ["appliance", "switch", "wireless"] + (["camera", "sensor"] if n % 4 == 0 else [])
+                network = {
+                    "id": network_id, "organizationId": org_id, "name": f"Site {n + 1:03d}",
+                    "productTypes": product_types, "timeZone": "Asia/Shanghai",
+                    "tags": ["campus"] if n % 2 == 0 else ["branch"], "notes": "",
+                    "isBoundToConfigTemplate": False,
+                }
+                networks.append(network)
+                self.network_by_id[network_id] = network
+                site_lat = _BASE_LAT + (n // 10) * 0.02
+                site_lng = _BASE_LNG + (n % 10) * 0.02
+
+                floors = [{
+                    "floorPlanId": f"g_{org_index:02d}{n:06d}{f}", "name": f"{f + 1}F",
+                    "center": {"lat": site_lat, "lng": site_lng},
+                    "height": 40.0, "width": 60.0, "imageExtension": "png",
+                    "imageUrl": f"https://example.invalid/floorplans/{network_id}/{f}.png",
+                    "devices": [],
+                } for f in range(config.floors_per_network)]
+                self.floor_plans[network_id] = floors
+
+                network_devices = []
+                for d in range(config.devices_per_network):
+                    if d == 0:
+                        product_type = "appliance"
+                    elif d % 4 == 1:
+                        product_type = "switch"
+                    elif "camera" in product_types and d % 10 == 9:
+                        product_type = "camera"
+                    elif "sensor" in product_types and d % 10 == 8:
+                        product_type = "sensor"
+                    else:
+                        product_type = "wireless"
+                    device_counter += 1
+                    serial = f"Q2{product_type[0].upper()}{org_index}-{device_counter // 10000:04X}-{device_counter % 10000:04d}"
+                    model = _MODELS[product_type]
+                    device = {
+                        "serial": serial, "name": f"{model}-{n + 1:03d}-{d + 1:03d}", "model": model,
+                        "mac": "e0:55:3d:%02x:%02x:%02x" % ((device_counter >> 16) & 255, (device_counter >> 8) & 255,
+                                                            device_counter & 255),
+                        "networkId": network_id, "productType": product_type,
+                        "lat": round(site_lat + rng.uniform(-0.001, 0.001), 6),
+                        "lng": round(site_lng + rng.uniform(-0.001, 0.001), 6),
+                        "address": f"Site {n + 1:03d}, Shanghai", "tags": [product_type],
+                        "firmware": f"{product_type}-{rng.choice(['29-5', '30-6', '31-1'])}",
+                        "lanIp": f"10.{org_index}.{n % 256}.{d % 250 + 2}",
+                        "url": f"https://n1.meraki.cn/{network_id}/manage/nodes/new_list/{device_counter}",
+                    }
+                    if product_type == "wireless" and floors:
+                        floor = floors[d % len(floors)]
+                        device["floorPlanId"] = floor["floorPlanId"]
+                        floor["devices"].append({k: device[k] for k in ("serial", "name", "model", "mac", "lat", "lng")})
+                    network_devices.append(device)
+                    self.device_by_serial[serial] = device
+                    self.statuses[serial] = rng.choices(
+                        ["online", "offline", "alerting", "dormant"], weights=[90, 4, 4, 2])[0]
+                self.devices_by_network[network_id] = network_devices
+                devices.extend(network_devices)
+
+                aps = [dev for dev in network_devices if dev["productType"] == "wireless"] or network_devices
+                clients = []
+                for c in range(config.clients_per_network):
+                    client_counter += 1
+                    ap = aps[c % len(aps)] if aps else {}
+                    mac = "a4:83:e7:%02x:%02x:%02x" % ((client_counter >> 16) & 255, (client_counter >> 8) & 255,
+                                                       client_counter & 255)
+                    last_seen = int(self.started_at - rng.uniform(0, 86400))
+                    client = {
+                        "id": f"k{client_counter:07x}", "mac": mac, "description": f"client-{client_counter}",
+                        "ip": f"10.{100 + org_index}.{(client_counter >> 8) & 255}.{client_counter & 255}",
+                        "ip6": None, "user": f"user{client_counter}" if c % 3 == 0 else None,
+                        "firstSeen": last_seen - int(rng.uniform(3600, 30 * 86400)), "lastSeen": last_seen,
+                        "manufacturer": rng.choice(["Apple", "Samsung", "Intel", "Huawei"]),
+                        "os": rng.choice(["iOS", "Android", "Windows 11", "macOS"]),
+                        "recentDeviceSerial": ap.get("serial"), "recentDeviceName": ap.get("name"),
+                        "recentDeviceMac": ap.get("mac"),
+                        "recentDeviceConnection": "Wireless" if ap.get("productType") == "wireless" else "Wired",
+                        "ssid": "Corp" if c % 2 == 0 else "Guest", "vlan": 10 if c % 2 == 0 else 20,
+                        "switchport": None, "status": "Online" if c % 5 else "Offline",
+                        "usage": {"sent": int(rng.uniform(1e5, 1e9)), "recv": int(rng.uniform(1e5, 1e9))},
+                    }
+                    clients.append(client)
+                    self.client_by_mac[mac] = (network_id, client)
+                self.clients_by_network[network_id] = clients
+
+            alerts = []
+            for a in range(config.alerts if devices else 0):
+                category, title, severity = _ALERT_TYPES[a % len(_ALERT_TYPES)]
+                device = devices[rng.randrange(len(devices))]
+                network = self.network_by_id[device["networkId"]]
+                started = self.started_at - rng.uniform(0, 14 * 86400)
+                resolved = started + rng.uniform(60, 86400) if a % 3 == 0 else None
+                alerts.append({
+                    "id": f"{org_index}{a:08d}", "categoryType": category,
+                    "network": {"id": network["id"], "name": network["name"]},
+                    "startedAt": _iso(started), "resolvedAt": _iso(resolved) if resolved else None,
+                    "dismissedAt": None, "deviceType": device["productType"],
+                    "type": title.lower().replace(" ", "_"), "title": title,
+                    "description": f"{title} on {device['name']}", "severity": severity,
+                    "scope": {"devices": [{k: device[k] for k in ("serial", "name", "productType", "mac", "url")}]},
+                })
+            alerts.sort(key=lambda alert: alert["startedAt"], reverse=True)
+            self.networks[org_id] = networks
+            self.devices[org_id] = devices
+            self.alerts[org_id] = alerts
+
+    # ==================== 服务 ====================
+
+    @property
+    def base_url(self) -> str:
+        """MerakiAPI(base_url=...) 使用的地址"""
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    def make_app(self) -> web.Application:
+        """创建 aiohttp 应用（可交给 aiohttp 测试工具或自行运行）"""
+        app = web.Application(middlewares=[self._middleware])
+        for path, handler in self._routes():
+            app.router.add_get(API_PREFIX + path, handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        启动服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0表示随机空闲端口）
+
+        Returns:
+            base_url
+        """
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.host = host
+        self.port = self._runner.addresses[0][1]
+        return self.base_url
+
+    async def stop(self):
+        """停止服务"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MerakiSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取请求统计
+
+        Returns:
+            Dict: requests / throttled / bytes 总数，以及 by_endpoint（端点模板 -> 同样三项计数）
+        """
+        totals = {"requests": 0, "throttled": 0, "bytes": 0}
+        for counts in self._counters.values():
+            for key in totals:
+                totals[key] += counts[key]
+        return {**totals, "by_endpoint": {k: dict(v) for k, v in sorted(self._counters.items())}}
+
+    def reset_stats(self):
+        """清空请求统计"""
+        self._counters.clear()
+
+    def _org_for(self, request: web.Request) -> Optional[str]:
+        info = request.match_info
+        if "org_id" in info:
+            return info["org_id"]
+        if "network_id" in info:
+            network = self.network_by_id.get(info["network_id"])
+            return network["organizationId"] if network else None
+        if "serial" in info:
+            device = self.device_by_serial.get(info["serial"])
+            return self.network_by_id[device["networkId"]]["organizationId"] if device else None
+        return None
+
+    def _take_token(self, org_id: str) -> float:
+        """令牌桶取一个令牌，返回需要等待的秒数（0表示放行）"""
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return 0.0
+        capacity = self.config.burst or rate
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(org_id, [capacity, now])
+        bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Callable) -> web.StreamResponse:
+        resource = request.match_info.route.resource
+        template = resource.canonical[len(API_PREFIX):] if resource is not None else request.path
+        counts = self._counters.setdefault(template, {"requests": 0, "throttled": 0, "bytes": 0})
+        counts["requests"] += 1
+
+        if not request.headers.get("X-Cisco-Meraki-API-Key"):
+            return web.json_response({"errors": ["Invalid API key"]}, status=401)
+        org_id = self._org_for(request)
+        if org_id is not None:
+            wait = self._take_token(org_id)
+            if wait > 0:
+                counts["throttled"] += 1
+                return web.json_response(
+                    {"errors": ["API rate limit exceeded for organization"]}, status=429,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))})
+
+        delay = self.config.latency_ms + (self._rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        try:
+            result = await handler(request)
+        except web.HTTPException as e:
+            return web.json_response({"errors": [e.text or e.reason]}, status=e.status)
+        if isinstance(result, web.StreamResponse):
+            response = result
+        elif isinstance(result, _Paged):
+            response = self._paginate(request, result)
+        else:
+            response = web.Response(body=json.dumps(result).encode(), content_type="application/json")
+        counts["bytes"] += response.content_length or 0
+        return response
+
+    def _paginate(self, request: web.Request, paged: _Paged) -> web.Response:
+        query = request.query
+        try:
+            per_page = min(max(1, int(query.get("perPage", paged.default_per_page))), paged.max_per_page)
+            offset = int(query.get("startingAfter", 0))
+        except ValueError:
+            raise web.HTTPBadRequest(text="Invalid perPage or startingAfter")
+        page = paged.items[offset:offset + per_page]
+        links = [self._link(request, per_page, None, "first")]
+        if offset + per_page < len(paged.items):
+            links.append(self._link(request, per_page, str(offset + per_page), "next"))
+        return web.Response(body=json.dumps(page).encode(), content_type="application/json",
+                            headers={"Link": ", ".join(links)})
+
+    @staticmethod
+    def _link(request: web.Request, per_page: int, starting_after: Optional[str], rel: str) -> str:
+        params = {k: v for k, v in request.query.items() if k not in ("perPage", "startingAfter", "endingBefore")}
+        params["perPage"] = per_page
+        if starting_after is not None:
+            params["startingAfter"] = starting_after
+        return f"<{request.url.with_query(None)}?{urlencode(params)}>; rel={rel}"
+
+    # ==================== 端点 ====================
+
+    def _routes(self) -> List[Tuple[str, Callable]]:
+        return [
+            ("/organizations", self._organizations),
+            ("/organizations/{org_id}/networks", self._org_networks),
+            ("/organizations/{org_id}/devices", self._org_devices),
+            ("/organizations/{org_id}/devices/statuses", self._org_device_statuses),
+            ("/organizations/{org_id}/devices/statuses/overview", self._org_device_statuses_overview),
+            ("/organizations/{org_id}/devices/uplinks/addresses/byDevice", self._org_uplink_addresses),
+            ("/organizations/{org_id}/inventory/devices", self._org_inventory),
+            ("/organizations/{org_id}/licenses", self._org_licenses),
+            ("/organizations/{org_id}/licenses/overview", self._org_licenses_overview),
+            ("/organizations/{org_id}/assurance/alerts", self._org_alerts),
+            ("/organizations/{org_id}/assurance/alerts/overview", self._org_alerts_overview),
+            ("/organizations/{org_id}/clients/search", self._org_clients_search),
+            ("/organizations/{org_id}/uplinks/statuses", self._org_uplinks_statuses),
+            ("/organizations/{org_id}/admins", self._org_admins),
+            ("/organizations/{org_id}/apiRequests/overview", self._org_api_requests_overview),
+            ("/organizations/{org_id}/configTemplates", self._empty_list),
+            ("/organizations/{org_id}/summary/top/appliances/byUtilization", self._top_appliances),
+            ("/organizations/{org_id}/summary/top/applications/byUsage", self._top_applications),
+            ("/organizations/{org_id}/summary/top/clients/byUsage", self._top_clients),
+            ("/organizations/{org_id}/summary/top/devices/byUsage", self._top_devices),
+            ("/organizations/{org_id}/summary/top/networks/byStatus", self._top_networks),
+            ("/networks/{network_id}/clients", self._network_clients),
+            ("/networks/{network_id}/clients/overview", self._network_clients_overview),
+            ("/networks/{network_id}/clients/usageHistories", self._network_clients_usage),
+            ("/networks/{network_id}/clients/applicationUsage", self._network_clients_app_usage),
+            ("/networks/{network_id}/clients/{client_id}", self._network_client),
+            ("/networks/{network_id}/devices", self._network_devices),
+            ("/networks/{network_id}/events", self._network_events),
+            ("/networks/{network_id}/floorPlans", self._network_floor_plans),
+            ("/networks/{network_id}/floorPlans/{floor_plan_id}", self._network_floor_plan),
+            ("/networks/{network_id}/traffic", self._network_traffic),
+            ("/networks/{network_id}/alerts/settings", self._network_alert_settings),
+            ("/networks/{network_id}/webhooks/httpServers", self._empty_list),
+            ("/networks/{network_id}/wireless/ssids", self._wireless_ssids),
+            ("/networks/{network_id}/wireless/settings", self._wireless_settings),
+            ("/networks/{network_id}/wireless/airMarshal", self._wireless_air_marshal),
+            ("/networks/{network_id}/wireless/clients/connectionStats", self._wireless_clients_connection_stats),
+            ("/networks/{network_id}/wireless/clients/{client_id}/connectionStats", self._wireless_client_connection_stats),
+            ("/networks/{network_id}/wireless/channelUtilizationHistory", self._wireless_channel_utilization),
+            ("/networks/{network_id}/wireless/clientCountHistory", self._wireless_client_count_history),
+            ("/networks/{network_id}/appliance/settings", self._appliance_settings),
+            ("/networks/{network_id}/appliance/vlans", self._appliance_vlans),
+            ("/networks/{network_id}/appliance/firewall/l3FirewallRules", self._appliance_l3_rules),
+            ("/networks/{network_id}/appliance/firewall/l7FirewallRules", self._appliance_l7_rules),
+            ("/networks/{network_id}/appliance/firewall/firewalledServices", self._appliance_firewalled_services),
+            ("/networks/{network_id}/appliance/contentFiltering", self._appliance_content_filtering),
+            ("/networks/{network_id}/appliance/contentFiltering/categories", self._appliance_content_categories),
+            ("/networks/{network_id}/appliance/connectivityMonitoringDestinations", self._appliance_monitoring),
+            ("/networks/{network_id}/switch/settings", self._switch_settings),
+            ("/networks/{network_id}/switch/accessControlLists", self._switch_acls),
+            ("/networks/{network_id}/switch/accessPolicies", self._empty_list),
+            ("/networks/{network_id}/switch/dhcpServerPolicy", self._switch_dhcp_policy),
+            ("/networks/{network_id}/switch/portSchedules", self._empty_list),
+            ("/networks/{network_id}/sensor/alerts/profiles", self._empty_list),
+            ("/networks/{network_id}/sensor/alerts/current/overview/byMetric", self._sensor_alerts_overview),
+            ("/networks/{network_id}/camera/qualityRetentionProfiles", self._camera_profiles),
+            ("/networks/{network_id}/camera/schedules", self._empty_list),
+            ("/devices/{serial}", self._device),
+            ("/devices/{serial}/clients", self._device_clients),
+            ("/devices/{serial}/lldpCdp", self._device_lldp_cdp),
+            ("/devices/{serial}/lossAndLatencyHistory", self._device_loss_latency),
+            ("/devices/{serial}/appliance/uplinks/settings", self._device_uplink_settings),
+            ("/devices/{serial}/appliance/performance", self._device_appliance_performance),
+            ("/devices/{serial}/switch/ports", self._device_switch_ports),
+        ]
+
+    def _org(self, request: web.Request) -> str:
+        org_id = request.match_info["org_id"]
+        if org_id not in self.networks:
+            raise web.HTTPNotFound(text="Organization not found")
+        return org_id
+
+    def _network(self, request: web.Request) -> Dict[str, Any]:
+        network = self.network_by_id.get(request.match_info["network_id"])
+        if network is None:
+            raise web.HTTPNotFound(text="Network not found")
+        return network
+
+    def _device_of(self, request: web.Request) -> Dict[str, Any]:
+        device = self.device_by_serial.get(request.match_info["serial"])
+        if device is None:
+            raise web.HTTPNotFound(text="Device not found")
+        return device
+
+    async def _empty_list(self, request: web.Request) -> Any:
+        return []
+
+    # ---------- 组织级 ----------
+
+    async def _organizations(self, request: web.Request) -> Any:
+        return _Paged(self.orgs, 9000, 9000)
+
+    async def _org_networks(self, request: web.Request) -> Any:
+        return _Paged(self.networks[self._org(request)], 1000, 100000)
+
+    async def _org_devices(self, request: web.Request) -> Any:
+        return _Paged(self.devices[self._org(request)], 1000, 1000)
+
+    def _status_record(self, device: Dict[str, Any]) -> Dict[str, Any]:
+        status = self.statuses[device["serial"]]
+        return {
+            "serial": device["serial"], "name": device["name"], "model": device["model"],
+            "mac": device["mac"], "networkId": device["networkId"], "productType": device["productType"],
+            "status": status, "lanIp": device["lanIp"],
+            "lastReportedAt": _iso(self.started_at - (0 if status == "online" else 7200)),
+        }
+
+    async def _org_device_statuses(self, request: web.Request) -> Any:
+        return _Paged([self._status_record(d) for d in self.devices[self._org(request)]], 1000, 1000)
+
+    async def _org_device_statuses_overview(self, request: web.Request) -> Any:
+        counts = {"online": 0, "alerting": 0, "offline": 0, "dormant": 0}
+        for device in self.devices[self._org(request)]:
+            counts[self.statuses[device["serial"]]] += 1
+        return {"counts": {"byStatus": counts}}
+
+    async def _org_uplink_addresses(self, request: web.Request) -> Any:
+        return _Paged([
+            {"serial": d["serial"], "mac": d["mac"], "network": {"id": d["networkId"]}, "productType": d["productType"],
+             "uplinks": [{"interface": "wan1", "addresses": [{"address": d["lanIp"], "protocol": "ipv4"}]}]}
+            for d in self.devices[self._org(request)] if d["productType"] == "appliance"
+        ], 1000, 1000)
+
+    async def _org_inventory(self, request: web.Request) -> Any:
+        return _Paged([
+            {"serial": d["serial"], "mac": d["mac"], "name": d["name"], "model": d["model"],
+             "networkId": d["networkId"], "productType": d["productType"], "orderNumber": "4C1234567",
+             "claimedAt": _iso(self.started_at - 365 * 86400), "licenseExpirationDate": None, "tags": d["tags"]}
+            for d in self.devices[self._org(request)]
+        ], 1000, 1000)
+
+    async def _org_licenses(self, request: web.Request) -> Any:
+        devices = self.devices[self._org(request)]
+        return _Paged([
+            {"id": f"lic{i:06d}", "licenseType": f"ENT-{d['model'][:2]}", "licenseKey": f"Z2XX-{i:04d}",
+             "orderNumber": "4C1234567", "deviceSerial": d["serial"], "networkId": d["networkId"],
+             "state": "active", "claimDate": _iso(self.started_at - 365 * 86400),
+             "expirationDate": _iso(self.started_at + 200 * 86400), "durationInDays": 1095}
+            for i, d in enumerate(devices)
+        ], 1000, 1000)
+
+    async def _org_licenses_overview(self, request: web.Request) -> Any:
+        counts: Dict[str, int] = {}
+        for device in self.devices[self._org(request)]:
+            counts[device["model"][:2]] = counts.get(device["model"][:2], 0) + 1
+        return {"status": "OK", "expirationDate": datetime.fromtimestamp(
+            self.started_at + 200 * 86400, timezone.utc).strftime("%b %d, %Y UTC"),
+            "licensedDeviceCounts": counts}
+
+    async def _org_alerts(self, request: web.Request) -> Any:
+        alerts = self.alerts[self._org(request)]
+        severity = request.query.get("severity")
+        if severity:
+            alerts = [alert for alert in alerts if alert["severity"] == severity]
+        return _Paged(alerts, 30, 300)
+
+    async def _org_alerts_overview(self, request: web.Request) -> Any:
+        by_severity: Dict[str, int] = {}
+        for alert in self.alerts[self._org(request)]:
+            by_severity[alert["severity"]] = by_severity.get(alert["severity"], 0) + 1
+        return {"counts": {"total": sum(by_severity.values()),
+                           "bySeverity": [{"type": k, "count": v} for k, v in sorted(by_severity.items())]}}
+
+    async def _org_clients_search(self, request: web.Request) -> Any:
+        org_id = self._org(request)
+        found = self.client_by_mac.get(request.query.get("mac", "").lower())
+        if found is None or self.network_by_id[found[0]]["organizationId"] != org_id:
+            raise web.HTTPNotFound(text="Client not found")
+        network_id, client = found
+        network = self.network_by_id[network_id]
+        return {
+            "mac": client["mac"], "clientId": client["id"], "manufacturer": client["manufacturer"],
+            "records": [{
+                "network": {"id": network_id, "name": network["name"], "organizationId": org_id},
+                "clientId": client["id"], "description": client["description"], "ip": client["ip"],
+                "ssid": client["ssid"], "vlan": client["vlan"], "status": client["status"],
+                "firstSeen": _iso(client["firstSeen"]), "lastSeen": _iso(client["lastSeen"]),
+                "recentDeviceSerial": client["recentDeviceSerial"], "recentDeviceName": client["recentDeviceName"],
+                "recentDeviceConnection": client["recentDeviceConnection"],
+            }],
+        }
+
+    async def _org_uplinks_statuses(self, request: web.Request) -> Any:
+        return _Paged([
+            {"serial": d["serial"], "model": d["model"], "networkId": d["networkId"],
+             "lastReportedAt": _iso(self.started_at),
+             "uplinks": [
+                 {"interface": "wan1", "status": "active", "ip": d["lanIp"], "publicIp": "203.0.113.10",
+                  "gateway": "203.0.113.1", "primaryDns": "114.114.114.114", "ipAssignedBy": "static"},
+                 {"interface": "wan2", "status": "ready", "ip": None, "publicIp": "198.51.100.10",
+                  "gateway": "198.51.100.1", "primaryDns": "223.5.5.5", "ipAssignedBy": "dhcp"},
+             ]}
+            for d in self.devices[self._org(request)] if d["productType"] == "appliance"
+        ], 1000, 1000)
+
+    async def _org_admins(self, request: web.Request) -> Any:
+        self._org(request)
+        return [{"id": "212406", "name": "Simulated Admin", "email": "admin@example.invalid",
+                 "orgAccess": "full", "accountStatus": "ok", "twoFactorAuthEnabled": True}]
+
+    async def _org_api_requests_overview(self, request: web.Request) -> Any:
+        self._org(request)
+        stats = self.stats()
+        return {"responseCodeCounts": {"200": stats["requests"] - stats["throttled"], "429": stats["throttled"]}}
+
+    def _top(self, request: web.Request, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self._org(request)
+        quantity = int(request.query.get("quantity", 10))
+        return items[:quantity]
+
+    async def _top_appliances(self, request: web.Request) -> Any:
+        appliances = [d for d in self.devices[self._org(request)] if d["productType"] == "appliance"]
+        return self._top(request, [
+            {"device": {"serial": d["serial"], "name": d["name"], "model": d["model"]},
+             "network": {"id": d["networkId"], "name": self.network_by_id[d["networkId"]]["name"]},
+             "utilization": {"average": {"percentage": round(_noise(d["serial"], "util") * 100, 1)}}}
+            for d in appliances])
+
+    async def _top_applications(self, request: web.Request) -> Any:
+        apps = ["WeChat", "Office 365", "Bilibili", "DingTalk", "Zoom", "Taobao", "Baidu", "iCloud",
+                "Windows Update", "QQ Music", "Douyin", "GitHub"]
+        return self._top(request, [
+            {"application": app, "total": 10 ** 9 // (i + 1), "downstream": 8 * 10 ** 8 // (i + 1),
+             "upstream": 2 * 10 ** 8 // (i + 1), "percentage": round(30.0 / (i + 1), 2)}
+            for i, app in enumerate(apps)])
+
+    async def _top_clients(self, request: web.Request) -> Any:
+        org_id = self._org(request)
+        clients = [(network["id"], client) for network in self.networks[org_id]
+                   for client in self.clients_by_network[network["id"]][:5]]
+        clients.sort(key=lambda item: -(item[1]["usage"]["sent"] + item[1]["usage"]["recv"]))
+        return self._top(request, [
+            {"id": c["id"], "name": c["description"], "mac": c["mac"],
+             "network": {"id": nid, "name": self.network_by_id[nid]["name"]},
+             "usage": {"sent": c["usage"]["sent"], "recv": c["usage"]["recv"],
+                       "total": c["usage"]["sent"] + c["usage"]["recv"], "percentage": 1.0}}
+            for nid, c in clients])
+
+    async def _top_devices(self, request: web.Request) -> Any:
+        devices = self.devices[self._org(request)]
+        return self._top(request, [
+            {"name": d["name"], "model": d["model"], "serial": d["serial"], "mac": d["mac"],
+             "productType": d["productType"], "network": {"id": d["networkId"]},
+             "usage": {"total": int(_noise(d["serial"], "usage") * 1e10), "percentage": 1.0},
+             "clients": {"counts": {"total": int(_noise(d["serial"], "clients") * 100)}}}
+            for d in sorted(devices, key=lambda d: -_noise(d["serial"], "usage"))])
+
+    async def _top_networks(self, request: web.Request) -> Any:
+        return _Paged([
+            {"networkId": n["id"], "name": n["name"], "productTypes": n["productTypes"],
+             "statuses": {"overall": "online"},
+             "clients": {"counts": {"total": len(self.clients_by_network[n["id"]])}}}
+            for n in self.networks[self._org(request)]
+        ], 1000, 5000)
+
+    # ---------- 网络级 ----------
+
+    async def _network_clients(self, request: web.Request) -> Any:
+        return _Paged(self.clients_by_network[self._network(request)["id"]], 10, 5000)
+
+    async def _network_clients_overview(self, request: web.Request) -> Any:
+        clients = self.clients_by_network[self._network(request)["id"]]
+        return {"counts": {"total": len(clients), "withHeavyUsage": len(clients) // 10},
+                "usages": {"average": 512.0, "withHeavyUsageAverage": 4096.0}}
+
+    async def _network_clients_usage(self, request: web.Request) -> Any:
+        clients = self.clients_by_network[self._network(request)["id"]]
+        return _Paged([
+            {"clientId": c["id"], "clientIp": c["ip"], "clientMac": c["mac"],
+             "usageHistory": [{"ts": _iso(self.started_at - 86400), "received": c["usage"]["recv"],
+                               "sent": c["usage"]["sent"]}]}
+            for c in clients], 100, 1000)
+
+    async def _network_clients_app_usage(self, request: web.Request) -> Any:
+        clients = self.clients_by_network[self._network(request)["id"]]
+        return _Paged([
+            {"clientId": c["id"], "clientIp": c["ip"], "clientMac": c["mac"],
+             "applicationUsage": [{"application": "WeChat", "received": c["usage"]["recv"] // 2,
+                                   "sent": c["usage"]["sent"] // 2}]}
+            for c in clients], 100, 1000)
+
+    async def _network_client(self, request: web.Request) -> Any:
+        network = self._network(request)
+        client_id = request.match_info["client_id"]
+        for client in self.clients_by_network[network["id"]]:
+            if client_id in (client["id"], client["mac"]):
+                return client
+        raise web.HTTPNotFound(text="Client not found")
+
+    async def _network_devices(self, request: web.Request) -> Any:
+        return self.devices_by_network[self._network(request)["id"]]
+
+    async def _network_events(self, request: web.Request) -> Any:
+        """网络事件：每个 (网络, productType) 事件流从 events_epoch 起每 event_interval_seconds 产生一个事件"""
+        network = self._network(request)
+        query = request.query
+        product_type = query.get("productType")
+        if product_type is None:
+            if len(network["productTypes"]) > 1:
+                raise web.HTTPBadRequest(text="productType is required for networks with multiple product types")
+            product_type = network["productTypes"][0]
+        if product_type not in network["productTypes"] or product_type not in _EVENT_TYPES:
+            return {"message": None, "pageStartAt": None, "pageEndAt": None, "events": []}
+        try:
+            per_page = min(max(3, int(query.get("perPage", 10))), 1000)
+        except ValueError:
+            raise web.HTTPBadRequest(text="Invalid perPage")
+
+        interval = self.config.event_interval_seconds
+        phase = _noise(network["id"], product_type) * interval
+        now = time.time()
+        last_index = math.floor((now - self.events_epoch - phase) / interval)
+        starting_after = _parse_time(query["startingAfter"]) if "startingAfter" in query else None
+        if starting_after is not None:
+            first_index = max(0, math.floor((starting_after - self.events_epoch - phase) / interval) + 1)
+        else:
+            # 未指定游标时返回最近的一页
+            first_index = max(0, last_index - per_page + 1)
+        indexes = range(first_index, min(last_index, first_index + per_page - 1) + 1)
+
+        devices = [d for d in self.devices_by_network[network["id"]] if d["productType"] == product_type] \
+            or self.devices_by_network[network["id"]]
+        clients = self.clients_by_network[network["id"]]
+        types = _EVENT_TYPES[product_type]
+        events = []
+        for k in indexes:
+            device = devices[k % len(devices)] if devices else {}
+            client = clients[k % len(clients)] if clients else {}
+            event_type = types[k % len(types)]
+            events.append({
+                "occurredAt": _iso(self.events_epoch + phase + k * interval),
+                "networkId": network["id"], "type": event_type,
+                "description": event_type.replace("_", " ").capitalize(), "category": product_type,
+                "clientId": client.get("id"), "clientDescription": client.get("description"),
+                "clientMac": client.get("mac"), "deviceSerial": device.get("serial"),
+                "deviceName": device.get("name"), "ssidNumber": 0 if product_type == "wireless" else None,
+                "eventData": {"radio": "1", "channel": "36"} if product_type == "wireless" else {},
+            })
+
+        headers = {}
+        if events and indexes[-1] < last_index:
+            headers["Link"] = self._link(request, per_page, events[-1]["occurredAt"], "next")
+        body = {"message": None,
+                "pageStartAt": events[0]["occurredAt"] if events else None,
+                "pageEndAt": events[-1]["occurredAt"] if events else None,
+                "events": events}
+        return web.Response(body=json.dumps(body).encode(), content_type="application/json", headers=headers)
+
+    async def _network_floor_plans(self, request: web.Request) -> Any:
+        return self.floor_plans[self._network(request)["id"]]
+
+    async def _network_floor_plan(self, request: web.Request) -> Any:
+        floor_plan_id = request.match_info["floor_plan_id"]
+        for floor in self.floor_plans[self._network(request)["id"]]:
+            if floor["floorPlanId"] == floor_plan_id:
+                return floor
+        raise web.HTTPNotFound(text="Floor plan not found")
+
+    async def _network_traffic(self, request: web.Request) -> Any:
+        self._network(request)
+        return [{"application": "WeChat", "destination": None, "protocol": "TCP", "port": 443,
+                 "sent": 123456, "recv": 654321, "numClients": 12, "activeTime": 3600, "flows": 420}]
+
+    async def _network_alert_settings(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"defaultDestinations": {"emails": ["noc@example.invalid"], "allAdmins": False, "snmp": False},
+                "alerts": [{"type": "gatewayDown", "enabled": True, "alertDestinations": {}, "filters": {"timeout": 60}}]}
+
+    async def _wireless_ssids(self, request: web.Request) -> Any:
+        self._network(request)
+        return [
+            {"number": i, "name": name, "enabled": i < 2, "splashPage": "None",
+             "authMode": "8021x-radius" if i == 0 else ("psk" if i == 1 else "open"),
+             "encryptionMode": "wpa" if i < 2 else None, "wpaEncryptionMode": "WPA2 only" if i < 2 else None,
+             "ipAssignmentMode": "Bridge mode", "visible": True, "availableOnAllAps": True}
+            for i, name in enumerate(["Corp", "Guest"] + [f"Unconfigured SSID {i}" for i in range(3, 16)])
+        ]
+
+    async def _wireless_settings(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"meshingEnabled": False, "ipv6BridgeEnabled": False, "locationAnalyticsEnabled": True,
+                "upgradeStrategy": "minimizeUpgradeTime", "ledLightsOn": True}
+
+    async def _wireless_air_marshal(self, request: web.Request) -> Any:
+        self._network(request)
+        return [{"ssid": "FreeWiFi", "bssids": [{"bssid": "00:11:22:33:44:55", "contained": False,
+                                                "detectedBy": [{"device": "Q2XX", "rssi": -70}]}],
+                 "channels": [6], "firstSeen": int(self.started_at - 3600), "lastSeen": int(self.started_at),
+                 "wiredMacs": [], "wiredVlans": [], "wiredLastSeen": None}]
+
+    def _connection_stats(self, key: str) -> Dict[str, int]:
+        failures = int(_noise(key, "fail") * 4)
+        return {"assoc": failures % 2, "auth": failures // 2, "dhcp": 0, "dns": 0,
+                "success": 50 + int(_noise(key, "ok") * 200)}
+
+    async def _wireless_clients_connection_stats(self, request: web.Request) -> Any:
+        clients = self.clients_by_network[self._network(request)["id"]]
+        return [{"mac": c["mac"], "connectionStats": self._connection_stats(c["mac"])} for c in clients]
+
+    async def _wireless_client_connection_stats(self, request: web.Request) -> Any:
+        network = self._network(request)
+        client_id = request.match_info["client_id"]
+        for client in self.clients_by_network[network["id"]]:
+            if client_id in (client["id"], client["mac"]):
+                return {"mac": client["mac"], "connectionStats": self._connection_stats(client["mac"])}
+        raise web.HTTPNotFound(text="Client not found")
+
+    def _history(self, request: web.Request, make: Callable[[float, float], Dict[str, Any]]) -> Any:
+        resolution = int(request.query.get("resolution", 3600))
+        timespan = float(request.query.get("timespan", 86400))
+        end = math.floor(time.time() / resolution) * resolution
+        return _Paged([make(ts, ts + resolution) for ts in range(int(end - timespan), int(end), resolution)],
+                      1000, 1000)
+
+    async def _wireless_channel_utilization(self, request: web.Request) -> Any:
+        network_id = self._network(request)["id"]
+        return self._history(request, lambda start, end: {
+            "startTs": _iso(start), "endTs": _iso(end),
+            "utilizationTotal": round(_noise(network_id, start) * 60, 2),
+            "utilization80211": round(_noise(network_id, start, "w") * 40, 2),
+            "utilizationNon80211": round(_noise(network_id, start, "n") * 10, 2)})
+
+    async def _wireless_client_count_history(self, request: web.Request) -> Any:
+        network_id = self._network(request)["id"]
+        total = len(self.clients_by_network[network_id])
+        return self._history(request, lambda start, end: {
+            "startTs": _iso(start), "endTs": _iso(end),
+            "clientCount": int(total * (0.3 + 0.7 * _noise(network_id, start)))})
+
+    async def _appliance_settings(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"clientTrackingMethod": "MAC address", "deploymentMode": "routed",
+                "dynamicDns": {"enabled": True, "prefix": "sim", "url": "sim.dynamic-m.com"}}
+
+    async def _appliance_vlans(self, request: web.Request) -> Any:
+        self._network(request)
+        return [{"id": vlan, "networkId": request.match_info["network_id"], "name": name,
+                 "applianceIp": f"10.{vlan}.0.1", "subnet": f"10.{vlan}.0.0/24", "dhcpHandling": "Run a DHCP server"}
+                for vlan, name in ((10, "Corp"), (20, "Guest"), (30, "IoT"))]
+
+    async def _appliance_l3_rules(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"rules": [
+            {"comment": "Block guest to corp", "policy": "deny", "protocol": "any", "srcPort": "Any",
+             "srcCidr": "10.20.0.0/24", "destPort": "Any", "destCidr": "10.10.0.0/24", "syslogEnabled": False},
+            {"comment": "Default rule", "policy": "allow", "protocol": "Any", "srcPort": "Any",
+             "srcCidr": "Any", "destPort": "Any", "destCidr": "Any", "syslogEnabled": False},
+        ]}
+
+    async def _appliance_l7_rules(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"rules": [{"policy": "deny", "type": "applicationCategory",
+                           "value": {"id": "meraki:layer7/category/2", "name": "Peer-to-peer (P2P)"}}]}
+
+    async def _appliance_firewalled_services(self, request: web.Request) -> Any:
+        self._network(request)
+        return [{"service": service, "access": "restricted" if service != "web" else "blocked",
+                 "allowedIps": ["10.10.0.0/24"]} for service in ("ICMP", "web", "SNMP")]
+
+    async def _appliance_content_filtering(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"allowedUrlPatterns": [], "blockedUrlPatterns": ["example.invalid"],
+                "blockedUrlCategories": [{"id": "meraki:contentFiltering/category/1", "name": "Real Estate"}],
+                "urlCategoryListSize": "topSites"}
+
+    async def _appliance_content_categories(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"categories": [{"id": "meraki:contentFiltering/category/1", "name": "Real Estate"},
+                               {"id": "meraki:contentFiltering/category/7", "name": "Gambling"}]}
+
+    async def _appliance_monitoring(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"destinations": [{"ip": "8.8.8.8", "description": "Google", "default": True}]}
+
+    async def _switch_settings(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"vlan": 1, "useCombinedPower": False, "powerExceptions": []}
+
+    async def _switch_acls(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"rules": [{"comment": "Deny SSH", "policy": "deny", "ipVersion": "ipv4", "protocol": "tcp",
+                           "srcCidr": "10.20.0.0/24", "srcPort": "any", "dstCidr": "any", "dstPort": "22",
+                           "vlan": "any"}]}
+
+    async def _switch_dhcp_policy(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"defaultPolicy": "block", "allowedServers": ["10.10.0.1"], "blockedServers": [],
+                "arpInspection": {"enabled": False}}
+
+    async def _sensor_alerts_overview(self, request: web.Request) -> Any:
+        self._network(request)
+        return {"counts": {"temperature": 1, "humidity": 0, "door": 0, "water": 0, "noise": {"ambient": 0}}}
+
+    async def _camera_profiles(self, request: web.Request) -> Any:
+        self._network(request)
+        return [{"id": "1", "name": "Default", "networkId": request.match_info["network_id"],
+                 "motionBasedRetentionEnabled": True, "restrictedBandwidthModeEnabled": False,
+                 "maxRetentionDays": 30, "videoSettings": {"MV12/MV22/MV72": {"quality": "High",
+                                                                              "resolution": "1920x1080"}}}]
+
+    # ---------- 设备级 ----------
+
+    async def _device(self, request: web.Request) -> Any:
+        return self._device_of(request)
+
+    async def _device_clients(self, request: web.Request) -> Any:
+        device = self._device_of(request)
+        return [
+            {"id": c["id"], "mac": c["mac"], "description": c["description"], "ip": c["ip"], "user": c["user"],
+             "vlan": c["vlan"], "usage": c["usage"], "dhcpHostname": c["description"]}
+            for c in self.clients_by_network[device["networkId"]] if c["recentDeviceSerial"] == device["serial"]
+        ]
+
+    async def _device_lldp_cdp(self, request: web.Request) -> Any:
+        device = self._device_of(request)
+        return {"sourceMac": device["mac"], "ports": {
+            "1": {"lldp": {"systemName": "core-switch", "portId": "Gi1/0/1", "managementAddress": "10.0.0.1"}}}}
+
+    async def _device_loss_latency(self, request: web.Request) -> Any:
+        """丢包/延迟历史：每个 resolution 一个样本，按设备、上行链路和时间确定性生成"""
+        device = self._device_of(request)
+        query = request.query
+        now = time.time()
+        resolution = int(query.get("resolution", 60))
+        t1 = _parse_time(query["t1"]) if "t1" in query else now
+        if "t0" in query:
+            t0 = _parse_time(query["t0"])
+        else:
+            t0 = t1 - float(query.get("timespan", 86400))
+        if t0 is None or t1 is None or t1 - t0 > 31 * 86400:
+            raise web.HTTPBadRequest(text="Invalid t0/t1 (the maximum span is 31 days)")
+        uplink = query.get("uplink", "wan1")
+        key = (device["serial"], uplink, query.get("ip", "8.8.8.8"))
+        samples = []
+        start = math.ceil(t0 / resolution) * resolution
+        for ts in range(int(start), int(min(t1, now)) - resolution + 1, resolution):
+            noise = _noise(*key, ts)
+            samples.append({
+                "startTs": _iso(ts), "endTs": _iso(ts + resolution),
+                "lossPercent": round(noise * 20, 1) if noise > 0.97 else 0.0,
+                "latencyMs": round(18 + noise * 25, 1), "goodput": 1000, "jitter": round(noise * 5, 2),
+            })
+        return samples
+
+    async def _device_uplink_settings(self, request: web.Request) -> Any:
+        self._device_of(request)
+        return {"interfaces": {
+            "wan1": {"enabled": True, "vlanTagging": {"enabled": False}, "svis": {"ipv4": {"assignmentMode": "static"}}},
+            "wan2": {"enabled": True, "vlanTagging": {"enabled": False}, "svis": {"ipv4": {"assignmentMode": "dynamic"}}},
+        }}
+
+    async def _device_appliance_performance(self, request: web.Request) -> Any:
+        device = self._device_of(request)
+        return {"perfScore": int(_noise(device["serial"], "perf") * 100)}
+
+    async def _device_switch_ports(self, request: web.Request) -> Any:
+        device = self._device_of(request)
+        if device["productType"] != "switch":
+            return []
+        return [{"portId": str(p), "name": None, "enabled": True, "poeEnabled": True, "type": "access",
+                 "vlan": 10 if p % 2 else 20, "voiceVlan": None, "allowedVlans": "all", "isolationEnabled": False,
+                 "rstpEnabled": True, "stpGuard": "disabled", "linkNegotiation": "Auto negotiate",
+                 "accessPolicyType": "Open"} for p in range(1, 49)]
+
+
+async def _serve(config: SimulatorConfig, host: str, port: int):
+    simulator = MerakiSimulator(config)
+    base_url = await simulator.start(host, port)
+    devices = sum(len(devices) for devices in simulator.devices.values())
+    clients = sum(len(clients) for clients in simulator.clients_by_network.values())
+    print(f"Meraki API 模拟服务已启动: {base_url}")
+    print(f"组织: {len(simulator.orgs)}  网络: {len(simulator.network_by_id)}  设备: {devices}  客户端: {clients}")
+    print(f"限速: {config.rate_limit} rps/组织  延迟: {config.latency_ms}ms + 0~{config.jitter_ms}ms")
+    print(f"使用方法: MERAKI_BASE_URL={base_url} python worker.py")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="本地 Meraki Dashboard API 模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--organizations", type=int, default=1)
+    parser.add_argument("--networks", type=int, default=10, help="每个组织的网络数")
+    parser.add_argument("--devices-per-network", type=int, default=20)
+    parser.add_argument("--clients-per-network", type=int, default=50)
+    parser.add_argument("--alerts", type=int, default=200, help="每个组织的保障告警数")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="每个组织每秒请求数，0表示不限速")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    config = SimulatorConfig(
+        organizations=args.organizations, networks=args.networks,
+        devices_per_network=args.devices_per_network, clients_per_network=args.clients_per_network,
+        alerts=args.alerts, rate_limit=args.rate_limit, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, seed=args.seed)
+    try:
+        asyncio.run(_serve(config, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
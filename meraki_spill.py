@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分页结果本地落盘存储（Spill Store）
+
+大型组织的设备/客户端列表不适合作为单个 Temporal payload 返回。
+分页 Activity 将每一页写入本地目录，只向 Workflow 返回一个小的句柄（handle），
+Workflow 再通过 read_spill_page Activity 按页读取。
+
+目录结构:
+    {root}/{spill_id}/manifest.json
+    {root}/{spill_id}/page-00000.json
+    ...
+
+存储根目录可通过环境变量 MERAKI_SPILL_DIR 指定（默认为系统临时目录下的 meraki_spill）。
+Workflow 读取完毕后调用 delete_spill 删除；Workflow 失败或被取消而遗留的 spill，
+由 worker.py 定期调用 cleanup() 删除超过 MERAKI_SPILL_MAX_AGE 秒（默认 1 天）未修改的目录。
+
+页面只存在于写入它的主机上。多台Worker主机部署时，worker.py 为每台主机启动一个
+专用任务队列（MERAKI_SPILL_TASK_QUEUE，默认 "<任务队列>-spill-<主机名>"），句柄中的 task_queue
+即该队列，Workflow 必须把 read_spill_page / delete_spill 调度到这个队列；也可以把
+MERAKI_SPILL_DIR 指向所有Worker都能访问的共享存储。两者都不满足时只能部署单个Worker主机。
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_SPILL_DIR = os.path.join(tempfile.gettempdir(), "meraki_spill")
+DEFAULT_SPILL_MAX_AGE = 86400
+
+
+class SpillStore:
+    """按页落盘的本地存储"""
+
+    def __init__(self, root: Optional[str] = None, max_age_seconds: Optional[float] = None):
+        """
+        Args:
+            root: 存储根目录（为None时读取 MERAKI_SPILL_DIR 环境变量）
+            max_age_seconds: cleanup() 删除多久未修改的 spill（为None时读取 MERAKI_SPILL_MAX_AGE 环境变量）
+        """
+        self.root = root or os.getenv("MERAKI_SPILL_DIR", DEFAULT_SPILL_DIR)
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else float(
+            os.getenv("MERAKI_SPILL_MAX_AGE", DEFAULT_SPILL_MAX_AGE))
+
+    @staticmethod
+    def make_spill_id(*parts: str) -> str:
+        """由 workflow_id、activity_id 等组成稳定的、可作为目录名的 spill_id"""
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", "-".join(p for p in parts if p))
+
+    def _dir(self, spill_id: str) -> str:
+        if not spill_id or spill_id != self.make_spill_id(spill_id):
+            raise ValueError(f"非法的 spill_id: {spill_id!r}")
+        return os.path.join(self.root, spill_id)
+
+    def _write_json(self, path: str, data: Any):
+        # 先写临时文件再原子替换，避免重试时读到半页数据
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def write_page(self, spill_id: str, index: int, items: List[Dict]):
+        """写入一页数据（同一页重复写入会覆盖）"""
+        directory = self._dir(spill_id)
+        os.makedirs(directory, exist_ok=True)
+        self._write_json(os.path.join(directory, f"page-{index:05d}.json"), items)
+
+    def read_page(self, spill_id: str, index: int) -> List[Dict]:
+        """
+        读取一页数据
+
+        Raises:
+            FileNotFoundError: 页面不存在时
+        """
+        with open(os.path.join(self._dir(spill_id), f"page-{index:05d}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def has_pages(self, spill_id: str, pages: int) -> bool:
+        """前 pages 页是否都存在于本机存储中"""
+        directory = self._dir(spill_id)
+        return all(os.path.exists(os.path.join(directory, f"page-{i:05d}.json")) for i in range(pages))
+
+    def write_manifest(self, spill_id: str, pages: int, items: int, complete: bool) -> Dict[str, Any]:
+        """
+        写入并返回句柄
+
+        Returns:
+            Dict: 句柄，包含 spill_id、pages（页数）、items（条目总数）、complete（是否已全部写入）
+        """
+        handle = {"spill_id": spill_id, "pages": pages, "items": items, "complete": complete}
+        directory = self._dir(spill_id)
+        os.makedirs(directory, exist_ok=True)
+        self._write_json(os.path.join(directory, "manifest.json"), handle)
+        return handle
+
+    def delete(self, spill_id: str):
+        """删除一个 spill 的所有页面"""
+        shutil.rmtree(self._dir(spill_id), ignore_errors=True)
+
+    def cleanup(self, max_age_seconds: Optional[float] = None) -> int:
+        """
+        清理超过指定时间未修改的 spill（Workflow 未调用 delete_spill 而遗留的页面）
+
+        Args:
+            max_age_seconds: 未修改的秒数（为None时使用 self.max_age_seconds）
+
+        Returns:
+            int: 删除的 spill 数量
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        cutoff = time.time() - (self.max_age_seconds if max_age_seconds is None else max_age_seconds)
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
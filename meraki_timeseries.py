@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上行链路丢包/延迟时间序列存储
+
+TroubleshootingWorkflow 每次诊断都重新拉取 lossAndLatencyHistory，且只能展示最近的
+少量数据点。TimeSeriesStore 在 Worker 本地按 (设备序列号, 上行链路, 目标IP) 保存样本，
+由 collect_loss_and_latency Activity 定期增量采集：
+
+- 列式存储: 时间戳、丢包率、延迟分别保存在 array 中，每个样本 12 字节
+- 时间戳按差值编码（相邻样本的秒数差），每 256 个样本保存一个绝对时间检查点，
+  按时间范围查询时二分定位检查点，不必从头解码
+- 查询时按桶降采样（平均丢包率、平均/最大延迟），返回点数与时间范围无关
+- 超过保留期的样本在采集时裁剪，整个序列写入单个二进制文件（先写临时文件再原子替换）；
+  文件名由百分号编码的序列号、上行链路、目标IP以 "@" 连接而成，IPv6 地址也能无损还原
+
+存储参数可通过环境变量调整：
+- MERAKI_TIMESERIES_DIR: 存储目录（默认为系统临时目录下的 meraki_timeseries）
+- MERAKI_TIMESERIES_RETENTION: 样本保留秒数（默认 14 天）
+"""
+
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from urllib.parse import quote, unquote
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_TIMESERIES_DIR = os.path.join(tempfile.gettempdir(), "meraki_timeseries")
+DEFAULT_RETENTION_SECONDS = 14 * 86400
+DEFAULT_MAX_POINTS = 200
+
+_CHECKPOINT_EVERY = 256
+_FORMAT_VERSION = 1
+# 文件名中各部分的分隔符（百分号编码会转义该字符，因此不会出现在各部分中）
+_NAME_SEPARATOR = "@"
+
+SeriesKey = Tuple[str, str, str]  # (serial, uplink, ip)
+
+
+def parse_timestamp(value: Any) -> Optional[int]:
+    """ISO 8601 字符串或Unix时间戳 -> 整数秒"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+class Series:
+    """单个序列的列式存储：差值编码的时间戳 + 丢包率 + 延迟"""
+
+    __slots__ = ("last", "deltas", "loss", "latency", "checkpoints", "dirty")
+
+    def __init__(self):
+        self.last: Optional[int] = None
+        self.deltas = array("I")  # 与上一个样本的秒数差，第一个样本为0
+        self.loss = array("f")
+        self.latency = array("f")
+        self.checkpoints = array("q")  # 第 k*256 个样本的绝对时间戳
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    def append(self, ts: int, loss: float, latency: float) -> bool:
+        """追加一个样本，时间戳不晚于最后一个样本时忽略（重复采集的重叠部分）"""
+        if self.last is not None and ts <= self.last:
+            return False
+        if len(self.deltas) % _CHECKPOINT_EVERY == 0:
+            self.checkpoints.append(ts)
+        self.deltas.append(0 if self.last is None else ts - self.last)
+        self.loss.append(loss)
+        self.latency.append(latency)
+        self.last = ts
+        self.dirty = True
+        return True
+
+    def iter_range(self, start: int, end: int, from_index: int = 0) -> Iterator[Tuple[int, int]]:
+        """按时间范围 [start, end] 产出 (样本下标, 时间戳)"""
+        count = len(self.deltas)
+        if not count or self.last < start:
+            return
+        block = max(0, bisect_right(self.checkpoints, start) - 1, from_index // _CHECKPOINT_EVERY)
+        index = block * _CHECKPOINT_EVERY
+        ts = self.checkpoints[block]
+        deltas = self.deltas
+        while True:
+            if ts > end:
+                return
+            if ts >= start:
+                yield index, ts
+            index += 1
+            if index >= count:
+                return
+            ts += deltas[index]
+
+    def truncate_before(self, cutoff: int) -> int:
+        """删除早于 cutoff 的样本，返回删除数量"""
+        first = next((index for index, _ in self.iter_range(cutoff, self.last or cutoff)), len(self.deltas))
+        if first == 0:
+            return 0
+        kept = [(ts, self.loss[i], self.latency[i])
+                for i, ts in self.iter_range(cutoff, self.last, first)] if first < len(self.deltas) else []
+        self.__init__()
+        for ts, loss, latency in kept:
+            self.append(ts, loss, latency)
+        self.dirty = True
+        return first
+
+    # ==================== 序列化 ====================
+
+    def to_bytes(self) -> bytes:
+        header = {"version": _FORMAT_VERSION, "count": len(self.deltas),
+                  "first": self.checkpoints[0] if self.checkpoints else None}
+        return (json.dumps(header).encode("utf-8") + b"\n"
+                + self.deltas.tobytes() + self.loss.tobytes() + self.latency.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Series":
+        newline = data.index(b"\n")
+        header = json.loads(data[:newline])
+        if header.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"不支持的时间序列文件版本: {header.get('version')}")
+        count = header["count"]
+        columns = []
+        offset = newline + 1
+        for typecode in ("I", "f", "f"):
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(data[offset:offset + size])
+            offset += size
+            columns.append(column)
+        series = cls()
+        series.deltas, series.loss, series.latency = columns
+        ts = header["first"]
+        for index in range(count):
+            if index:
+                ts += series.deltas[index]
+            if index % _CHECKPOINT_EVERY == 0:
+                series.checkpoints.append(ts)
+        series.last = ts if count else None
+        return series
+
+
+class TimeSeriesStore:
+    """按 (设备序列号, 上行链路, 目标IP) 保存丢包/延迟样本的本地存储"""
+
+    def __init__(self, root: Optional[str] = None, retention_seconds: Optional[float] = None):
+        """
+        Args:
+            root: 存储目录（为None时读取 MERAKI_TIMESERIES_DIR）
+            retention_seconds: 样本保留秒数（为None时读取 MERAKI_TIMESERIES_RETENTION）
+        """
+        self.root = root or os.getenv("MERAKI_TIMESERIES_DIR", DEFAULT_TIMESERIES_DIR)
+        self.retention_seconds = retention_seconds if retention_seconds is not None else float(
+            os.getenv("MERAKI_TIMESERIES_RETENTION", DEFAULT_RETENTION_SECONDS))
+        self._series: Optional[Dict[SeriesKey, Series]] = None
+        # 旧版文件名（"__" 连接、非法字符替换为 "_"）-> 序列，下次 flush 时改用新文件名
+        self._legacy_files: Dict[SeriesKey, str] = {}
+        # 采集与查询可能分别在事件循环和线程池中执行
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_name(key: SeriesKey) -> str:
+        return _NAME_SEPARATOR.join(quote(part, safe="") for part in key) + ".ts"
+
+    @staticmethod
+    def _parse_file_name(name: str) -> Optional[Tuple[SeriesKey, bool]]:
+        """
+        文件名 -> (序列键, 是否为旧版文件名)，无法识别时返回None
+
+        旧版文件名把非 [A-Za-z0-9_.-] 的字符替换为 "_" 后以 "__" 连接，IPv6 地址等无法还原；
+        只有各部分都不含 "_"（即未发生替换）的旧版文件才会被读取。
+        """
+        stem = name[:-3]
+        if _NAME_SEPARATOR in stem:
+            parts = stem.split(_NAME_SEPARATOR)
+            return (tuple(unquote(part) for part in parts), False) if len(parts) == 3 else None
+        parts = stem.split("__")
+        if len(parts) != 3 or not all(re.fullmatch(r"[A-Za-z0-9.-]+", part) for part in parts):
+            return None
+        return tuple(parts), True
+
+    def _loaded(self) -> Dict[SeriesKey, Series]:
+        # 首次使用时才读取目录，MerakiActivities() 在Workflow中构造时不做I/O
+        if self._series is None:
+            series: Dict[SeriesKey, Series] = {}
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    if not name.endswith(".ts"):
+                        continue
+                    parsed = self._parse_file_name(name)
+                    if parsed is None:
+                        continue
+                    key, legacy = parsed
+                    if legacy and key in series:
+                        continue
+                    with open(os.path.join(self.root, name), "rb") as f:
+                        series[key] = Series.from_bytes(f.read())
+                    if legacy:
+                        series[key].dirty = True
+                        self._legacy_files[key] = name
+                    else:
+                        self._legacy_files.pop(key, None)
+            self._series = series
+        return self._series
+
+    # ==================== 写入 ====================
+
+    def append(self, serial: str, uplink: str, ip: str, samples: Iterable[Dict[str, Any]]) -> int:
+        """
+        追加 lossAndLatencyHistory 返回的样本（按 startTs 去重，只接受比已有样本更新的）
+
+        Returns:
+            新增的样本数
+        """
+        parsed = sorted(
+            (ts, _number(sample.get("lossPercent")), _number(sample.get("latencyMs")))
+            for sample in samples if isinstance(sample, dict)
+            for ts in [parse_timestamp(sample.get("startTs"))] if ts is not None
+        )
+        with self._lock:
+            series = self._loaded().setdefault((serial, uplink, ip), Series())
+            return sum(series.append(ts, loss, latency) for ts, loss, latency in parsed)
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """删除超过保留期的样本，返回删除数量"""
+        cutoff = int((now if now is not None else time.time()) - self.retention_seconds)
+        with self._lock:
+            return sum(series.truncate_before(cutoff) for series in self._loaded().values())
+
+    def flush(self) -> int:
+        """把有变化的序列写入磁盘，返回写入的序列数"""
+        written = 0
+        with self._lock:
+            series_map = self._loaded()
+            dirty = [(key, series) for key, series in series_map.items() if series.dirty]
+            if dirty:
+                os.makedirs(self.root, exist_ok=True)
+            for key, series in dirty:
+                path = os.path.join(self.root, self._file_name(key))
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(series.to_bytes())
+                os.replace(tmp_path, path)
+                series.dirty = False
+                written += 1
+                legacy_name = self._legacy_files.pop(key, None)
+                if legacy_name is not None:
+                    try:
+                        os.remove(os.path.join(self.root, legacy_name))
+                    except FileNotFoundError:
+                        pass
+        return written
+
+    # ==================== 查询 ====================
+
+    def last_timestamp(self, serial: str, uplink: str, ip: str) -> Optional[int]:
+        """序列最后一个样本的时间戳，序列不存在时返回None"""
+        with self._lock:
+            series = self._loaded().get((serial, uplink, ip))
+            return series.last if series is not None else None
+
+    def series_keys(self, serial: Optional[str] = None) -> List[SeriesKey]:
+        """列出已保存的序列 (serial, uplink, ip)"""
+        with self._lock:
+            return sorted(key for key in self._loaded() if serial is None or key[0] == serial)
+
+    def query(self, serial: str, start: float, end: float, uplink: Optional[str] = None,
+              ip: Optional[str] = None, max_points: int = DEFAULT_MAX_POINTS) -> List[Dict[str, Any]]:
+        """
+        按时间范围查询并降采样
+
+        Args:
+            serial: 设备序列号
+            start / end: 时间范围（Unix时间戳，闭区间）
+            uplink: 只查询此上行链路（如 wan1），None表示全部
+            ip: 只查询此目标IP，None表示全部
+            max_points: 每个序列最多返回的点数
+
+        Returns:
+            List[Dict]: 时间范围内有样本的每个序列一项，列式返回:
+                - uplink / ip (str)
+                - bucket_seconds (int): 降采样桶宽
+                - ts (List[int]): 桶起始时间
+                - loss_percent (List[float]): 平均丢包率
+                - latency_ms / latency_max_ms (List[float]): 平均/最大延迟
+                - samples (List[int]): 桶内样本数
+        """
+        start, end = int(start), int(end)
+        bucket = max(1, math.ceil((end - start + 1) / max(1, max_points)))
+        results = []
+        with self._lock:
+            for key, series in sorted(self._loaded().items()):
+                if key[0] != serial or (uplink and key[1] != uplink) or (ip and key[2] != ip):
+                    continue
+                # 桶 -> [样本数, 丢包率之和, 丢包率样本数, 延迟之和, 延迟样本数, 最大延迟]
+                buckets: Dict[int, List[float]] = {}
+                for index, ts in series.iter_range(start, end):
+                    acc = buckets.get((ts - start) // bucket)
+                    if acc is None:
+                        acc = buckets[(ts - start) // bucket] = [0, 0.0, 0, 0.0, 0, -math.inf]
+                    acc[0] += 1
+                    loss, latency = series.loss[index], series.latency[index]
+                    if not math.isnan(loss):
+                        acc[1] += loss
+                        acc[2] += 1
+                    if not math.isnan(latency):
+                        acc[3] += latency
+                        acc[4] += 1
+                        acc[5] = max(acc[5], latency)
+                if not buckets:
+                    # 时间范围内没有样本的序列不返回，调用方据此判断是否需要先采集
+                    continue
+                ordered = sorted(buckets.items())
+                results.append({
+                    "uplink": key[1],
+                    "ip": key[2],
+                    "bucket_seconds": bucket,
+                    "ts": [start + b * bucket for b, _ in ordered],
+                    "loss_percent": [round(acc[1] / acc[2], 3) if acc[2] else None for _, acc in ordered],
+                    "latency_ms": [round(acc[3] / acc[4], 2) if acc[4] else None for _, acc in ordered],
+                    "latency_max_ms": [round(acc[5], 2) if acc[4] else None for _, acc in ordered],
+                    "samples": [acc[0] for _, acc in ordered],
+                })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """获取存储统计信息（序列数、样本数、内存中的列数据字节数）"""
+        with self._lock:
+            series_map = self._loaded()
+            samples = sum(len(series) for series in series_map.values())
+            return {
+                "root": self.root,
+                "series": len(series_map),
+                "samples": samples,
+                "bytes": sum(len(s.deltas) * (s.deltas.itemsize + s.loss.itemsize + s.latency.itemsize)
+                             for s in series_map.values()),
+                "retention_seconds": self.retention_seconds,
+            }
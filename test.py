@@ -6,17 +6,21 @@
 一次性测试所有场景并输出完整的ECharts数据
 
 用法：
-  python test.py [org_id]
+  python test.py [org_id] [--concurrent] [--copies N] [--concurrency N]
 
 示例：
   python test.py 850617379619606726
   python test.py  # 使用默认org_id
+  python test.py --concurrent  # 同时提交全部14个工作流，报告每个工作流和总墙钟时间
+  python test.py --copies 5 --concurrency 20  # 每个工作流5份，最多20个同时执行
 
 注意：API Key 由 merakiAPI.py 自动从环境变量读取
 """
 
+import argparse
 import asyncio
 import sys
+import time
 import json
 import uuid
 import os
@@ -25,6 +29,8 @@ from temporalio.client import Client
 
 sys.path.append('.')
 
+from meraki_codec import create_data_converter
+
 from concordia_workflows_echarts import (
     # 基础工作流 (10个)
     DeviceStatusWorkflow, ConcordiaWorkflowInput,
@@ -49,6 +55,7 @@ DEFAULT_ORG_ID = "850617379619606726"  # Concordia组织ID
 TEMPORAL_HOST = "temporal:7233"
 TEMPORAL_NAMESPACE = "avaca"
 TASK_QUEUE = "meraki-workflows-queue"
+DEFAULT_CONCURRENCY = 14  # 并发模式下同时执行的工作流上限
 
 def print_separator(title: str, char: str = "=", width: int = 80):
     """打印分隔符"""
@@ -165,12 +172,9 @@ def print_workflow_result(result, workflow_name: str, workflow_number: int):
     
     print(f"\n{'=' * 100}")
 
-async def test_basic_workflows(client: Client, org_id: str):
-    """测试10个基础工作流"""
-    print_separator("📊 基础工作流测试 (10个)", "=", 80)
-    
-    # 定义基础工作流测试用例
-    basic_workflows = [
+def get_basic_workflows(org_id: str) -> list:
+    """基础工作流测试用例 (1-10)"""
+    return [
         {
             "name": "设备状态查询",
             "workflow": DeviceStatusWorkflow,
@@ -232,6 +236,41 @@ async def test_basic_workflows(client: Client, org_id: str):
             "description": "1个热力图"
         }
     ]
+
+def get_complex_workflows(org_id: str) -> list:
+    """复杂工作流测试用例 (11-14)"""
+    return [
+        {
+            "name": "网络健康全景分析",
+            "workflow": NetworkHealthAnalysisWorkflow,
+            "input": NetworkHealthAnalysisInput(org_id=org_id),
+            "description": "4个图表 (饼图+柱状图+散点图+仪表盘)"
+        },
+        {
+            "name": "安全态势感知分析",
+            "workflow": SecurityPostureWorkflow,
+            "input": SecurityPostureInput(org_id=org_id),
+            "description": "4个图表 (树图+雷达图+热力图+柱状图)"
+        },
+        {
+            "name": "运维故障诊断",
+            "workflow": TroubleshootingWorkflow,
+            "input": TroubleshootingInput(org_id=org_id),
+            "description": "2个图表 (雷达图+时间轴图)"
+        },
+        {
+            "name": "容量规划分析",
+            "workflow": CapacityPlanningWorkflow,
+            "input": CapacityPlanningInput(org_id=org_id, forecast_days=30),
+            "description": "4个图表 (仪表盘+时间轴+堆叠柱状图+饼图)"
+        }
+    ]
+
+async def test_basic_workflows(client: Client, org_id: str):
+    """测试10个基础工作流"""
+    print_separator("📊 基础工作流测试 (10个)", "=", 80)
+    
+    basic_workflows = get_basic_workflows(org_id)
     
     results = []
     
@@ -281,33 +320,7 @@ async def test_complex_workflows(client: Client, org_id: str):
     """测试4个复杂工作流"""
     print_separator("🚀 复杂多Activity组合工作流测试 (4个)", "=", 80)
     
-    # 定义复杂工作流测试用例
-    complex_workflows = [
-        {
-            "name": "网络健康全景分析",
-            "workflow": NetworkHealthAnalysisWorkflow,
-            "input": NetworkHealthAnalysisInput(org_id=org_id),
-            "description": "4个图表 (饼图+柱状图+散点图+仪表盘)"
-        },
-        {
-            "name": "安全态势感知分析",
-            "workflow": SecurityPostureWorkflow,
-            "input": SecurityPostureInput(org_id=org_id),
-            "description": "4个图表 (树图+雷达图+热力图+柱状图)"
-        },
-        {
-            "name": "运维故障诊断",
-            "workflow": TroubleshootingWorkflow,
-            "input": TroubleshootingInput(org_id=org_id),
-            "description": "2个图表 (雷达图+时间轴图)"
-        },
-        {
-            "name": "容量规划分析",
-            "workflow": CapacityPlanningWorkflow,
-            "input": CapacityPlanningInput(org_id=org_id, forecast_days=30),
-            "description": "4个图表 (仪表盘+时间轴+堆叠柱状图+饼图)"
-        }
-    ]
+    complex_workflows = get_complex_workflows(org_id)
     
     results = []
     
@@ -354,6 +367,103 @@ async def test_complex_workflows(client: Client, org_id: str):
     
     return results
 
+async def test_concurrent_workflows(client: Client, org_id: str, copies: int = 1,
+                                   concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    并发测试：一次性提交全部工作流（每个 copies 份），同时最多 concurrency 个在执行
+
+    模拟聊天机器人突发提问，检查 Worker 能否跟上。不打印/保存完整结果，只统计耗时。
+
+    Args:
+        client: Temporal客户端
+        org_id: 组织ID
+        copies: 每个工作流提交的份数
+        concurrency: 同时执行的工作流上限（<=0 表示不限）
+
+    Returns:
+        list: 每个工作流的统计，包含 workflow_number/name/success/copies/succeeded/
+              min_seconds/avg_seconds/max_seconds/wall_seconds/errors
+    """
+    test_cases = get_basic_workflows(org_id) + get_complex_workflows(org_id)
+    total = len(test_cases) * copies
+    limit = concurrency if concurrency > 0 else total
+    semaphore = asyncio.Semaphore(limit)
+    print_separator(f"⚡ 并发测试 ({len(test_cases)}个工作流 × {copies}份，并发上限 {limit})", "=", 80)
+
+    started = time.perf_counter()
+
+    async def run_one(number: int, test_case: dict, copy: int) -> dict:
+        async with semaphore:
+            submitted = time.perf_counter()
+            workflow_id = f"test-concurrent-{number}-{copy}-{uuid.uuid4().hex[:8]}"
+            try:
+                await client.execute_workflow(
+                    test_case['workflow'].run,
+                    test_case['input'],
+                    id=workflow_id,
+                    task_queue=TASK_QUEUE,
+                )
+                error = None
+            except Exception as e:
+                error = str(e)
+            finished = time.perf_counter()
+        return {
+            "number": number,
+            "seconds": finished - submitted,
+            "waited": submitted - started,
+            "finished": finished - started,
+            "error": error,
+        }
+
+    runs = await asyncio.gather(*(
+        run_one(number, test_case, copy)
+        for copy in range(copies)
+        for number, test_case in enumerate(test_cases, 1)
+    ))
+    wall_seconds = time.perf_counter() - started
+
+    results = []
+    for number, test_case in enumerate(test_cases, 1):
+        case_runs = [run for run in runs if run["number"] == number]
+        durations = [run["seconds"] for run in case_runs]
+        errors = [run["error"] for run in case_runs if run["error"]]
+        results.append({
+            "workflow_number": number,
+            "name": test_case['name'],
+            "success": not errors,
+            "copies": len(case_runs),
+            "succeeded": len(case_runs) - len(errors),
+            "min_seconds": min(durations),
+            "avg_seconds": sum(durations) / len(durations),
+            "max_seconds": max(durations),
+            # 从统一提交到该工作流最后一份完成（含等待并发名额的时间）
+            "wall_seconds": max(run["finished"] for run in case_runs),
+            "errors": errors,
+        })
+
+    print(f"\n{'序号':<4} {'工作流名称':<20} {'成功':<8} {'最短(s)':>8} {'平均(s)':>8} {'最长(s)':>8} {'完成于(s)':>10}")
+    print("-" * 80)
+    for result in results:
+        print(f"{result['workflow_number']:<4} {result['name'][:19]:<20} "
+              f"{result['succeeded']}/{result['copies']:<6} {result['min_seconds']:>8.2f} "
+              f"{result['avg_seconds']:>8.2f} {result['max_seconds']:>8.2f} {result['wall_seconds']:>10.2f}")
+
+    failed = [result for result in results if not result['success']]
+    sequential_seconds = sum(run["seconds"] for run in runs)
+    print(f"\n⏱️  总墙钟时间: {wall_seconds:.2f}s（{total} 次执行，逐个执行累计 {sequential_seconds:.2f}s，"
+          f"并发加速 {sequential_seconds / wall_seconds if wall_seconds else 0:.1f}x）")
+    print(f"🚦 吞吐: {total / wall_seconds if wall_seconds else 0:.2f} workflows/s，"
+          f"最长排队 {max(run['waited'] for run in runs):.2f}s")
+    if failed:
+        print(f"\n❌ **失败工作流详情**:")
+        for result in failed:
+            print(f"   {result['workflow_number']}. {result['name']}: "
+                  f"{len(result['errors'])}/{result['copies']} 失败，例如 {result['errors'][0]}")
+    else:
+        print(f"\n🎉 **{total} 次并发执行全部成功！**")
+
+    return results
+
 def print_final_statistics(basic_results: list, complex_results: list):
     """打印最终统计信息"""
     print_separator("📊 最终测试统计报告", "=", 100)
@@ -423,10 +533,23 @@ def print_final_statistics(basic_results: list, complex_results: list):
     
     return failed_workflows == 0
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="测试所有14个Meraki Temporal Workflow")
+    parser.add_argument("org_id", nargs="?", default=DEFAULT_ORG_ID, help="组织ID")
+    parser.add_argument("--concurrent", action="store_true", help="并发提交所有工作流，只统计耗时")
+    parser.add_argument("--copies", type=int, default=1, help="并发模式下每个工作流提交的份数")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="并发模式下同时执行的工作流上限（0表示不限）")
+    args = parser.parse_args()
+    if args.copies > 1 or args.concurrency != DEFAULT_CONCURRENCY:
+        args.concurrent = True
+    return args
+
 async def main():
     """主函数"""
-    # 获取组织ID
-    org_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ORG_ID
+    args = parse_args()
+    org_id = args.org_id
     
     print_separator("🚀 Meraki Temporal Workflow 完整测试系统", "=", 100)
     print(f"📋 测试组织ID: {org_id}")
@@ -434,14 +557,25 @@ async def main():
     print(f"🔧 Temporal服务: {TEMPORAL_HOST}")
     print(f"📦 命名空间: {TEMPORAL_NAMESPACE}")
     print(f"🎯 任务队列: {TASK_QUEUE}")
-    print(f"💾 结果保存: workflow_results/1-14.json")
+    if args.concurrent:
+        print(f"⚡ 并发模式: 每个工作流 {args.copies} 份，并发上限 {args.concurrency or '不限'}")
+    else:
+        print(f"💾 结果保存: workflow_results/1-14.json")
     
     try:
         # 连接Temporal服务
         print(f"\n🔌 连接Temporal服务...")
-        client = await Client.connect(TEMPORAL_HOST, namespace=TEMPORAL_NAMESPACE)
+        # 与 worker.py 使用同一个压缩 codec，才能读取压缩后的工作流结果
+        data_converter = create_data_converter()
+        client = await Client.connect(TEMPORAL_HOST, namespace=TEMPORAL_NAMESPACE,
+                                      data_converter=data_converter)
         print(f"✅ 成功连接到Temporal服务")
         
+        if args.concurrent:
+            results = await test_concurrent_workflows(client, org_id, args.copies, args.concurrency)
+            print(f"🗜️ Payload压缩统计: {data_converter.payload_codec.stats()}")
+            sys.exit(0 if all(r['success'] for r in results) else 1)
+        
         # 测试基础工作流
         basic_results = await test_basic_workflows(client, org_id)
         
@@ -450,6 +584,7 @@ async def main():
         
         # 打印最终统计
         success = print_final_statistics(basic_results, complex_results)
+        print(f"🗜️ Payload压缩统计: {data_converter.payload_codec.stats()}")
         
         # 退出
         sys.exit(0 if success else 1)
@@ -7,12 +7,23 @@ Meraki Temporal Worker
 
 import asyncio
 import logging
+import os
+import socket
 import sys
 from typing import Optional
 
 from temporalio.client import Client
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
 from temporalio.worker import Worker
 
+try:
+    from temporalio.contrib.opentelemetry import TracingInterceptor
+except ImportError:  # opentelemetry-api 为可选依赖
+    TracingInterceptor = None
+
+from meraki_codec import create_data_converter
+from meraki_metrics import start_metrics_server
+
 # 导入Concordia业务工作流 - ECharts图表版本
 from concordia_workflows_echarts import (
     # 基础工作流 (10个)
@@ -30,7 +41,11 @@ from concordia_workflows_echarts import (
     NetworkHealthAnalysisWorkflow,
     SecurityPostureWorkflow,
     TroubleshootingWorkflow,
-    CapacityPlanningWorkflow
+    CapacityPlanningWorkflow,
+    # 后台维护工作流
+    InventorySyncWorkflow,
+    UplinkHistoryCollectorWorkflow,
+    NetworkEventsIngestWorkflow,
 )
 
 # 配置日志
@@ -44,11 +59,70 @@ logger = logging.getLogger(__name__)
 DEFAULT_TEMPORAL_HOST = "temporal:7233"  # 保持原有配置
 DEFAULT_NAMESPACE = "avaca"  # 保持原有命名空间
 MERAKI_TASK_QUEUE_NAME = "meraki-workflows-queue"
+DEFAULT_TEMPORAL_METRICS_PORT = 9000  # Temporal SDK Prometheus 指标端口，0 表示关闭
+DEFAULT_OTEL_SERVICE_NAME = "meraki-worker"
+DEFAULT_SPILL_CLEANUP_INTERVAL = 3600  # 清理遗留落盘页面的间隔（秒）
+
+
+def create_runtime(metrics_port: int = DEFAULT_TEMPORAL_METRICS_PORT) -> Runtime:
+    """
+    创建带 Prometheus 指标的 Temporal Runtime
+
+    暴露任务槽位使用、schedule-to-start 延迟、poller 状态等 SDK 指标
+    （temporal_worker_task_slots_available、temporal_activity_schedule_to_start_latency、
+    temporal_num_pollers 等）。
+
+    Args:
+        metrics_port: Prometheus 端口（0 表示不导出指标）
+
+    Returns:
+        Runtime实例（每个进程只应创建一个）
+    """
+    if not metrics_port:
+        return Runtime(telemetry=TelemetryConfig())
+    logger.info(f"Temporal SDK 指标: http://0.0.0.0:{metrics_port}/metrics")
+    return Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=f"0.0.0.0:{metrics_port}")))
+
+
+def create_tracing_interceptors() -> list:
+    """
+    创建 OpenTelemetry 追踪拦截器
+
+    TracingInterceptor 注册在客户端上，Worker 自动继承，为 Workflow 和 Activity 创建 span；
+    merakiAPI.py 在 Activity span 下为每次 Meraki API 调用创建子 span。
+    设置 OTEL_EXPORTER_OTLP_ENDPOINT 且安装了 opentelemetry-sdk 与 OTLP 导出器时，
+    配置全局 TracerProvider 将 span 导出到该地址；否则使用应用已配置的 TracerProvider。
+
+    Returns:
+        拦截器列表（未安装 opentelemetry-api 时为空）
+    """
+    if TracingInterceptor is None:
+        logger.info("未安装 opentelemetry-api，跳过Temporal追踪")
+        return []
+
+    if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        try:
+            from opentelemetry import trace
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            logger.warning("未安装 opentelemetry-sdk / opentelemetry-exporter-otlp，span 不会导出")
+        else:
+            provider = TracerProvider(resource=Resource.create(
+                {"service.name": os.getenv("OTEL_SERVICE_NAME", DEFAULT_OTEL_SERVICE_NAME)}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+            logger.info(f"OpenTelemetry span 导出到: {os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')}")
+
+    return [TracingInterceptor()]
 
 
 async def create_meraki_worker(
     client: Client,
-    task_queue: str = MERAKI_TASK_QUEUE_NAME
+    task_queue: str = MERAKI_TASK_QUEUE_NAME,
+    meraki_activities=None
 ) -> Worker:
     """
     创建Meraki工作流Worker
@@ -56,6 +130,8 @@ async def create_meraki_worker(
     Args:
         client: Temporal客户端
         task_queue: 任务队列名称
+        meraki_activities: MerakiActivities实例（为None时自动创建）
+            调用方负责在Worker停止后调用 meraki_activities.close() 释放连接池
         
     Returns:
         配置好的Worker实例
@@ -78,13 +154,21 @@ async def create_meraki_worker(
         SecurityPostureWorkflow,
         TroubleshootingWorkflow,
         CapacityPlanningWorkflow,
+        # 后台维护工作流
+        InventorySyncWorkflow,
+        UplinkHistoryCollectorWorkflow,
+        NetworkEventsIngestWorkflow,
     ]
     
     # 导入重构后的MerakiActivities
     from meraki import MerakiActivities
     
     # 创建MerakiActivities实例（merakiAPI.py 自己处理认证）
-    meraki_activities = MerakiActivities()
+    if meraki_activities is None:
+        meraki_activities = MerakiActivities()
+    
+    # 打开Worker级共享连接池，所有Activity复用同一组HTTP连接
+    await meraki_activities.open()
     
     # 获取所有Activity方法
     import inspect
@@ -109,10 +193,63 @@ async def create_meraki_worker(
     return worker
 
 
+def spill_task_queue_name(task_queue: str = MERAKI_TASK_QUEUE_NAME) -> str:
+    """
+    本机专用的分页落盘任务队列名称
+
+    Returns:
+        环境变量 MERAKI_SPILL_TASK_QUEUE，未设置时为 "<task_queue>-spill-<主机名>"
+    """
+    return os.getenv("MERAKI_SPILL_TASK_QUEUE") or f"{task_queue}-spill-{socket.gethostname()}"
+
+
+def create_spill_worker(client: Client, meraki_activities, spill_task_queue: str) -> Worker:
+    """
+    创建只处理本机落盘页面的Worker
+
+    分页Activity把页面写在本机 MERAKI_SPILL_DIR，并在句柄中返回 spill_task_queue；
+    Workflow 把 read_spill_page / delete_spill 调度到该队列，保证读取发生在持有页面的主机上。
+
+    Args:
+        client: Temporal客户端
+        meraki_activities: 与主Worker共享的 MerakiActivities 实例
+        spill_task_queue: 本机专用任务队列
+
+    Returns:
+        Worker实例
+    """
+    return Worker(
+        client,
+        task_queue=spill_task_queue,
+        activities=[meraki_activities.read_spill_page, meraki_activities.delete_spill],
+    )
+
+
+async def run_spill_cleanup(spill, interval: float = DEFAULT_SPILL_CLEANUP_INTERVAL):
+    """
+    定期删除遗留的落盘页面（Workflow 失败或被取消而未调用 delete_spill 的 spill）
+
+    启动时先清理一次，之后每 interval 秒清理一次，直到任务被取消。
+
+    Args:
+        spill: MerakiActivities 使用的 SpillStore
+        interval: 清理间隔（秒）
+    """
+    while True:
+        try:
+            removed = await asyncio.to_thread(spill.cleanup)
+            if removed:
+                logger.info(f"清理了 {removed} 个超过 {spill.max_age_seconds:.0f} 秒未修改的落盘页面目录")
+        except OSError as e:
+            logger.warning(f"清理落盘页面失败: {e}")
+        await asyncio.sleep(interval)
+
+
 async def run_meraki_worker(
     temporal_host: str = DEFAULT_TEMPORAL_HOST,
     namespace: str = DEFAULT_NAMESPACE,
-    task_queue: str = MERAKI_TASK_QUEUE_NAME
+    task_queue: str = MERAKI_TASK_QUEUE_NAME,
+    metrics_port: int = DEFAULT_TEMPORAL_METRICS_PORT
 ):
     """
     运行Meraki工作流Worker
@@ -121,16 +258,40 @@ async def run_meraki_worker(
         temporal_host: Temporal服务器地址
         namespace: 命名空间
         task_queue: 任务队列名称
+        metrics_port: Temporal SDK Prometheus 指标端口（0 表示关闭）
     """
+    from meraki import MerakiActivities
+    # 分页句柄携带本机专用队列，多主机部署时页面读取也会回到本机
+    spill_task_queue = spill_task_queue_name(task_queue)
+    meraki_activities = MerakiActivities(spill_task_queue=spill_task_queue)
+    data_converter = None
+    spill_cleanup = None
+    
     try:
         logger.info(f"连接到Temporal服务器: {temporal_host}")
         logger.info(f"命名空间: {namespace}")
         logger.info(f"任务队列: {task_queue}")
         
-        client = await Client.connect(temporal_host, namespace=namespace)
+        # 超过阈值的payload压缩后写入历史，test.py 等客户端须使用同一个 codec
+        data_converter = create_data_converter()
+        client = await Client.connect(
+            temporal_host,
+            namespace=namespace,
+            data_converter=data_converter,
+            runtime=create_runtime(metrics_port),
+            # 客户端拦截器由 Worker 继承: Workflow → Activity → Meraki HTTP请求 同一条 trace
+            interceptors=create_tracing_interceptors(),
+        )
         logger.info("✅ 成功连接到Temporal服务器")
         
-        worker = await create_meraki_worker(client, task_queue)
+        worker = await create_meraki_worker(client, task_queue, meraki_activities)
+        spill_worker = create_spill_worker(client, meraki_activities, spill_task_queue)
+        logger.info(f"分页落盘任务队列: {spill_task_queue}")
+        spill_cleanup = asyncio.create_task(run_spill_cleanup(
+            meraki_activities.spill,
+            float(os.getenv("MERAKI_SPILL_CLEANUP_INTERVAL", DEFAULT_SPILL_CLEANUP_INTERVAL))))
+        # 设置 MERAKI_METRICS_PORT 时暴露按端点模板的 Meraki API 指标
+        start_metrics_server()
         
         logger.info("🚀 启动Meraki Temporal Worker...")
         logger.info("=" * 60)
@@ -154,13 +315,31 @@ async def run_meraki_worker(
         logger.info("  14. 容量规划分析")
         logger.info("=" * 60)
         
-        await worker.run()
+        await asyncio.gather(worker.run(), spill_worker.run())
         
     except KeyboardInterrupt:
         logger.info("收到中断信号，正在关闭Worker...")
     except Exception as e:
         logger.error(f"Worker运行失败: {str(e)}")
         raise
+    finally:
+        if spill_cleanup is not None:
+            spill_cleanup.cancel()
+        logger.info(f"连接池统计: {meraki_activities.get_pool_stats()}")
+        logger.info(f"限速器统计: {meraki_activities.get_rate_limit_stats()}")
+        logger.info(f"重试统计: {meraki_activities.get_retry_stats()}")
+        logger.info(f"缓存统计: {meraki_activities.get_cache_stats()}")
+        logger.info(f"请求合并统计: {meraki_activities.get_coalescing_stats()}")
+        logger.info(f"解码统计: {meraki_activities.get_decode_stats()}")
+        logger.info(f"API请求指标(耗时前10): {meraki_activities.get_request_metrics(10)}")
+        logger.info(f"设备搜索索引统计: {meraki_activities.get_search_stats()}")
+        logger.info(f"设备地理索引统计: {meraki_activities.get_geo_stats()}")
+        logger.info(f"客户端MAC索引统计: {meraki_activities.get_client_index_stats()}")
+        logger.info(f"时间序列存储统计: {meraki_activities.get_timeseries_stats()}")
+        logger.info(f"网络事件日志统计: {meraki_activities.get_events_stats()}")
+        if data_converter is not None:
+            logger.info(f"Payload压缩统计: {data_converter.payload_codec.stats()}")
+        await meraki_activities.close()
 
 
 def print_usage():
@@ -175,19 +354,50 @@ def print_usage():
     print("环境变量:")
     print("  TEMPORAL_HOST                       # Temporal服务器地址 (默认: temporal:7233)")
     print("  TEMPORAL_NAMESPACE                  # 命名空间 (默认: avaca)")
+    print("  TEMPORAL_METRICS_PORT               # Temporal SDK Prometheus指标端口，0为关闭 (默认: 9000)")
+    print("  OTEL_EXPORTER_OTLP_ENDPOINT         # OTLP span导出地址 (默认: 不导出，需安装opentelemetry-sdk与OTLP导出器)")
+    print("  OTEL_SERVICE_NAME                   # trace中的服务名 (默认: meraki-worker)")
+    print("  MERAKI_BASE_URL                     # Meraki API地址 (默认: https://api.meraki.cn/api/v1，可指向 meraki_simulator.py)")
+    print("  MERAKI_POOL_LIMIT                   # HTTP连接池总连接数 (默认: 100)")
+    print("  MERAKI_POOL_LIMIT_PER_HOST          # 单主机连接数 (默认: 20)")
+    print("  MERAKI_POOL_KEEPALIVE               # 空闲连接保活秒数 (默认: 60)")
+    print("  MERAKI_POOL_DNS_TTL                 # DNS缓存秒数 (默认: 300)")
+    print("  MERAKI_ORG_RATE / MERAKI_ORG_BURST  # 每组织限速 请求/秒 与突发容量 (默认: 10 / 10)")
+    print("  MERAKI_KEY_RATE / MERAKI_KEY_BURST  # 每API密钥限速 请求/秒 与突发容量 (默认: 100 / 100)")
+    print("  MERAKI_RETRY_MAX_ATTEMPTS           # 单次请求最多尝试次数 (默认: 5)")
+    print("  MERAKI_RETRY_BASE_DELAY / _MAX_DELAY # 退避基础/最大延迟秒数 (默认: 0.5 / 30)")
+    print("  MERAKI_SPILL_DIR                    # 分页Activity落盘目录 (默认: 系统临时目录/meraki_spill)")
+    print("  MERAKI_SPILL_TASK_QUEUE             # 本机落盘页面的专用任务队列 (默认: <任务队列>-spill-<主机名>)")
+    print("  MERAKI_SPILL_MAX_AGE                # 删除超过此秒数未修改的遗留落盘页面 (默认: 86400)")
+    print("  MERAKI_SPILL_CLEANUP_INTERVAL       # 清理遗留落盘页面的间隔秒数 (默认: 3600)")
+    print("  MERAKI_CACHE_MAX_BYTES              # 慢变化端点缓存字节上限，0为关闭 (默认: 64MB)")
+    print("  MERAKI_JSON_OFFLOAD_BYTES           # 超过此字节数的响应在线程池中解码 (默认: 256KB)")
+    print("  MERAKI_CODEC_ALGORITHM              # Payload压缩算法 zstd/gzip/none (默认: 安装zstandard时zstd，否则gzip)")
+    print("  MERAKI_CODEC_THRESHOLD              # 超过此字节数的Payload才压缩 (默认: 4096)")
+    print("  MERAKI_INVENTORY_DB                 # 本地库存镜像SQLite路径 (默认: 系统临时目录/meraki_inventory.sqlite3)")
+    print("  MERAKI_SEARCH_MAX_AGE               # 设备搜索索引快照最长使用秒数 (默认: 300)")
+    print("  MERAKI_CLIENT_INDEX_TTL             # 客户端MAC索引条目有效期秒数 (默认: 86400)")
+    print("  MERAKI_CLIENT_INDEX_MAX_ENTRIES     # 客户端MAC索引最多保存的MAC数 (默认: 200000)")
+    print("  MERAKI_TIMESERIES_DIR               # 丢包/延迟时间序列存储目录 (默认: 系统临时目录/meraki_timeseries)")
+    print("  MERAKI_TIMESERIES_RETENTION         # 丢包/延迟样本保留秒数 (默认: 1209600，即14天)")
+    print("  MERAKI_EVENTS_DIR                   # 网络事件本地日志目录 (默认: 系统临时目录/meraki_events)")
+    print("  MERAKI_EVENTS_RETENTION             # 网络事件保留秒数 (默认: 2592000，即30天)")
+    print("  MERAKI_METRICS_EXPORTERS            # API请求指标导出器 (默认: prometheus,opentelemetry，仅已安装的生效；none为关闭)")
+    print("  MERAKI_METRICS_PORT                 # Prometheus /metrics 端口 (默认: 不启动，需安装prometheus_client)")
     print()
     print("示例:")
     print("  TEMPORAL_HOST=temporal:7233 python worker.py")
     print("  TEMPORAL_NAMESPACE=production python worker.py meraki")
+    print("  TEMPORAL_METRICS_PORT=9090 OTEL_EXPORTER_OTLP_ENDPOINT=http://otel-collector:4317 python worker.py")
+    print("  MERAKI_BASE_URL=http://127.0.0.1:8080/api/v1 python worker.py  # 连接本地模拟服务")
 
 
 async def main():
     """主函数"""
-    import os
-    
     # 从环境变量获取配置
     temporal_host = os.getenv("TEMPORAL_HOST", DEFAULT_TEMPORAL_HOST)
     namespace = os.getenv("TEMPORAL_NAMESPACE", DEFAULT_NAMESPACE)
+    metrics_port = int(os.getenv("TEMPORAL_METRICS_PORT", DEFAULT_TEMPORAL_METRICS_PORT))
     
     # 解析命令行参数
     mode = "meraki"  # 默认模式
@@ -200,7 +410,7 @@ async def main():
     
     try:
         if mode == "meraki":
-            await run_meraki_worker(temporal_host, namespace)
+            await run_meraki_worker(temporal_host, namespace, metrics_port=metrics_port)
         else:
             logger.error(f"未知模式: {mode}")
             print_usage()